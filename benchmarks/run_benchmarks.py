@@ -0,0 +1,148 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+"""
+run_benchmarks.py
+Runs KAST end to end on synthetic data, reporting startup time, steps per second and peak memory of each scenario,
+and optionally saving the results as a baseline or flagging regressions against a saved one.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks [--scenario NAME ...] [--save-baseline PATH] [--baseline PATH]
+"""
+
+import sys
+import json
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from benchmarks.synthetic import write_synthetic_config
+
+# Scenario name: synthetic workload, as keyword arguments of write_synthetic_config, plus the runtime method used to kast it
+SCENARIOS = {
+    'baseline':     {'num_rows': 5000, 'num_columns': 8, 'num_kasters': 8, 'fan_in': 2, 'chain_depth': 1},
+    'wide_cells':   {'num_rows': 2000, 'num_columns': 16, 'cell_width': 32, 'num_kasters': 16, 'fan_in': 2, 'chain_depth': 1},
+    'many_kasters': {'num_rows': 2000, 'num_columns': 16, 'num_kasters': 128, 'fan_in': 4, 'chain_depth': 1},
+    'deep_chain':   {'num_rows': 2000, 'num_columns': 8, 'num_kasters': 32, 'fan_in': 2, 'chain_depth': 16},
+    'unchecked':    {'num_rows': 5000, 'num_columns': 8, 'num_kasters': 8, 'fan_in': 2, 'chain_depth': 1,
+                     'options': {'TypeDriftPolicy': 'off'}},
+    'batch':        {'num_rows': 20000, 'num_columns': 8, 'num_kasters': 8, 'fan_in': 2, 'chain_depth': 1, 'mode': 'batch'},
+}
+
+# Metrics compared against a baseline, and whether higher values are better
+METRICS = {'steps_per_second': True, 'startup_seconds': False, 'peak_rss_mb': False}
+
+def peak_rss_mb() -> float:
+    # Peak resident set size of this process; ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+def run_scenario(scenario: Dict) -> Dict[str, float]:
+    # Kast one scenario end to end; run in a fresh process so that peak memory is the scenario's own
+    from kast.src.kast_runtime import KastRuntime
+    scenario = dict(scenario)
+    mode = scenario.pop('mode', 'step')
+    block_size = scenario.pop('block_size', 1024)
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = write_synthetic_config(directory, **scenario)
+
+        start = perf_counter()
+        runtime = KastRuntime(config_path)
+        startup_seconds = perf_counter() - start
+
+        start = perf_counter()
+        num_steps = 0
+        while runtime.data_source.has_more():
+            if mode == 'batch':
+                runtime.run_block(block_size)
+                num_steps = runtime.data_source.index
+            else:
+                runtime.run_step()
+                num_steps += 1
+        kast_seconds = perf_counter() - start
+
+    return {'steps': num_steps,
+            'startup_seconds': startup_seconds,
+            'steps_per_second': num_steps / kast_seconds if kast_seconds > 0 else float('inf'),
+            'peak_rss_mb': peak_rss_mb()}
+
+def run_benchmarks(scenario_names: List[str], repeat: int = 1, row_scale: float = 1.0) -> Dict[str, Dict[str, float]]:
+    # Best result of repeat runs of each scenario (fastest steps per second), each run in its own process
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in scenario_names:
+        scenario = dict(SCENARIOS[name])
+        scenario['num_rows'] = max(1, int(scenario['num_rows'] * row_scale))
+        runs = []
+        for run in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(run_scenario, scenario).result())
+        results[name] = max(runs, key=lambda result: result['steps_per_second'])
+    return results
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    # Describe every metric at least tolerance (a fraction) worse than the baseline, for scenarios present in both
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            baseline_value = baseline[name].get(metric)
+            if not baseline_value:
+                continue
+            change = (result[metric] - baseline_value) / baseline_value
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f'{name}: {metric} {result[metric]:.4g} vs baseline {baseline_value:.4g} ({change:+.1%})')
+    return regressions
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'scenario':<16}{'steps':>10}{'startup s':>12}{'steps/s':>14}{'peak RSS MB':>14}"]
+    for name, result in results.items():
+        lines.append(f"{name:<16}{result['steps']:>10}{result['startup_seconds']:>12.3f}{result['steps_per_second']:>14.1f}{result['peak_rss_mb']:>14.1f}")
+    return '\n'.join(lines)
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Benchmark KAST end to end on synthetic data')
+    arg_parser.add_argument('--scenario', '-s', action='append', choices=list(SCENARIOS),
+                            help='Scenario to run; may be repeated (default: all)')
+    arg_parser.add_argument('--repeat', '-r', type=int, default=3,
+                            help='Runs of each scenario, keeping the fastest (default 3)')
+    arg_parser.add_argument('--row-scale', type=float, default=1.0,
+                            help='Multiply the number of rows of every scenario (default 1.0)')
+    arg_parser.add_argument('--save-baseline', metavar='PATH',
+                            help='Save the results to PATH as a baseline')
+    arg_parser.add_argument('--baseline', metavar='PATH',
+                            help='Compare the results with the baseline saved at PATH, failing on regressions')
+    arg_parser.add_argument('--tolerance', type=float, default=0.15,
+                            help='Fraction by which a metric may be worse than the baseline before it is flagged (default 0.15)')
+    args = arg_parser.parse_args(argv)
+
+    results = run_benchmarks(args.scenario or list(SCENARIOS), args.repeat, args.row_scale)
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f'\nSaved baseline to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print('\nRegressions against ' + args.baseline + ':\n  ' + '\n  '.join(regressions))
+            return 1
+        print(f'\nNo regressions against {args.baseline}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
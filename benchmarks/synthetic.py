@@ -0,0 +1,95 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+"""
+synthetic.py
+Generators of synthetic CSV data, kaster method files and configs for benchmarking KAST end to end
+"""
+
+import os
+import csv
+import numpy as np
+from typing import Dict, List
+
+def column_names(num_columns: int) -> List[str]:
+    return [f'c{column}' for column in range(num_columns)]
+
+def write_synthetic_csv(path: str, num_rows: int, num_columns: int, cell_width: int = 1, seed: int = 0) -> None:
+    """
+    Write a CSV of num_rows rows of random values in columns c0, c1, ...
+    Cells hold one float, or a list of cell_width floats formatted as a Python list (ex. "[0.1, 0.2]") when cell_width > 1.
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(column_names(num_columns))
+        for row in rng.random((num_rows, num_columns, cell_width)).round(6):
+            if cell_width == 1:
+                writer.writerow(row[:, 0].tolist())
+            else:
+                writer.writerow([str(cell.tolist()) for cell in row])
+
+def kaster_inputs(num_columns: int, num_kasters: int, fan_in: int, chain_depth: int) -> List[List[str]]:
+    """
+    Input names of each synthetic kaster. Kasters are split evenly over chain_depth levels; the first level reads fan_in
+    columns, and each later level reads fan_in outputs of the level before it, so chains are chain_depth kasters long.
+    """
+    if num_kasters < chain_depth:
+        raise ValueError(f'num_kasters ({num_kasters}) must be at least chain_depth ({chain_depth}).')
+    columns = column_names(num_columns)
+    levels = [list(range(level * num_kasters // chain_depth, (level + 1) * num_kasters // chain_depth)) for level in range(chain_depth)]
+    inputs = []
+    for level, level_kasters in enumerate(levels):
+        available = columns if level == 0 else [f'k{kaster}' for kaster in levels[level - 1]]
+        for position, kaster in enumerate(level_kasters):
+            count = min(fan_in, len(available))
+            inputs.append([available[(position * fan_in + offset) % len(available)] for offset in range(count)])
+    return inputs
+
+def write_synthetic_kasters(path: str, num_columns: int, num_kasters: int, fan_in: int = 2, chain_depth: int = 1) -> None:
+    # Write a kaster methods file of num_kasters kasters, kaster_<i> returning k<i>, the sum of its inputs
+    lines = ['import numpy as np', '']
+    for kaster, input_names in enumerate(kaster_inputs(num_columns, num_kasters, fan_in, chain_depth)):
+        lines.append(f"def kaster_{kaster}({', '.join(input_names)}):")
+        lines.append(f"    k{kaster} = {' + '.join(f'float(np.sum({name}))' for name in input_names)}")
+        lines.append(f"    return (k{kaster},)")
+        lines.append('')
+    with open(path, 'w') as kaster_file:
+        kaster_file.write('\n'.join(lines))
+
+def write_synthetic_config(directory: str,
+                           num_rows: int,
+                           num_columns: int,
+                           cell_width: int = 1,
+                           num_kasters: int = 8,
+                           fan_in: int = 2,
+                           chain_depth: int = 1,
+                           options: Dict[str, str] = None,
+                           seed: int = 0) -> str:
+    """
+    Write synthetic data, kasters and a config using them into directory, returning the config path.
+    Columns are declared in a [CsvSchema], so values reach kasters parsed; options are added to the [DEFAULT] section.
+    """
+    data_path = os.path.join(directory, 'synthetic_data.csv')
+    kaster_path = os.path.join(directory, 'synthetic_kasters.py')
+    config_path = os.path.join(directory, 'synthetic_config.ini')
+    write_synthetic_csv(data_path, num_rows, num_columns, cell_width, seed)
+    write_synthetic_kasters(kaster_path, num_columns, num_kasters, fan_in, chain_depth)
+
+    column_type = 'float' if cell_width == 1 else f'float[{cell_width}]'
+    lines = ['[DEFAULT]',
+             f'KasterMethodsPath = {kaster_path}',
+             'DataType = csv',
+             f'DataFile = {data_path}']
+    lines += [f'{option} = {value}' for option, value in (options or {}).items()]
+    lines += ['', '[CsvSchema]']
+    lines += [f'{column} = {column_type}' for column in column_names(num_columns)]
+    with open(config_path, 'w') as config_file:
+        config_file.write('\n'.join(lines) + '\n')
+    return config_path
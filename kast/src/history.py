@@ -0,0 +1,94 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+from typing import Optional
+import numpy as np
+
+class KnowledgeHistory():
+    def __init__(self, capacity: int):
+        """
+        Fixed-capacity ring buffer of a knowledge item's most recent values, and the steps they were recorded at.
+        Every entry is written twice, capacity positions apart, so the latest values are always one contiguous slice
+        and can be returned as a view without copying.
+
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of values held; older values are overwritten
+        """
+        if capacity < 1:
+            raise ValueError(f'KnowledgeHistory capacity must be at least 1, not {capacity}.')
+        self.capacity = capacity
+        self.steps = np.zeros(2 * capacity, dtype=np.int64)
+        self.values: Optional[np.ndarray] = None # Allocated on the first append, once the value type and shape are known
+        self.position = 0 # Where the next value is written
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def allocate(self, value: np.ndarray) -> None:
+        # Numeric values (including fixed-shape vectors) are held in a typed array; anything else in an object array
+        if value.dtype.kind in 'biufc':
+            self.values = np.zeros((2 * self.capacity,) + value.shape, dtype=value.dtype)
+        else:
+            self.values = np.empty(2 * self.capacity, dtype=object)
+
+    def append(self, step: int, value) -> None:
+        array_value = np.asarray(value)
+        if self.values is None:
+            self.allocate(array_value)
+        elif self.values.dtype != object:
+            # Widen the buffer rather than truncate values that do not fit it (ex. a float arriving after ints)
+            if array_value.dtype.kind not in 'biufc' or array_value.shape != self.values.shape[1:]:
+                self.values = self.to_object_values()
+            elif not np.can_cast(array_value.dtype, self.values.dtype, 'safe'):
+                self.values = self.values.astype(np.result_type(self.values.dtype, array_value.dtype))
+
+        stored_value = value if self.values.dtype == object else array_value
+        self.values[self.position] = stored_value
+        self.values[self.position + self.capacity] = stored_value
+        self.steps[self.position] = step
+        self.steps[self.position + self.capacity] = step
+        self.position = (self.position + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def to_object_values(self) -> np.ndarray:
+        # Convert a typed buffer into an object buffer holding one value (or vector) per entry
+        object_values = np.empty(2 * self.capacity, dtype=object)
+        for index in range(2 * self.capacity):
+            object_values[index] = self.values[index]
+        return object_values
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        # View of the last n values (all held values by default), oldest first
+        n = self.count if n is None else min(n, self.count)
+        end = self.position + self.capacity
+        if self.values is None:
+            return np.empty(0)
+        return self.values[end - n:end]
+
+    def last_steps(self, n: Optional[int] = None) -> np.ndarray:
+        # View of the steps the last n values were recorded at, oldest first
+        n = self.count if n is None else min(n, self.count)
+        end = self.position + self.capacity
+        return self.steps[end - n:end]
+
+    def since(self, step: int) -> np.ndarray:
+        # View of every held value recorded at or after the given step
+        start = np.searchsorted(self.last_steps(), step, side='left')
+        return self.last()[start:]
+
+    def at_step(self, step: int):
+        # Value recorded at the given step, if still held
+        steps = self.last_steps()
+        index = np.searchsorted(steps, step, side='left')
+        if index == len(steps) or steps[index] != step:
+            raise KeyError(f'No value recorded at step {step}; history holds steps {steps[0] if len(steps) else None} to {steps[-1] if len(steps) else None}.')
+        return self.last()[index]
@@ -0,0 +1,113 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import json
+from typing import Dict, Optional
+
+# Histogram buckets are log-linear: every power of two of nanoseconds is split into 2 ** SUB_BUCKET_BITS buckets,
+# so percentiles are reported to within 1 / 2 ** SUB_BUCKET_BITS (12.5%) of the true latency
+SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+class LatencyHistogram():
+    def __init__(self):
+        """
+        Call count, total, maximum and log-linear histogram of latencies recorded in nanoseconds.
+        Recording is a few integer operations, and memory does not grow with the number of calls.
+        """
+        self.counts = [0] * (64 * SUB_BUCKETS)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        bits = elapsed_ns.bit_length()
+        if bits <= SUB_BUCKET_BITS:
+            index = elapsed_ns # Latencies below SUB_BUCKETS nanoseconds get one bucket each
+        else:
+            index = ((bits - SUB_BUCKET_BITS) << SUB_BUCKET_BITS) | ((elapsed_ns >> (bits - SUB_BUCKET_BITS - 1)) & (SUB_BUCKETS - 1))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def bucket_upper_bound(self, index: int) -> int:
+        # Largest latency, in nanoseconds, counted in the given bucket
+        if index < SUB_BUCKETS:
+            return index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        return ((SUB_BUCKETS | (index & (SUB_BUCKETS - 1))) << shift) + (1 << shift) - 1
+
+    def percentile(self, percent: float) -> int:
+        # Latency, in nanoseconds, that percent of recorded calls took at most (0 when nothing was recorded)
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> Dict[str, float]:
+        return {'count': self.count,
+                'total_ms': self.total_ns / 1e6,
+                'mean_us': self.total_ns / self.count / 1e3 if self.count else 0.0,
+                'p50_us': self.percentile(50) / 1e3,
+                'p99_us': self.percentile(99) / 1e3,
+                'max_us': self.max_ns / 1e3}
+
+class KastStats():
+    def __init__(self):
+        """
+        Latency histograms of each stage of a runtime step (data source read, knowledge update, kasting, printing)
+        and of each kaster, keyed by stage and kaster method name.
+        """
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.kasters: Dict[str, LatencyHistogram] = {}
+
+    def record_stage(self, stage: str, elapsed_ns: int) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def record_kaster(self, kaster_name: str, elapsed_ns: int) -> None:
+        histogram = self.kasters.get(kaster_name)
+        if histogram is None:
+            histogram = self.kasters[kaster_name] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.kasters.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        # {'stages': {stage: summary}, 'kasters': {kaster name: summary}}, each summary giving count, total_ms, mean_us, p50_us, p99_us and max_us
+        return {'stages': dict((stage, histogram.summary()) for stage, histogram in self.stages.items()),
+                'kasters': dict((kaster_name, histogram.summary()) for kaster_name, histogram in self.kasters.items())}
+
+    def report(self) -> str:
+        # Summary as a table per group, with the most time consuming stage or kaster first
+        lines = []
+        for group, summaries in self.summary().items():
+            lines.append(f"{group:<32}{'count':>10}{'total ms':>12}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}{'max us':>12}")
+            for name, summary in sorted(summaries.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+                lines.append(f"  {name:<30}{summary['count']:>10}{summary['total_ms']:>12.3f}{summary['mean_us']:>12.2f}{summary['p50_us']:>12.2f}{summary['p99_us']:>12.2f}{summary['max_us']:>12.2f}")
+        return '\n'.join(lines)
+
+    def dump(self, path: Optional[str] = None) -> None:
+        # Write the summary as JSON to path, or print the report when no path is given
+        if path is None:
+            print(self.report())
+            return
+        with open(path, 'w') as dump_file:
+            json.dump(self.summary(), dump_file, indent=2)
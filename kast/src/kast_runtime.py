@@ -10,26 +10,101 @@
 import configparser
 import pandas as pd
 import os
+import atexit
+from time import perf_counter_ns
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from inspect import getmembers, isfunction, getfullargspec
+from typing import Callable, Dict, Optional
 
 from kast.src.spellbook import Spellbook
-from kast.utils.functions import get_attribute_by_name, import_module, extract_return_names
+from kast.src.windows import parse_window_kaster
+from kast.src.instrumentation import KastStats
+from kast.utils.functions import get_attribute_by_name, import_module, extract_return_names, index_kaster_signatures, str_to_bool
 from kast.utils.print_io import *
 
+# Runtime methods timed once instrumentation is enabled, with the stage each is recorded as
+TIMED_STAGES = {'read_step': 'get_new_information', 'update_step': 'update_low_level_knowledge', 'kast_step': 'kast',
+                'write_to_sink': 'write_to_sink', 'print_step': 'print_io', 'run_step': 'run_step',
+                'read_block': 'get_new_block', 'kast_block': 'kast_block', 'write_block_to_sink': 'write_to_sink', 'run_block': 'run_block'}
+ASYNC_TIMED_STAGES = {'async_read_step': 'get_new_information', 'async_kast_step': 'kast', 'async_run_step': 'run_step'}
+
+def replay_rows(config_filepath: str, start: int, stop: int, position=None, warmup: int = 0, data_source_options: Optional[Dict] = None):
+    # Worker for KastRuntime.execute_parallel: kast rows start up to (not including) stop of the configured data source in a fresh runtime
+    # The warmup rows before start are kasted first but not returned, so that window kasters start the shard with full windows
+    # position is where the data source located the first row kasted, if it did, so the worker reads only its own rows
+    # data_source_options are the data source's worker_options, passed to the worker runtime's data source when it is built
+    # Returns one (step, {low level name: value}, {high level name: value}) tuple per row, in row order
+    runtime = KastRuntime(config_filepath, worker=True, data_source_options=data_source_options)
+    runtime.data_source.select_rows(start - warmup, stop, position)
+    results = []
+    while runtime.data_source.has_more():
+        spellbook = runtime.run_step()
+        if runtime.data_source.index <= start:
+            continue
+        results.append((runtime.data_source.index,
+                        dict((name, knowledge.value) for name, knowledge in spellbook.low_level_knowledge.items()),
+                        dict((name, knowledge.value) for name, knowledge in spellbook.high_level_knowledge.items())))
+    return results
+
+class ConfigName(str):
+    # Config option name matched case insensitively, as configparser matches option names by default, that still reads
+    # as written, so options of sections naming knowledge or columns (ex. [KnowledgeHistory]) keep their case
+    def __hash__(self):
+        return hash(self.lower())
+
+    def __eq__(self, other):
+        return isinstance(other, str) and self.lower() == other.lower()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
 class KastRuntime():
-    def __init__(self, config_filepath: str):
+    # Window kasters declared in the config; set by parse_config
+    window_kasters: Dict[str, str] = {}
+    # Latency instrumentation settings, set by parse_config, and the stats gathered once enabled
+    instrumentation = False
+    stats_dump_path: Optional[str] = None
+    stats: Optional[KastStats] = None
+    # Buffered console output settings, set by parse_config, and the printer used once enabled
+    buffered_output = False
+    output_options: Dict = {}
+    printer: Optional[KnowledgePrinter] = None
+    # Sink type set by parse_config, and the sink each step's knowledge is written to when one is configured
+    sink_type: Optional[str] = None
+    sink = None
+    # Data source and Spellbook built by __init__, and keyword arguments the data source is built with
+    data_source = None
+    data_source_options: Dict = {}
+    spellbook: Optional[Spellbook] = None
+    # Is this a worker runtime, only kasting rows for the runtime that started it? Set by __init__
+    worker = False
+
+    def __init__(self, config_filepath: str, worker: bool = False, data_source_options: Optional[Dict] = None):
+        # A worker runtime (ex. one of execute_parallel's) only kasts; the sink, printer and instrumentation stay with the runtime that started it
         self._config_filepath = config_filepath
+        self.worker = worker
+        self.data_source_options = data_source_options or {}
         assert os.path.exists(self._config_filepath), f'Specified config filepath {self._config_filepath} cannot be found.'
 
         self.parse_config()
         self.import_kaster_methods()
         self.initialize_data_source()
 
-        self.spellbook = Spellbook(self.headers,self.kaster_definitions)
+        self.spellbook = Spellbook(self.headers,self.kaster_definitions,**self.spellbook_options)
+        if worker:
+            return
+        if self.instrumentation:
+            self.enable_instrumentation(self.stats_dump_path)
+        if self.buffered_output:
+            self.printer = KnowledgePrinter(**self.output_options)
+        if self.sink_type:
+            self.initialize_sink()
 
     def parse_config(self) -> None:
         # Set up config and read given file
         self.config = configparser.ConfigParser()
+        self.config.optionxform = ConfigName # Settings are case insensitive; names in sections keep their case
         self.config.read(self._config_filepath)
 
         # Extract paths from config
@@ -37,6 +112,43 @@ class KastRuntime():
         self.data_file_path = self.config['DEFAULT']['DataFile']
         self.data_type = self.config['DEFAULT']['DataType']
 
+        # Extract optional Spellbook settings, passed through as keyword arguments
+        self.spellbook_options = {
+            'track_changes': str_to_bool(self.config['DEFAULT'].get('TrackChanges', 'True')),
+            'max_workers': int(self.config['DEFAULT'].get('KastThreads', '0')),
+            'type_drift_policy': self.config['DEFAULT'].get('TypeDriftPolicy', 'warn'),
+            'history_size': int(self.config['DEFAULT'].get('HistorySize', '0')),
+            'history_sizes': self.get_config_section('KnowledgeHistory', int),
+            'snapshot_depth': int(self.config['DEFAULT'].get('SnapshotDepth', '0')),
+        }
+
+        # Window kasters declared in the config, as {output_name: 'statistic(input_name, size)'}
+        self.window_kasters = self.get_config_section('WindowKasters')
+
+        # Latency instrumentation, optionally written to a JSON file on exit
+        self.instrumentation = str_to_bool(self.config['DEFAULT'].get('Instrumentation', 'False'))
+        self.stats_dump_path = self.config['DEFAULT'].get('StatsDumpPath', None)
+
+        # Buffered, rate-limited console output for io, so printing does not limit the step rate
+        self.buffered_output = str_to_bool(self.config['DEFAULT'].get('BufferedOutput', 'False'))
+        print_color = self.config['DEFAULT'].get('PrintColor', 'auto')
+        self.output_options = {
+            'every': int(self.config['DEFAULT'].get('PrintEvery', '1')),
+            'max_rate': float(self.config['DEFAULT'].get('PrintRate', '0')),
+            'changed_only': str_to_bool(self.config['DEFAULT'].get('PrintChangedOnly', 'False')),
+            'flush_interval': float(self.config['DEFAULT'].get('PrintFlushInterval', '0.1')),
+            'colors': None if print_color == 'auto' else str_to_bool(print_color),
+        }
+
+        # Optional sink writing each executed step's knowledge to a file (ex. jsonl, csv or npz)
+        self.sink_type = self.config['DEFAULT'].get('SinkType', None)
+
+    def get_config_section(self, section: str, value_type: Callable = str) -> Dict:
+        # Read an optional config section as {option: value_type(value)}, excluding options inherited from DEFAULT
+        if not self.config.has_section(section):
+            return {}
+        return dict((str(option), value_type(value)) for option, value in self.config.items(section) if option not in self.config.defaults())
+
     def import_kaster_methods(self):
         self.kaster_definitions = []
         self.headers = []
@@ -44,6 +156,8 @@ class KastRuntime():
         # Import given python filepath and create a list of the functions in that file
         module = import_module(module_name='kaster_methods',file_to_import=self.kaster_methods_path)
         func_list = getmembers(module, isfunction)
+        # Parse the kaster file once for every function's input and output variable names
+        signature_index = index_kaster_signatures(self.kaster_methods_path)
 
         # For each of those functions, create a Kaster definition of form ([input_variables], [output_variables], callable_kaster_method)
         sum = 0
@@ -51,9 +165,15 @@ class KastRuntime():
             f_name = f[0]
             f_callable = f[1]
 
-            input_variables = getfullargspec(f_callable).args
-            # print(f'input vars are {len(input_variables)}')
-            output_variables = extract_return_names(f_name, self.kaster_methods_path)
+            # Skip functions imported into the kaster file (ex. kast.utils.decorators), which are not kasters themselves
+            if f_callable.__module__ != module.__name__:
+                continue
+
+            if f_name in signature_index:
+                input_variables, output_variables = signature_index[f_name]
+            else: # Functions not defined by a top level def statement (ex. assigned lambdas)
+                input_variables = getfullargspec(f_callable).args
+                output_variables = extract_return_names(f_name, self.kaster_methods_path)
 
             self.kaster_definitions.append((
                 input_variables,
@@ -64,30 +184,248 @@ class KastRuntime():
                 self.headers.append(var)
             sum = sum + len(input_variables)
 
+        # Window kasters from the config aggregate other knowledge over a window of steps
+        for output_variable, window_spec in self.window_kasters.items():
+            input_variable, window_method = parse_window_kaster(window_spec)
+            self.kaster_definitions.append(([input_variable], [output_variable], window_method))
+            self.headers.append(input_variable)
+
+        # Inputs produced by another kaster are chained high level knowledge, not low level headers
+        kaster_outputs = set()
+        for definition in self.kaster_definitions:
+            kaster_outputs.update(definition[1] or [])
+        self.headers = [var for var in self.headers if var not in kaster_outputs]
+
     def initialize_data_source(self):
         module = import_module(module_name='data_source',file_to_import=f'kast/utils/data_sources/{self.data_type}_data_source.py')
         class_reference = get_attribute_by_name(module,f'{self.data_type.title()}DataSource')
-        self.data_source = class_reference(self)
+        self.data_source = class_reference(self, **self.data_source_options)
 
-    def run_step(self, override=None, io=False):
+    def initialize_sink(self):
+        module = import_module(module_name='sink',file_to_import=f'kast/utils/sinks/{self.sink_type}_sink.py')
+        class_reference = get_attribute_by_name(module,f'{self.sink_type.title()}Sink')
+        self.sink = class_reference(self)
+
+    def write_to_sink(self, step: int) -> None:
+        # Pass the Spellbook's current knowledge to the sink as {name: value} dictionaries
+        self.sink.write(step,
+                        dict((name, knowledge.value) for name, knowledge in self.spellbook.low_level_knowledge.items()),
+                        dict((name, knowledge.value) for name, knowledge in self.spellbook.high_level_knowledge.items()))
+
+    def read_step(self, override=None) -> Dict:
+        # The step's low level information: the data source's next frame, or override in its place
         if override == None:
-            low_level_information = self.data_source.get_new_information()
-        else:
-            low_level_information = override
-            self.data_source.index += 1
-                
+            return self.data_source.get_new_information()
+        self.data_source.index += 1
+        return override
+
+    async def async_read_step(self, override=None) -> Dict:
+        # As read_step, awaiting the data source
+        if override == None:
+            return await self.data_source.async_get_new_information()
+        self.data_source.index += 1
+        return override
+
+    def update_step(self, low_level_information: Dict) -> None:
         self.spellbook.update_low_level_knowledge(low_level_information)
+
+    def kast_step(self) -> None:
         self.spellbook.kast()
+
+    async def async_kast_step(self) -> None:
+        await self.spellbook.async_kast()
+
+    def run_step(self, override=None, io=False):
+        self.update_step(self.read_step(override))
+        self.kast_step()
+        if self.sink is not None:
+            self.write_to_sink(self.data_source.index)
         
         if io:
-            print_data_source_step(self.data_source.index)
+            self.print_step(self.data_source.index, io)
+
+        return(self.spellbook)
+
+    def print_step(self, step: int, io) -> None:
+        # Print the step number and knowledge, through the buffered printer when BufferedOutput is set
+        if self.printer is None:
+            print_data_source_step(step)
             print_spellbook_knowledge(self,io)
+        else:
+            self.printer.print_spellbook(step, self.spellbook, io)
+
+    def print_ender(self) -> None:
+        # Write out any buffered step output before the closing banner
+        if self.printer is not None:
+            self.printer.flush()
+        print_kast_ender()
+
+    def finish_execution(self) -> None:
+        # Close the sink, the data source and the Spellbook's thread pool once the data source is exhausted, then print the closing banner
+        if self.sink is not None:
+            self.sink.close()
+        if self.data_source is not None:
+            self.data_source.close()
+        if getattr(self.spellbook, 'executor', None) is not None: # Only a Spellbook with KastThreads holds a thread pool to shut down
+            self.spellbook.close()
+        self.print_ender()
+
+    def enable_instrumentation(self, dump_path: Optional[str] = None) -> KastStats:
+        # Time every step stage and kaster call into self.stats, writing its summary to dump_path when the interpreter exits
+        # Timed versions of the stage methods replace the untimed ones only once enabled, so uninstrumented runs pay nothing
+        self.stats = KastStats()
+        self.spellbook.enable_stats(self.stats)
+        for method_name, stage in TIMED_STAGES.items():
+            setattr(self, method_name, self.timed_stage(stage, getattr(type(self), method_name)))
+        for method_name, stage in ASYNC_TIMED_STAGES.items():
+            setattr(self, method_name, self.async_timed_stage(stage, getattr(type(self), method_name)))
+        if dump_path:
+            atexit.register(self.stats.dump, dump_path)
+        return self.stats
+
+    def timed_stage(self, stage: str, method: Callable) -> Callable:
+        # method bound to this runtime, recording the latency of each call as stage
+        record_stage = self.stats.record_stage
+        def timed_method(*args, **kwargs):
+            start_ns = perf_counter_ns()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                record_stage(stage, perf_counter_ns() - start_ns)
+        return timed_method
+
+    def async_timed_stage(self, stage: str, method: Callable) -> Callable:
+        # As timed_stage, for async def methods
+        record_stage = self.stats.record_stage
+        async def timed_method(*args, **kwargs):
+            start_ns = perf_counter_ns()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                record_stage(stage, perf_counter_ns() - start_ns)
+        return timed_method
+
+    async def async_run_step(self, override=None, io=False):
+        # As run_step, awaiting the data source and kasting with Spellbook.async_kast, so async def kasters run concurrently
+        self.update_step(await self.async_read_step(override))
+        await self.async_kast_step()
+        if self.sink is not None:
+            self.write_to_sink(self.data_source.index)
+
+        if io:
+            self.print_step(self.data_source.index, io)
 
         return(self.spellbook)
 
+    async def async_execute(self, io=False):
+        # As execute, as an async iterator for use within a running event loop (async for spellbook in runtime.async_execute())
+        print_kast_header()
+        while await self.data_source.async_has_more():
+            try:
+                self.spellbook = await self.async_run_step(io=io)
+            except EOFError: # The data source was closed while waiting for its next frame
+                break
+            yield self.spellbook
+        self.finish_execution()
+
     def execute(self, io=False):
         print_kast_header()
         while self.data_source.has_more():
-            self.spellbook = self.run_step(io=io)
+            try:
+                self.spellbook = self.run_step(io=io)
+            except EOFError: # The data source was closed while waiting for its next frame
+                break
             yield self.spellbook
-        print_kast_ender()
+        self.finish_execution()
+
+    def read_block(self, block_size: int) -> Dict:
+        return self.data_source.get_new_block(block_size)
+
+    def kast_block(self, low_level_block: Dict) -> Dict:
+        return self.spellbook.kast_block(low_level_block)
+
+    def run_block(self, block_size: int, io=False):
+        first_row_index = self.data_source.index
+        kasted_block = self.kast_block(self.read_block(block_size))
+        if self.sink is not None:
+            self.write_block_to_sink(first_row_index, kasted_block)
+
+        if io:
+            self.print_step(self.data_source.index, io)
+
+        return(kasted_block)
+
+    def execute_batch(self, block_size=1024, per_row=False, io=False):
+        # Kast the data source in blocks of block_size rows, calling vectorized kasters once per block
+        # Yields each kasted block as {name: array with one entry per row}, or with per_row, the Spellbook set to each row in turn
+        print_kast_header()
+        while self.data_source.has_more():
+            first_row_index = self.data_source.index
+            try:
+                kasted_block = self.run_block(block_size, io=(not per_row) and io)
+            except EOFError: # The data source was closed while waiting for its next frames
+                break
+            if per_row:
+                num_rows = self.data_source.index - first_row_index
+                for row_index in range(num_rows):
+                    self.spellbook.set_knowledge_from_block(kasted_block, row_index)
+                    if io:
+                        self.print_step(first_row_index + row_index + 1, io)
+                    yield self.spellbook
+            else:
+                yield kasted_block
+        self.finish_execution()
+
+    def write_block_to_sink(self, first_row_index: int, kasted_block: Dict) -> None:
+        # Pass every row of a kasted block to the sink, as run_step would have one step at a time
+        low_level_names = [name for name in kasted_block if name in self.spellbook.low_level_knowledge]
+        high_level_names = [name for name in kasted_block if name in self.spellbook.high_level_knowledge]
+        for row_index in range(self.data_source.index - first_row_index):
+            self.sink.write(first_row_index + row_index + 1,
+                            dict((name, kasted_block[name][row_index]) for name in low_level_names),
+                            dict((name, kasted_block[name][row_index]) for name in high_level_names))
+
+    def execute_parallel(self, num_workers=None, shard_size=None, sink=None, io=False):
+        # Replay a finite data source across worker processes, each kasting a contiguous shard of rows with its own Spellbook
+        # Yields (step, {low level name: value}, {high level name: value}) for every row in row order, also passing each to sink.write if given and closing sink at the end
+        # Every shard starts from fresh knowledge, so kaster methods must not keep state between steps; window kasters are
+        # warmed up by also kasting the rows before each shard that their windows reach back over
+        sink = sink if sink is not None else self.sink
+        num_rows = self.data_source.count_rows()
+        num_workers = num_workers or os.cpu_count() or 1
+        shard_size = shard_size or max(1, -(-num_rows // (num_workers * 4))) # Several shards per worker keeps workers busy when shards run unevenly
+        shard_starts = list(range(0, num_rows, shard_size))
+        window_warmup = self.spellbook.window_warmup_steps()
+        warmups = [min(start, window_warmup) for start in shard_starts]
+        # Shard start rows are located once here, so each worker reads only its own shard rather than the whole data file
+        positions = self.data_source.locate_rows([start - warmup for start, warmup in zip(shard_starts, warmups)])
+        shards = iter(zip(shard_starts, positions, warmups))
+        worker_options = self.data_source.worker_options()
+
+        print_kast_header()
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            # Only a few shards are in flight at once, so finished results never pile up far ahead of the consumer
+            pending_shards = deque()
+            def submit_next_shard():
+                start, position, warmup = next(shards, (None, None, 0))
+                if start is not None:
+                    pending_shards.append(executor.submit(replay_rows, self._config_filepath, start, min(start + shard_size, num_rows), position, warmup, worker_options))
+            for i in range(num_workers * 2):
+                submit_next_shard()
+
+            while pending_shards:
+                shard_results = pending_shards.popleft().result()
+                submit_next_shard()
+                for step, low_level_values, high_level_values in shard_results:
+                    if sink is not None:
+                        sink.write(step, low_level_values, high_level_values)
+                    if io:
+                        if self.printer is None:
+                            print_data_source_step(step)
+                            print_knowledge_values(low_level_values, high_level_values, io)
+                        else:
+                            self.printer.print_values(step, low_level_values, high_level_values, io)
+                    yield step, low_level_values, high_level_values
+        if sink is not self.sink:
+            sink.close() # A sink passed in is closed here once every row is written; the runtime's own is closed by finish_execution
+        self.finish_execution()
@@ -6,11 +6,26 @@
 #
 # Licensed under the NASA Open Source Agreement version 1.3
 # See "NOSA GSC-19360-1 KAST.pdf"
+import numbers
+import numpy as np
 from warnings import warn
-from typing import Callable
+from typing import Callable, List
+
+# How Knowledge.update treats a value whose type differs from the knowledge's previous value
+TYPE_DRIFT_POLICIES = ('off', 'warn', 'warn_once', 'strict', 'coerce')
+
+def values_equal(a, b) -> bool:
+    # Elementwise equality of two values, counting NaN as equal to NaN
+    try:
+        return np.array_equal(a, b, equal_nan=True)
+    except TypeError: # equal_nan is only supported for numeric values
+        return np.array_equal(a, b)
 
 class Knowledge():
-    def __init__(self, _label: str, _name: str, _value=None):
+    # Fixed attributes keep each Knowledge object small; the value itself lives in a slot of a (possibly shared) value list
+    __slots__ = ('label', 'name', '_type', '_values', '_slot', '_policy', 'history')
+
+    def __init__(self, _label: str, _name: str, _value=None, _policy: str = 'warn'):
         """
         Class representing a single datapoint of knowledge.
 
@@ -22,17 +37,95 @@ class Knowledge():
             What does this knowledge represent? 
         _value : variable
             Information representing the knowledge
+        _policy : str
+            Type drift policy applied on update; one of TYPE_DRIFT_POLICIES
+                off: never compare types
+                warn: warn on every change of type
+                warn_once: warn on the first change of type only
+                strict: raise a TypeError on any change of type
+                coerce: convert new values to the type of the first non-None value, raising a TypeError if that would change them;
+                        integers updated with fractional values are widened to float instead, arrays and numpy scalars otherwise
+                        keep their dtype, and arrays their shape; None is stored as is, without changing the coerced type
         """
         self.label = _label
         self.name = _name
         self.value = _value
         self._type = type(self.value)
+        self._policy = _policy
+        self.history = None # Optional KnowledgeHistory of recent values, recorded by the Spellbook after every step
     
+    @property
+    def value(self):
+        return self._values[self._slot]
+
+    @value.setter
+    def value(self, value):
+        try:
+            self._values[self._slot] = value
+        except AttributeError: # Not yet stored anywhere; hold the value in a private single-slot list
+            self._values = [value]
+            self._slot = 0
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    def bind(self, values: List, slot: int) -> None:
+        # Move this knowledge's value into values[slot]; reads and updates then go straight to that list
+        values[slot] = self.value
+        self._values = values
+        self._slot = slot
+
     def update(self,value):
+        if self._policy == 'off':
+            self.value = value
+            return
+        if value is None and self._policy == 'coerce':
+            self.value = value # Missing values pass through, and later values are still coerced to the same type
+            return
         if type(value) != self._type and self._type != type(None):
-            warn(f"\n\tCaution: {self.name} is being updated with new type; changing {self._type} to {type(value)}")
+            value = self.handle_type_drift(value)
         self._type = type(value)
         self.value = value
+
+    def handle_type_drift(self, value):
+        # Apply the type drift policy to a value of a new type, returning the value to store
+        if self._policy == 'strict':
+            raise TypeError(f"Knowledge {self.name} holds {self._type}, but was updated with {type(value)}.")
+        if self._policy == 'coerce':
+            try:
+                return self.coerce(value)
+            except (TypeError, ValueError) as error:
+                raise TypeError(f"Knowledge {self.name} could not coerce {type(value)} to {self._type}: {error}") from error
+        warn(f"\n\tCaution: {self.name} is being updated with new type; changing {self._type} to {type(value)}")
+        if self._policy == 'warn_once':
+            self._policy = 'off' # Already warned, so later updates skip the check entirely
+        return value
     
+    def coerce(self, value):
+        # Convert value to the type of the current value, raising a ValueError rather than losing information
+        # Integer knowledge updated with a fractional value is widened to float, as telemetry often switches between the two
+        if issubclass(self._type, (np.ndarray, np.generic)):
+            current = self.value
+            array = np.asarray(value)
+            if current is None: # Stored as None since; only the type is known
+                return array if self._type is np.ndarray else self._type(value)
+            if array.shape != np.shape(current):
+                raise ValueError(f"shape {array.shape} does not match {np.shape(current)}")
+            if current.dtype.kind in 'iu' and array.dtype.kind == 'f' and not np.all(np.isfinite(array) & (array == np.round(array))):
+                converted = array.astype(np.float64)
+            else:
+                converted = array.astype(current.dtype)
+                if not values_equal(converted, array):
+                    raise ValueError(f"converting to {current.dtype} would change its value")
+            return converted if self._type is np.ndarray else converted[()]
+        if issubclass(self._type, numbers.Integral) and self._type is not bool and isinstance(value, numbers.Real) \
+                and not isinstance(value, numbers.Integral) and not float(value).is_integer():
+            return float(value)
+        converted = self._type(value)
+        if isinstance(value, numbers.Number) and isinstance(converted, numbers.Number) and converted != value and not (converted != converted and value != value): # NaN stays NaN
+            raise ValueError(f"converting to {self._type} would change its value")
+        return converted
+
     def __str__(self):
         return f"({self.name}: {self.value})"
@@ -0,0 +1,64 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import numpy as np
+
+def make_memo_key(value) -> Optional[Hashable]:
+    """
+    Build a hashable key representing a kaster input value, or None if the value cannot be keyed.
+    Types are part of the key, so that (for example) 1 and 1.0 are cached separately.
+    """
+    if isinstance(value, np.ndarray):
+        # object arrays hold pointers, so their bytes say nothing about the objects' contents
+        if value.dtype == object:
+            return None
+        return (np.ndarray, value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        item_keys = tuple(make_memo_key(item) for item in value)
+        return None if None in item_keys else (type(value), item_keys)
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return (type(value), value)
+
+class KasterMemo():
+    def __init__(self, maxsize: int):
+        """
+        Least-recently-used cache of a kaster method's returned values, keyed on its input values.
+
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of cached input combinations
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, method: Callable, input_values: Tuple):
+        key = make_memo_key(tuple(input_values))
+        if key is not None and key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        returned_knowledge = method(*input_values)
+        if key is not None:
+            self.entries[key] = returned_knowledge
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return returned_knowledge
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
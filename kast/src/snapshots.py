@@ -0,0 +1,88 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+from typing import Dict, List, Optional, Tuple
+
+from kast.src.knowledge import Knowledge
+
+class KnowledgeSnapshot():
+    __slots__ = ('version', 'step', 'values', 'slots', 'num_low_level')
+
+    def __init__(self, version: int, step: int, values: Tuple, slots: Dict[str, int], num_low_level: int):
+        """
+        Immutable copy of every knowledge value at the end of one step, safe to read from any thread.
+        Values are held by reference, so values that are themselves mutable (ex. views into a data source's buffer) are not copied.
+        """
+        self.version = version
+        self.step = step
+        self.values = values
+        self.slots = slots # Shared by every snapshot of a Spellbook
+        self.num_low_level = num_low_level
+
+    def __getitem__(self, name: str):
+        return self.values[self.slots[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.slots
+
+    def get(self, name: str, default=None):
+        slot = self.slots.get(name)
+        return default if slot is None else self.values[slot]
+
+    def low_level_knowledge(self) -> Dict:
+        # {name: value} of every low level knowledge item
+        return dict((name, self.values[slot]) for name, slot in self.slots.items() if slot < self.num_low_level)
+
+    def high_level_knowledge(self) -> Dict:
+        # {name: value} of every high level knowledge item
+        return dict((name, self.values[slot]) for name, slot in self.slots.items() if slot >= self.num_low_level)
+
+class SnapshotBuffer():
+    def __init__(self, knowledge_by_slot: List[Knowledge], num_low_level: int, depth: int = 2):
+        """
+        Publishes a KnowledgeSnapshot of a Spellbook's knowledge after every step, keeping the last depth snapshots.
+        Publishing replaces a single reference, so readers on other threads always see a complete step without taking a lock,
+        and may hold on to a snapshot for as long as they like.
+
+        Parameters
+        ----------
+        knowledge_by_slot : List[Knowledge]
+            The Spellbook's knowledge, in value slot order
+        num_low_level : int
+            Number of low level knowledge items, which come first in slot order
+        depth : int
+            Number of recent snapshots that can be fetched by version (default 2, double buffering)
+        """
+        if depth < 1:
+            raise ValueError(f'SnapshotBuffer depth must be at least 1, not {depth}.')
+        self.slots = dict((knowledge.name, slot) for slot, knowledge in enumerate(knowledge_by_slot))
+        self.num_low_level = num_low_level
+        self.depth = depth
+        self.buffers: List[Optional[KnowledgeSnapshot]] = [None] * depth
+        self.latest_snapshot: Optional[KnowledgeSnapshot] = None
+        self.version = 0 # Version of the latest snapshot; 0 until the first is published
+
+    def publish(self, step: int, knowledge_values: List) -> KnowledgeSnapshot:
+        # Called by the kasting thread once a step is complete
+        snapshot = KnowledgeSnapshot(self.version + 1, step, tuple(knowledge_values), self.slots, self.num_low_level)
+        self.buffers[snapshot.version % self.depth] = snapshot
+        self.latest_snapshot = snapshot # Readers switch to the new snapshot here
+        self.version = snapshot.version
+        return snapshot
+
+    def latest(self) -> Optional[KnowledgeSnapshot]:
+        # Most recently published snapshot, or None before the first step
+        return self.latest_snapshot
+
+    def at_version(self, version: int) -> KnowledgeSnapshot:
+        # Snapshot with the given version, if it is one of the last depth published
+        snapshot = self.buffers[version % self.depth]
+        if snapshot is None or snapshot.version != version:
+            raise KeyError(f'Snapshot version {version} is not held; the latest version is {self.version}, and the last {self.depth} are held.')
+        return snapshot
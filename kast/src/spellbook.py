@@ -8,11 +8,44 @@
 # See "NOSA GSC-19360-1 KAST.pdf"
 
 # Class to store knowledge (and possibly predicate) information, as well as methods to access and update that information
-from typing import List, Dict, Tuple, Callable
+from typing import List, Dict, Tuple, Callable, Set, Optional
+from heapq import heappush, heappop
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from inspect import iscoroutinefunction
+import asyncio
+from time import perf_counter_ns
+import numpy as np
 
-from kast.src.knowledge import Knowledge
+from kast.src.knowledge import Knowledge, TYPE_DRIFT_POLICIES
+from kast.src.memoization import KasterMemo
+from kast.src.history import KnowledgeHistory
+from kast.src.snapshots import SnapshotBuffer
+from kast.src.instrumentation import KastStats
+from kast.src.windows import KasterWindow
+from kast.utils.functions import value_has_changed, stack_values
+
+def make_slot_getter(slots: List[int]) -> Callable:
+    # Build a function returning the values at the given slots of a value list as a tuple, in slot order
+    if len(slots) == 0:
+        return lambda values: ()
+    if len(slots) == 1:
+        slot = slots[0]
+        return lambda values: (values[slot],)
+    return itemgetter(*slots)
+
+def kaster_name(kaster: 'Kaster') -> str:
+    # Name a kaster by its method, as reported in memo and latency stats
+    return getattr(kaster.method, '__name__', str(kaster.method))
+
+def check_output_count(kaster: 'Kaster', returned_knowledge) -> None:
+    # Raise rather than silently dropping or leaving stale outputs when a kaster returns the wrong number of values
+    if len(returned_knowledge) != len(kaster.output_vars):
+        raise ValueError(f'Kaster {kaster_name(kaster)} returned {len(returned_knowledge)} values, but declares {len(kaster.output_vars)} output variables {kaster.output_vars}.')
 
 class Kaster():
+    __slots__ = ('input_vars', 'output_vars', 'method', 'vectorized', 'memo', 'window', 'is_async', 'input_slots', 'output_slots', 'output_consumers', 'get_inputs')
+
     def __init__(self,
                  input_vars: List[str],
                  output_vars: List[str],
@@ -21,36 +54,99 @@ class Kaster():
         self.input_vars = input_vars
         self.output_vars = output_vars
         self.method = method
+        self.vectorized = getattr(method, 'kast_vectorized', False) # Set by the kast.utils.decorators.vectorized decorator
+        memo_size = getattr(method, 'kast_memoize_size', None) # Set by the kast.utils.decorators.memoize decorator
+        self.memo = KasterMemo(memo_size) if isinstance(memo_size, int) and memo_size > 0 else None
+        window_spec = getattr(method, 'kast_window', None) # Set by the kast.utils.decorators.window decorator
+        self.window = KasterWindow(*window_spec) if isinstance(window_spec, tuple) else None
+        self.is_async = iscoroutinefunction(method) # async def kasters are awaited by Spellbook.async_kast
+        if self.is_async and self.memo is not None:
+            raise ValueError(f'Kaster {method.__name__} is an async method, which cannot be memoized.')
+        # Positions of input and output knowledge values in the Spellbook's value list, resolved once the Spellbook is built
+        self.bind([], [], [])
+
+    def bind(self, input_slots: List[int], output_slots: List[int], output_consumers: List[List[int]]) -> None:
+        # Precompile where this kaster reads its positional arguments and writes its outputs, and which kasters consume each output
+        self.input_slots = input_slots
+        self.output_slots = output_slots
+        self.output_consumers = output_consumers
+        self.get_inputs = make_slot_getter(input_slots)
  
 class Spellbook():
+    # Type drift policy given to every Knowledge object (see kast.src.knowledge.TYPE_DRIFT_POLICIES)
+    type_drift_policy = 'warn'
+    # Number of steps kasted so far, and the knowledge whose values are recorded in a history after each step
+    step = 0
+    recorded_knowledge: Tuple[Knowledge, ...] = ()
+    # Indices of windowed kasters, which run on every step regardless of change tracking
+    windowed_kasters: Tuple[int, ...] = ()
+    # Are any kasters async def methods? These can only be kasted by async_kast
+    has_async_kasters = False
+    # Snapshots of every step's knowledge for readers on other threads; None unless snapshot_depth is set
+    snapshots: Optional[SnapshotBuffer] = None
+    # Latency instrumentation; None unless enable_stats is called
+    stats: Optional[KastStats] = None
+
     def __init__(self,
                  low_level_knowledge_headers: List[str], 
                  kaster_definition_tuples: List[Tuple[str, str, Callable]],
+                 track_changes: bool = True,
+                 max_workers: int = 0,
+                 type_drift_policy: str = 'warn',
+                 history_size: int = 0,
+                 history_sizes: Dict[str, int] = None,
+                 snapshot_depth: int = 0
                  ) -> None:
+        if type_drift_policy not in TYPE_DRIFT_POLICIES:
+            raise ValueError(f'Unrecognized type drift policy {type_drift_policy}; expected one of {list(TYPE_DRIFT_POLICIES)}.')
+        self.type_drift_policy = type_drift_policy
 
         # Initialize data structures
         self.low_level_knowledge: Dict[str, Knowledge] = {}
         self.high_level_knowledge: Dict[str, Knowledge] = {}
         self.kasters: List[Kaster] = []
 
+        # Knowledge values are held in one list, indexed by each Knowledge object's slot, so kasting never looks values up by name
+        self.knowledge_values: List = []
+        self.knowledge_by_slot: List[Knowledge] = []
+
+        # Change tracking: only kasters downstream of knowledge that changed since the last step are re-run
+        self.track_changes = track_changes
+        self.changed_knowledge: Set[str] = set()
+        self.knowledge_consumers: Dict[str, List[int]] = {}
+        self.knowledge_producers: Dict[str, List[int]] = {}
+        self.pending_full_kast = True # Every kaster runs on the first step, regardless of changes
+
+        # Parallel kasting: independent kasters of one step run on a thread pool when more than one worker is requested
+        self.kaster_levels: List[int] = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kaster') if isinstance(max_workers, int) and max_workers > 1 else None
+
         # Initialize functionality
         # self.init_parser() - need to consider more, maybe should stay in parser
         self.init_low_level_knowledge(low_level_knowledge_headers)
         self.init_kasters(kaster_definition_tuples)
         self.init_high_level_knowledge()
+        self.init_knowledge_store()
+        self.init_dependency_graph()
+        self.init_knowledge_history(history_size, history_sizes or {})
+        if snapshot_depth > 0:
+            self.snapshots = SnapshotBuffer(self.knowledge_by_slot, len(self.low_level_knowledge), snapshot_depth)
 
     def init_low_level_knowledge(self, name_list: List[str]) -> None:
         # Generate low-level-knowledge objects for every item in name_list
         # (ex. one for every column in a dataframe)
         for name in name_list:
-            self.low_level_knowledge[name] = Knowledge('low',name)
+            self.low_level_knowledge[name] = Knowledge('low',name,_policy=self.type_drift_policy)
 
     def init_kasters(self, tuple_list: List[Tuple]) -> None:
         # Generate namedtuples of ways to go from high to low level knowledge
-        available_low_level_knowledge = self.low_level_knowledge.keys()
+        # Kaster inputs may be low level knowledge, or the output of another kaster (chained kasting)
+        available_knowledge = set(self.low_level_knowledge.keys())
+        for tuple_entry in tuple_list:
+            available_knowledge.update(tuple_entry[1] or [])
         for tuple_entry in tuple_list:
             required_input = tuple_entry[0]
-            if set(required_input).issubset(set(available_low_level_knowledge)):
+            if set(required_input).issubset(available_knowledge):
                 self.kasters.append(Kaster(tuple_entry[0],tuple_entry[1],tuple_entry[2]))
             else:
                 raise KeyError(f'Kaster input variable {required_input} was not found in the available low level knowledge.')
@@ -59,21 +155,302 @@ class Spellbook():
         # Generate high-level-knowledge objects for every output variable defined in kasters
         for kaster in self.kasters:
             for output_variable in kaster.output_vars:
-                self.high_level_knowledge[output_variable] = Knowledge('high',output_variable)
+                self.high_level_knowledge[output_variable] = Knowledge('high',output_variable,_policy=self.type_drift_policy)
+
+    def init_knowledge_store(self) -> None:
+        # Preallocate one value slot per low and high level knowledge, and move every knowledge value into its slot
+        # Knowledge first seen at runtime keeps its own storage, since no kaster reads it
+        self.knowledge_by_slot = list(self.low_level_knowledge.values()) + list(self.high_level_knowledge.values())
+        self.knowledge_values = [None] * len(self.knowledge_by_slot)
+        for slot, knowledge in enumerate(self.knowledge_by_slot):
+            knowledge.bind(self.knowledge_values, slot)
+
+    def init_knowledge_history(self, history_size: int, history_sizes: Dict[str, int]) -> None:
+        # Give knowledge a history of its last history_size values, or of the size listed for its name in history_sizes
+        self.recorded_knowledge = []
+        for knowledge in self.knowledge_by_slot:
+            capacity = history_sizes.get(knowledge.name, history_size)
+            if capacity > 0:
+                knowledge.history = KnowledgeHistory(capacity)
+                self.recorded_knowledge.append(knowledge)
+
+    def record_history(self, num_steps: int = 1) -> None:
+        # Advance the step count, recording the current value of every knowledge item with a history
+        self.step += num_steps
+        for knowledge in self.recorded_knowledge:
+            knowledge.history.append(self.step, knowledge.value)
+
+    def window_warmup_steps(self) -> int:
+        # Steps to kast before a window kaster's output matches a run from the first step: size - 1 per window, summed over
+        # all of them so that windows over other windows' outputs are covered too
+        return sum(self.kasters[kaster_index].window.size - 1 for kaster_index in self.windowed_kasters)
+
+    def publish_snapshot(self) -> None:
+        # Publish the knowledge of the step just kasted to snapshot readers
+        if self.snapshots is not None:
+            self.snapshots.publish(self.step, self.knowledge_values)
+
+    def init_dependency_graph(self) -> None:
+        # Order kasters so that each one runs after every kaster producing its inputs (stable with respect to definition order)
+        self.kasters = [self.kasters[kaster_index] for kaster_index in self.resolve_execution_order()]
+
+        # Map each knowledge name to the indices of the kasters that produce or consume it, so a change can be traced to the kasters it affects
+        self.knowledge_producers = {}
+        self.knowledge_consumers = {}
+        for kaster_index, kaster in enumerate(self.kasters):
+            for output_variable in kaster.output_vars:
+                self.knowledge_producers.setdefault(output_variable, []).append(kaster_index)
+            for input_variable in kaster.input_vars:
+                self.knowledge_consumers.setdefault(input_variable, []).append(kaster_index)
+
+        self.windowed_kasters = [kaster_index for kaster_index, kaster in enumerate(self.kasters) if kaster.window is not None]
+        self.has_async_kasters = any(kaster.is_async for kaster in self.kasters)
+
+        # Resolve every kaster input and output name to its value slot once, reading chained inputs from high level knowledge
+        for kaster in self.kasters:
+            kaster.bind([(self.high_level_knowledge if input_variable in self.knowledge_producers else self.low_level_knowledge)[input_variable].slot for input_variable in kaster.input_vars],
+                        [self.high_level_knowledge[output_variable].slot for output_variable in kaster.output_vars],
+                        [self.knowledge_consumers.get(output_variable, []) for output_variable in kaster.output_vars])
+
+        # A kaster's level is one more than the deepest kaster producing its inputs; kasters sharing a level never depend on each other
+        self.kaster_levels = []
+        for kaster in self.kasters:
+            dependency_levels = [self.kaster_levels[producer_index] for input_variable in kaster.input_vars for producer_index in self.knowledge_producers.get(input_variable, ())]
+            self.kaster_levels.append(max(dependency_levels) + 1 if dependency_levels else 0)
+
+    def resolve_execution_order(self) -> List[int]:
+        # Topologically sort kasters by their input/output variables (Kahn's algorithm, lowest definition index first)
+        producers = {}
+        for kaster_index, kaster in enumerate(self.kasters):
+            for output_variable in kaster.output_vars:
+                producers.setdefault(output_variable, []).append(kaster_index)
+
+        dependents = [[] for kaster in self.kasters]
+        num_dependencies = [0 for kaster in self.kasters]
+        for kaster_index, kaster in enumerate(self.kasters):
+            dependencies = set()
+            for input_variable in kaster.input_vars:
+                dependencies.update(producers.get(input_variable, ()))
+            for dependency_index in dependencies:
+                dependents[dependency_index].append(kaster_index)
+            num_dependencies[kaster_index] = len(dependencies)
+
+        ready = []
+        for kaster_index, count in enumerate(num_dependencies):
+            if count == 0:
+                heappush(ready, kaster_index)
+        order = []
+        while ready:
+            kaster_index = heappop(ready)
+            order.append(kaster_index)
+            for dependent_index in dependents[kaster_index]:
+                num_dependencies[dependent_index] -= 1
+                if num_dependencies[dependent_index] == 0:
+                    heappush(ready, dependent_index)
+
+        if len(order) != len(self.kasters):
+            cyclic_kasters = [getattr(kaster.method, '__name__', str(kaster.method)) for kaster_index, kaster in enumerate(self.kasters) if kaster_index not in order]
+            raise ValueError(f'Kaster dependency cycle detected between kasters {cyclic_kasters}.')
+        return order
 
     def update_low_level_knowledge(self,new_frame: Dict) -> None:
         # Update low-level-knowledge with new frame of data
         for name in new_frame.keys():
             if name not in self.low_level_knowledge.keys(): # If presented with an unseen piece of knowledge, create a new low-level representation
-                self.low_level_knowledge[name] = Knowledge('low',name,new_frame[name])
+                self.low_level_knowledge[name] = Knowledge('low',name,new_frame[name],self.type_drift_policy)
+                self.changed_knowledge.add(name)
+            elif self.track_changes and value_has_changed(self.low_level_knowledge[name].value, new_frame[name]):
+                self.changed_knowledge.add(name)
             self.low_level_knowledge[name].update(new_frame[name])
 
+    def schedule_kasters(self) -> Tuple[bool, List[int], Set[int]]:
+        # Every kaster runs when change tracking is off, or when nothing has been kasted yet
+        kast_everything = not self.track_changes or self.pending_full_kast
+        if kast_everything:
+            pending_kasters = list(range(len(self.kasters)))
+        else:
+            # Otherwise only the consumers of changed knowledge run; a sorted list is already a valid heap
+            pending_kasters = sorted(set(kaster_index for name in self.changed_knowledge for kaster_index in self.knowledge_consumers.get(name, ())).union(self.windowed_kasters))
+        self.changed_knowledge.clear()
+        self.pending_full_kast = False
+        return kast_everything, pending_kasters, set(pending_kasters)
+
     def kast(self) -> None:
+        if self.has_async_kasters:
+            raise TypeError('Spellbook has async kasters, which must be kasted with async_kast.')
+        kast_everything, pending_kasters, scheduled_kasters = self.schedule_kasters()
+
+        if self.executor is None:
+            # Indices follow execution order, so popping the lowest index always respects kaster dependencies
+            while pending_kasters:
+                kaster = self.kasters[heappop(pending_kasters)]
+                returned_knowledge = self.call_kaster(kaster, kaster.get_inputs(self.knowledge_values))
+                for kaster_index in self.commit_kaster_outputs(kaster, returned_knowledge, kast_everything, scheduled_kasters):
+                    heappush(pending_kasters, kaster_index)
+        else:
+            # Kasters run one level at a time: every pending kaster of the lowest level is kasted concurrently,
+            # then outputs are committed in execution order so results match a sequential kast
+            pending_kasters = [(self.kaster_levels[kaster_index], kaster_index) for kaster_index in pending_kasters]
+            while pending_kasters:
+                current_level = pending_kasters[0][0]
+                level_kasters = []
+                while pending_kasters and pending_kasters[0][0] == current_level:
+                    level_kasters.append(self.kasters[heappop(pending_kasters)[1]])
+                level_inputs = [kaster.get_inputs(self.knowledge_values) for kaster in level_kasters]
+                if len(level_kasters) == 1:
+                    level_returns = [self.call_kaster(level_kasters[0], level_inputs[0])]
+                else:
+                    level_returns = list(self.executor.map(self.call_kaster, level_kasters, level_inputs))
+                for kaster, returned_knowledge in zip(level_kasters, level_returns):
+                    for kaster_index in self.commit_kaster_outputs(kaster, returned_knowledge, kast_everything, scheduled_kasters):
+                        heappush(pending_kasters, (self.kaster_levels[kaster_index], kaster_index))
+
+        self.record_history()
+        self.publish_snapshot()
+
+    async def async_kast(self) -> None:
+        # Kast as kast() does, one dependency level at a time, awaiting the async kasters of each level concurrently
+        # Synchronous kasters run inline, or on the thread pool when one is configured, so they never block the event loop for long
+        kast_everything, pending_kasters, scheduled_kasters = self.schedule_kasters()
+        pending_kasters = [(self.kaster_levels[kaster_index], kaster_index) for kaster_index in pending_kasters]
+        while pending_kasters:
+            current_level = pending_kasters[0][0]
+            level_kasters = []
+            while pending_kasters and pending_kasters[0][0] == current_level:
+                level_kasters.append(self.kasters[heappop(pending_kasters)[1]])
+            level_inputs = [kaster.get_inputs(self.knowledge_values) for kaster in level_kasters]
+            level_returns = await asyncio.gather(*[self.async_call_kaster(kaster, input_values) for kaster, input_values in zip(level_kasters, level_inputs)])
+            for kaster, returned_knowledge in zip(level_kasters, level_returns):
+                for kaster_index in self.commit_kaster_outputs(kaster, returned_knowledge, kast_everything, scheduled_kasters):
+                    heappush(pending_kasters, (self.kaster_levels[kaster_index], kaster_index))
+
+        self.record_history()
+        self.publish_snapshot()
+
+    async def async_call_kaster(self, kaster: Kaster, input_values: Tuple):
+        if not kaster.is_async:
+            if self.executor is None:
+                return self.call_kaster(kaster, input_values)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.call_kaster, kaster, input_values)
+        start_ns = perf_counter_ns()
+        returned_knowledge = await kaster.method(*input_values)
+        if self.stats is not None:
+            self.stats.record_kaster(kaster_name(kaster), perf_counter_ns() - start_ns)
+        if kaster.window is not None:
+            returned_knowledge = kaster.window.push(returned_knowledge)
+        return returned_knowledge
+
+    def call_kaster(self, kaster: Kaster, input_values: Tuple):
+        if kaster.memo is None:
+            returned_knowledge = kaster.method(*input_values) # Input values are ordered as the kasting method's arguments
+        else:
+            returned_knowledge = kaster.memo.call(kaster.method, input_values) # Reuse returned values cached for identical inputs
+        if kaster.window is not None:
+            returned_knowledge = kaster.window.push(returned_knowledge) # Slide each output's window, returning its statistic
+        return returned_knowledge
+
+    def call_vectorized_kaster(self, kaster: Kaster, columns: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        # Vectorized kasters receive whole columns and return one column per output variable
+        returned_columns = kaster.method(**dict([(variable, columns[variable]) for variable in kaster.input_vars]))
+        return [np.asarray(column) for column in returned_columns]
+
+    def enable_stats(self, stats: KastStats) -> None:
+        # Time every kaster call into stats; the call methods are only replaced once enabled, so untimed kasting pays nothing for it
+        self.stats = stats
+        self.call_kaster = self.timed_call_kaster
+        self.call_vectorized_kaster = self.timed_call_vectorized_kaster
+
+    def timed_call_kaster(self, kaster: Kaster, input_values: Tuple):
+        start_ns = perf_counter_ns()
+        try:
+            return Spellbook.call_kaster(self, kaster, input_values)
+        finally:
+            self.stats.record_kaster(kaster_name(kaster), perf_counter_ns() - start_ns)
+
+    def timed_call_vectorized_kaster(self, kaster: Kaster, columns: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        start_ns = perf_counter_ns()
+        try:
+            return Spellbook.call_vectorized_kaster(self, kaster, columns)
+        finally:
+            self.stats.record_kaster(kaster_name(kaster), perf_counter_ns() - start_ns)
+
+    def commit_kaster_outputs(self, kaster: Kaster, returned_knowledge, kast_everything: bool, scheduled_kasters: Set[int]) -> List[int]:
+        # Update high level knowledge with a kaster's returned values, returning the indices of newly scheduled downstream kasters
+        newly_scheduled = []
+        knowledge_values = self.knowledge_values
+        check_types = self.type_drift_policy != 'off'
+        check_output_count(kaster, returned_knowledge)
+        # Assuming that returned variables will be ordered as defined in kaster definitions
+        for output_slot, output_consumers, output_variable_value in zip(kaster.output_slots, kaster.output_consumers, returned_knowledge):
+            # A changed output schedules the kasters chained onto it
+            if not kast_everything and output_consumers and value_has_changed(knowledge_values[output_slot], output_variable_value):
+                for kaster_index in output_consumers:
+                    if kaster_index not in scheduled_kasters:
+                        scheduled_kasters.add(kaster_index)
+                        newly_scheduled.append(kaster_index)
+            if check_types:
+                self.knowledge_by_slot[output_slot].update(output_variable_value) # Update high_level_knowedge entries with corresponding return values
+            else:
+                knowledge_values[output_slot] = output_variable_value # Write straight to the value slot when types are not checked
+        return newly_scheduled
+
+    def kast_block(self, block: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        # Kast a block of rows at once; block maps low level knowledge names to arrays with one entry per row
+        # Returns the block extended with one array per high level knowledge output
+        if self.has_async_kasters:
+            raise TypeError('Spellbook has async kasters, which cannot be kasted in blocks.')
+        columns = dict(block)
+        num_rows = len(next(iter(columns.values()))) if columns else 0
         for kaster in self.kasters:
-            # Create dictionary of {'input_var_name': value from low_level_knowledge}
-            input_variables = dict([(variable, self.low_level_knowledge[variable].value) for variable in kaster.input_vars])
-            returned_knowledge = kaster.method(**input_variables) # Unpack above dictionary as kwargs for kasting method
-            # Assuming that returned variables will be ordered as defined in kaster definitions
-            for output_variable_index, output_variable_value in enumerate(returned_knowledge):
-                output_variable_name = kaster.output_vars[output_variable_index]
-                self.high_level_knowledge[output_variable_name].update(output_variable_value) # Update high_level_knowedge entries with corresponding return values
\ No newline at end of file
+            for variable in kaster.input_vars:
+                if variable not in columns:
+                    raise KeyError(f'Kaster input variable {variable} was not found in the kasted block.')
+            if kaster.vectorized:
+                returned_columns = self.call_vectorized_kaster(kaster, columns)
+                check_output_count(kaster, returned_columns)
+                if kaster.window is not None:
+                    # Windows still slide one row at a time
+                    windowed_rows = [kaster.window.push(returned_row) for returned_row in zip(*returned_columns)]
+                    returned_columns = [stack_values([windowed_row[output_variable_index] for windowed_row in windowed_rows]) for output_variable_index in range(len(returned_columns))]
+            else:
+                # Other kasters are called once per row, with their per-row outputs stacked back into columns
+                input_columns = [columns[variable] for variable in kaster.input_vars]
+                returned_rows = [self.call_kaster(kaster, tuple(column[row_index] for column in input_columns)) for row_index in range(num_rows)]
+                for returned_row in returned_rows:
+                    check_output_count(kaster, returned_row)
+                returned_columns = [stack_values([returned_row[output_variable_index] for returned_row in returned_rows]) for output_variable_index in range(len(kaster.output_vars))]
+            for output_variable_index, output_variable_name in enumerate(kaster.output_vars):
+                columns[output_variable_name] = returned_columns[output_variable_index]
+
+        # Record every row of the block in knowledge histories, then leave the knowledge holding the final row, as if the block had been kasted step by step
+        if num_rows > 0:
+            for knowledge in self.recorded_knowledge:
+                for row_index in range(num_rows):
+                    knowledge.history.append(self.step + row_index + 1, columns[knowledge.name][row_index] if knowledge.name in columns else knowledge.value)
+            self.step += num_rows
+            self.set_knowledge_from_block(columns, num_rows - 1)
+            self.publish_snapshot()
+        return columns
+
+    def set_knowledge_from_block(self, columns: Dict[str, np.ndarray], row_index: int) -> None:
+        # Set knowledge values to a single row of a kasted block
+        for name, column in columns.items():
+            if name in self.knowledge_producers:
+                self.high_level_knowledge[name].update(column[row_index])
+            elif name in self.low_level_knowledge:
+                self.low_level_knowledge[name].update(column[row_index])
+            else:
+                self.low_level_knowledge[name] = Knowledge('low',name,column[row_index],self.type_drift_policy)
+        # Knowledge now matches kaster outputs for these values, so nothing is pending a re-kast
+        self.changed_knowledge.clear()
+        self.pending_full_kast = False
+
+    def close(self) -> None:
+        # Shut down the kasting thread pool, if any; kasting afterwards calls every kaster on the calling thread
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def memo_stats(self) -> Dict[str, Dict[str, int]]:
+        # Cache hit and miss counts of every memoized kaster, by kaster method name
+        return dict((kaster_name(kaster), kaster.memo.stats()) for kaster in self.kasters if kaster.memo is not None)
@@ -0,0 +1,207 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import re
+import numpy as np
+from collections import deque
+from typing import Callable, Tuple
+
+def zero_like(value):
+    # Statistic of a window too short to have one: 0.0, or zeros of the shape of vector values
+    return np.zeros(np.shape(value)) if np.ndim(value) > 0 else 0.0
+
+class CompensatedSum():
+    # Running sum with Neumaier compensation, so values added and later subtracted cancel exactly instead of leaving rounding
+    # error behind (ex. the mean of [1, 1, 1] just after 1e17 left the window); vector values are summed elementwise
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0 # Low order bits lost from total
+
+    def add(self, value) -> None:
+        total = self.total + value
+        if not isinstance(total, np.ndarray):
+            if abs(self.total) >= abs(value):
+                self.compensation += (self.total - total) + value
+            else:
+                self.compensation += (value - total) + self.total
+        else:
+            self.compensation = self.compensation + np.where(np.abs(self.total) >= np.abs(value), (self.total - total) + value, (value - total) + self.total)
+        self.total = total
+
+    def value(self):
+        return self.total + self.compensation
+
+class RollingMean():
+    # Mean of the last size values, from a compensated running sum
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = CompensatedSum()
+
+    def push(self, value):
+        self.values.append(value)
+        self.total.add(value)
+        if len(self.values) > self.size:
+            self.total.add(-self.values.popleft())
+        return self.total.value() / len(self.values)
+
+class RollingVariance():
+    # Sample variance of the last size values, from compensated running sums of their deviations from a shift value
+    # The shift is moved to the newest value, and the window re-summed, every size pushes (amortized constant time), so the
+    # deviations stay small as values drift and the variance does not lose precision to cancellation
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.shift = None
+        self.deviations = CompensatedSum()
+        self.squared_deviations = CompensatedSum()
+        self.count = 0
+
+    def push(self, value):
+        if self.shift is None:
+            self.shift = value
+        self.values.append(value)
+        self.add_deviation(value, 1)
+        if len(self.values) > self.size:
+            self.add_deviation(self.values.popleft(), -1)
+        self.count += 1
+        if self.count % self.size == 0:
+            self.rebase()
+        return self.statistic()
+
+    def add_deviation(self, value, sign: int) -> None:
+        deviation = value - self.shift
+        self.deviations.add(sign * deviation)
+        self.squared_deviations.add(sign * deviation * deviation)
+
+    def rebase(self) -> None:
+        self.shift = self.values[-1]
+        self.deviations = CompensatedSum()
+        self.squared_deviations = CompensatedSum()
+        for value in self.values:
+            self.add_deviation(value, 1)
+
+    def statistic(self):
+        num_values = len(self.values)
+        if num_values < 2:
+            return zero_like(self.shift)
+        total = self.deviations.value()
+        variance = np.maximum((self.squared_deviations.value() - total * total / num_values) / (num_values - 1), 0.0) # Rounding may leave a tiny negative variance
+        return float(variance) if np.ndim(variance) == 0 else variance
+
+class RollingStd(RollingVariance):
+    # Sample standard deviation of the last size values
+    def statistic(self):
+        std = np.sqrt(super().statistic())
+        return float(std) if np.ndim(std) == 0 else std
+
+class RollingMin():
+    # Minimum of the last size values, from a deque of (step, value) whose values increase from front to back
+    # Vector values keep one such deque per element, so every element is still updated in amortized constant time
+    def __init__(self, size: int):
+        self.size = size
+        self.candidates = deque()
+        self.count = 0
+        self.elements = None # Per-element windows, created on the first vector value
+
+    def dominates(self, value, candidate) -> bool:
+        return value <= candidate
+
+    def push(self, value):
+        if np.ndim(value) > 0:
+            return self.push_elements(np.asarray(value))
+        while self.candidates and self.dominates(value, self.candidates[-1][1]):
+            self.candidates.pop() # Can never again be the minimum while value is in the window
+        self.candidates.append((self.count, value))
+        if self.candidates[0][0] <= self.count - self.size:
+            self.candidates.popleft()
+        self.count += 1
+        return self.candidates[0][1]
+
+    def push_elements(self, value: np.ndarray) -> np.ndarray:
+        if self.elements is None:
+            self.elements = [type(self)(self.size) for element in range(value.size)]
+        return np.array([window.push(element) for window, element in zip(self.elements, value.flat)], dtype=value.dtype).reshape(value.shape)
+
+class RollingMax(RollingMin):
+    # Maximum of the last size values
+    def dominates(self, value, candidate) -> bool:
+        return value >= candidate
+
+class RollingRate():
+    # Average change per step across the last size values
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+
+    def push(self, value):
+        self.values.append(value)
+        if len(self.values) < 2:
+            return zero_like(value)
+        return (self.values[-1] - self.values[0]) / (len(self.values) - 1)
+
+# Window statistic names, as used in the window decorator and the WindowKasters config section
+WINDOW_STATISTICS = {'mean': RollingMean,
+                     'var': RollingVariance,
+                     'std': RollingStd,
+                     'min': RollingMin,
+                     'max': RollingMax,
+                     'rate': RollingRate}
+
+class KasterWindow():
+    def __init__(self, statistic: str, size: int):
+        """
+        Sliding window applied to every value a kaster returns, replacing each with a statistic over its last size values.
+        Each statistic is updated in constant time per step.
+
+        Parameters
+        ----------
+        statistic : str
+            One of WINDOW_STATISTICS
+        size : int
+            Number of steps in the window
+        """
+        if statistic not in WINDOW_STATISTICS:
+            raise ValueError(f'Unrecognized window statistic {statistic}; expected one of {list(WINDOW_STATISTICS)}.')
+        if not isinstance(size, int) or size < 1:
+            raise ValueError(f'Window size must be a positive integer, not {size}.')
+        self.statistic = statistic
+        self.size = size
+        self.aggregators = [] # One per returned value, created on the first call
+
+    def push(self, returned_knowledge) -> Tuple:
+        if not self.aggregators:
+            self.aggregators = [WINDOW_STATISTICS[self.statistic](self.size) for value in returned_knowledge]
+        return tuple(aggregator.push(value) for aggregator, value in zip(self.aggregators, returned_knowledge))
+
+def make_window_kaster_method(statistic: str, size: int) -> Callable:
+    # Build a kaster method passing its single input through a window, for window kasters declared in the config
+    def window_kaster(value):
+        return (value,)
+    window_kaster.__name__ = f'{statistic}_window'
+    window_kaster.kast_window = (statistic, size)
+    return window_kaster
+
+def parse_window_kaster(window_spec: str) -> Tuple[str, Callable]:
+    """
+    Parse a WindowKasters config entry of the form statistic(input_name, size), ex. mean(battery_voltage, 60).
+
+    Returns
+    -------
+    input_variable : str
+        Name of the knowledge being aggregated
+    method : Callable
+        Kaster method returning the windowed statistic
+    """
+    match = re.fullmatch(r'\s*(\w+)\s*\(\s*([^,\s]+)\s*,\s*(\d+)\s*\)\s*', window_spec)
+    if match is None:
+        raise ValueError(f'Unrecognized WindowKasters entry {window_spec}; expected statistic(input_name, size).')
+    statistic, input_variable, size = match.group(1), match.group(2), int(match.group(3))
+    KasterWindow(statistic, size) # Validate the statistic and size now, rather than when the Spellbook is built
+    return input_variable, make_window_kaster_method(statistic, size)
@@ -7,7 +7,10 @@
 # Licensed under the NASA Open Source Agreement version 1.3
 # See "NOSA GSC-19360-1 KAST.pdf"
 
-from typing import Dict
+from typing import Dict, List
+import numpy as np
+
+from kast.utils.functions import stack_values
 
 class DataSource():
     def __init__(self):
@@ -20,4 +23,61 @@ class DataSource():
     
     def has_more(self) -> bool:
         # Does the data source have more information to return?
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def async_get_new_information(self) -> Dict:
+        # Await the next packet of information; data sources reading from sockets, queues, etc. should override this to await it without blocking
+        return self.get_new_information()
+
+    async def async_has_more(self) -> bool:
+        # Await whether the data source has more information to return
+        return self.has_more()
+
+    def count_rows(self) -> int:
+        # How many packets of information will the data source return in total? (only finite, replayable data sources)
+        raise NotImplementedError
+
+    def locate_rows(self, starts: List[int]) -> List:
+        # Where each of the given packets starts, as passed back to select_rows by replay workers so they can go straight to it
+        # Data sources that can already reach any packet cheaply need not locate them
+        return [None] * len(starts)
+
+    def worker_options(self) -> Dict:
+        # Keyword arguments for the copies of this data source that replay workers build, ex. to stream rows rather than load them all
+        return {}
+
+    def select_rows(self, start: int, stop: int, position=None) -> None:
+        # Restrict the data source to packets start up to (not including) stop, before any are read (only finite, replayable data sources)
+        # position is what locate_rows returned for start, if it was called
+        raise NotImplementedError
+
+    def close(self) -> None:
+        # Release whatever the data source holds open (files, sockets, shared memory); called when execution finishes
+        pass
+
+    def get_config_option(self, option: str, fallback=None):
+        # Read a data source specific setting from the runtime config's DEFAULT section
+        return self.runtime.config['DEFAULT'].get(option, fallback)
+
+    def get_config_section(self, section: str) -> Dict[str, str]:
+        # Read a data source specific config section as {option: value}, excluding options inherited from DEFAULT
+        config = self.runtime.config
+        if not config.has_section(section):
+            return {}
+        return dict((str(option), value) for option, value in config.items(section) if option not in config.defaults())
+
+    def get_new_block(self, block_size: int) -> Dict[str, np.ndarray]:
+        # Get up to block_size packets of information at once, as {name: array with one entry per packet}
+        # Subclasses holding their data in arrays should override this with a direct slice
+        frames = []
+        while len(frames) < block_size and self.has_more():
+            try:
+                frames.append(self.get_new_information())
+            except EOFError: # Closed while waiting; return the frames already taken
+                if not frames:
+                    raise
+                break
+        names = {}
+        for frame in frames:
+            names.update(dict.fromkeys(frame))
+        return dict((name, stack_values([frame.get(name) for frame in frames])) for name in names)
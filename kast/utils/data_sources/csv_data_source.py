@@ -8,32 +8,249 @@
 # See "NOSA GSC-19360-1 KAST.pdf"
 
 import csv
+import re
+import os
+import json
 import numpy as np
+from warnings import warn
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 
 from kast.src.kast_runtime import KastRuntime
 from kast.utils.data_sources.core import DataSource
+from kast.utils.functions import str_to_bool
+
+# NumPy dtypes of the numeric CsvSchema column types
+COLUMN_DTYPES = {'float': np.float64, 'int': np.int64}
+
+# Rows parsed at a time by replay workers when ChunkSize is not set; workers stream only their own rows rather than loading the whole file
+WORKER_CHUNK_SIZE = 4096
+
+def parse_column_type(column_type: str) -> Tuple[str, int]:
+    """
+    Split a CsvSchema column type ('float', 'int', 'str', or a vector such as 'float[7]') into its base type and vector length.
+
+    Parameters
+    ----------
+    column_type : str
+        Column type as written in the config
+
+    Returns
+    -------
+    base_type : str
+        One of 'float', 'int' or 'str'
+    length : int
+        Number of values held by each cell, or 0 for single values
+    """
+    match = re.fullmatch(r'\s*(float|int|str)\s*(?:\[\s*(\d+)\s*\])?\s*', column_type)
+    if match is None or (match.group(1) == 'str' and match.group(2) is not None):
+        raise ValueError(f'Unrecognized CsvSchema column type {column_type}; expected float, int, str, float[k] or int[k].')
+    return match.group(1), int(match.group(2) or 0)
+
+def parse_column(values: np.ndarray, column_type: str, first_row: int = 0) -> np.ndarray:
+    """
+    Parse a column of csv cell strings into a typed array in a single pass.
+    Vector cells are written as Python-format lists (ex. "[0.0, -2.0, 1.0]"), and are parsed into a 2D array with one row per cell.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Column of cell strings
+    column_type : str
+        CsvSchema column type of the column
+    first_row : int
+        Data row of the first cell, for naming the row of a malformed cell
+
+    Returns
+    -------
+    column : np.ndarray
+        Typed column, with one entry per cell
+    """
+    base_type, length = parse_column_type(column_type)
+    if base_type == 'str':
+        return np.asarray(values, dtype=str)
+    if length == 0:
+        return np.asarray(values, dtype=str).astype(COLUMN_DTYPES[base_type])
+    cells = np.char.strip(np.asarray(values, dtype=str), ' []')
+    cell_lengths = np.char.count(cells, ',') + 1
+    if np.any(cell_lengths != length):
+        bad_cell = int(np.argmax(cell_lengths != length))
+        raise ValueError(f'CsvSchema column type {column_type} expects {length} values in every cell, but row {first_row + bad_cell} has {cell_lengths[bad_cell]}.')
+    flat_values = ','.join(cells).split(',') if len(values) > 0 else []
+    return np.array(flat_values, dtype=COLUMN_DTYPES[base_type]).reshape(len(values), length)
 
 class CsvDataSource(DataSource):
-    def __init__(self,runtime: KastRuntime):
+    # Streaming state: by default the whole file is held in self.data, starting at row 0
+    reader = None
+    chunk_start = 0
+
+    def __init__(self,runtime: KastRuntime, chunk_size: Optional[int] = None):
+        # chunk_size, when given, takes the place of the ChunkSize option (ex. for the copies replay workers build)
         self.runtime = runtime
-        self.data = np.array(list(
-            csv.reader(open(self.runtime.data_file_path, 'r'))
-            ))
-        
-        self.headers = self.data[0]
-        self.data = self.data[1:]
+        self.chunk_size = int(self.get_config_option('ChunkSize', 0)) if chunk_size is None else chunk_size
+        self.schema: Dict[str, str] = self.get_config_section('CsvSchema') # Column name -> type; unlisted columns stay strings
+        self.cache_data = str_to_bool(self.get_config_option('CacheParsedData', 'False'))
+
+        if self.chunk_size > 0:
+            # Stream the file, holding at most chunk_size rows in memory at once
+            self.file = open(self.runtime.data_file_path, 'r', newline='')
+            self.reader = csv.reader(self.file)
+            self.headers = np.array(next(self.reader))
+            self.data = np.empty((0, len(self.headers)), dtype=str) # First chunk is read on demand
+        elif not (self.cache_data and self.load_cache()):
+            with open(self.runtime.data_file_path, 'r') as data_file:
+                self.data = np.array(list(
+                    csv.reader(data_file)
+                    ))
+            
+            self.headers = self.data[0]
+            self.data = self.parse_rows(self.data[1:], 0)
+            if self.cache_data:
+                self.save_cache()
         self.index = 0 # Set index to access second row on first call; first row stored as headers 
 
+    def get_cache_paths(self) -> Tuple[str, str]:
+        # Sidecar files stored next to the data file: parsed rows, and the metadata they were parsed from
+        return self.runtime.data_file_path + '.kastcache.npy', self.runtime.data_file_path + '.kastcache.json'
+
+    def get_cache_key(self) -> Dict:
+        # A cache is only valid for the same file contents (by modification time and size) parsed with the same schema
+        file_stats = os.stat(self.runtime.data_file_path)
+        return {'mtime_ns': file_stats.st_mtime_ns, 'size': file_stats.st_size, 'schema': self.schema}
+
+    def load_cache(self) -> bool:
+        # Memory-map previously parsed rows if a valid cache exists; pages are loaded lazily and shared between processes
+        rows_path, metadata_path = self.get_cache_paths()
+        try:
+            with open(metadata_path, 'r') as metadata_file:
+                metadata = json.load(metadata_file)
+            if metadata['key'] != self.get_cache_key():
+                return False
+            self.data = np.load(rows_path, mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return False
+        self.headers = np.array(metadata['headers'], dtype=str)
+        return True
+
+    def save_cache(self) -> None:
+        # Write parsed rows to the sidecar cache, writing the metadata last so a partial write is never treated as valid
+        rows_path, metadata_path = self.get_cache_paths()
+        try:
+            with open(rows_path + '.tmp', 'wb') as rows_file:
+                np.save(rows_file, np.ascontiguousarray(self.data))
+            os.replace(rows_path + '.tmp', rows_path)
+            with open(metadata_path + '.tmp', 'w') as metadata_file:
+                json.dump({'key': self.get_cache_key(), 'headers': [str(header) for header in self.headers]}, metadata_file)
+            os.replace(metadata_path + '.tmp', metadata_path)
+        except OSError as error:
+            warn(f"\n\tCaution: could not write data cache for {self.runtime.data_file_path}: {error}")
+
+    def read_next_chunk(self):
+        # Replace the exhausted chunk with the next chunk_size rows of the file, closing the file once fully read
+        self.chunk_start += len(self.data)
+        new_rows = list(islice(self.reader, self.chunk_size))
+        if new_rows:
+            self.data = self.parse_rows(np.array(new_rows), self.chunk_start)
+        else:
+            self.data = np.empty((0, len(self.headers)), dtype=str)
+            self.file.close()
+            self.reader = None
+
+    def parse_rows(self, rows: np.ndarray, first_row: int) -> np.ndarray:
+        # Without a schema, rows stay a 2D array of cell strings
+        if not self.schema:
+            return rows
+        # With a schema, rows become a structured array holding one typed field per column, so each row is parsed once at load time
+        columns = [parse_column(rows[:, column] if len(rows) > 0 else np.empty(0, dtype=str), self.schema.get(header, 'str'), first_row) for column, header in enumerate(self.headers)]
+        typed_rows = np.empty(len(rows), dtype=[(str(header), column.dtype, column.shape[1:]) for header, column in zip(self.headers, columns)])
+        for header, column in zip(self.headers, columns):
+            typed_rows[str(header)] = column
+        return typed_rows
+
+    def rows_to_block(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        # Split rows into {header: column}, for either raw or schema-typed rows
+        if rows.dtype.names is not None:
+            return dict((header, rows[str(header)]) for header in self.headers)
+        return dict((header, rows[:, column]) for column, header in enumerate(self.headers))
+
+    def count_rows(self) -> int:
+        # Rows held in memory are counted directly; a streamed file is counted in a separate pass without parsing it
+        if self.reader is None:
+            return self.chunk_start + len(self.data)
+        with open(self.runtime.data_file_path, 'r', newline='') as data_file:
+            return max(sum(1 for row in csv.reader(data_file)) - 1, 0) # First row stored as headers
+
+    def locate_rows(self, starts: List[int]) -> List[int]:
+        # Byte offset of each of the given rows in the data file, found in a single pass that splits rows without parsing their cells
+        # The csv reader pulls one line at a time, so the bytes read so far always end where the last row it returned ends
+        offsets = {}
+        with open(self.runtime.data_file_path, 'r', newline='') as data_file:
+            position = 0
+            def read_lines():
+                nonlocal position
+                for line in data_file.buffer:
+                    position += len(line)
+                    yield line.decode(data_file.encoding)
+            reader = csv.reader(read_lines())
+            next(reader, None) # First row stored as headers
+            row = 0
+            for start in sorted(set(starts)):
+                row += sum(1 for skipped_row in islice(reader, start - row))
+                offsets[start] = position
+        return [offsets[start] for start in starts]
+
+    def worker_options(self) -> Dict:
+        # Workers stream their shard, ChunkSize rows (or WORKER_CHUNK_SIZE) at a time, rather than each loading the whole file
+        return {'chunk_size': self.chunk_size if self.chunk_size > 0 else WORKER_CHUNK_SIZE}
+
+    def select_rows(self, start: int, stop: int, position=None) -> None:
+        # Restrict the data source to rows start up to (not including) stop; index keeps counting from the first row of the file
+        # A streamed file seeks straight to position, the byte offset locate_rows found for start, instead of reading every row before it
+        if self.reader is None:
+            self.data = self.data[start:stop] # A view, so memory-mapped rows outside the range are never loaded
+        else:
+            if position is not None:
+                self.file.seek(position)
+                self.reader = csv.reader(self.file)
+            else:
+                for row in islice(self.reader, start):
+                    pass
+            self.reader = islice(self.reader, max(stop - start, 0))
+        self.chunk_start = start
+        self.index = start
+
     def get_new_information(self):
-        new_frame = self.data[self.index]
+        if self.reader is not None and self.index - self.chunk_start >= len(self.data):
+            self.read_next_chunk()
+        new_frame = self.data[self.index - self.chunk_start]
         new_information = dict(zip(self.headers, new_frame))
         self.index += 1
 
         return(new_information)
     
-    def has_more(self):
-        if self.index >= len(self.data):
-            return False
+    def get_new_block(self, block_size: int):
+        # Blocks may span several streamed chunks
+        chunk_blocks = []
+        num_rows = 0
+        while num_rows < block_size and self.has_more():
+            chunk_index = self.index - self.chunk_start
+            new_rows = self.data[chunk_index:chunk_index + block_size - num_rows]
+            chunk_blocks.append(self.rows_to_block(new_rows))
+            num_rows += len(new_rows)
+            self.index += len(new_rows)
+        if len(chunk_blocks) == 1:
+            new_block = chunk_blocks[0]
+        elif chunk_blocks:
+            new_block = dict((header, np.concatenate([chunk_block[header] for chunk_block in chunk_blocks])) for header in self.headers)
         else:
+            new_block = self.rows_to_block(self.data[:0])
+
+        return(new_block)
+
+    def has_more(self):
+        if self.index - self.chunk_start < len(self.data):
             return True
-        
\ No newline at end of file
+        if self.reader is not None:
+            self.read_next_chunk()
+            return len(self.data) > 0
+        return False
@@ -0,0 +1,147 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import queue
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from kast.src.kast_runtime import KastRuntime
+from kast.utils.data_sources.core import DataSource
+
+# What put() does with a new frame when the queue is full
+QUEUE_POLICIES = ('block', 'drop_oldest', 'drop_newest', 'coalesce')
+
+class QueueDataSource(DataSource):
+    def __init__(self, runtime: KastRuntime):
+        """
+        Live data source fed by producer threads (or, through attach, other processes) pushing frames into a bounded queue.
+        Frames are dictionaries of {name: value}, or sequences of values ordered as the runtime headers.
+
+        Config options
+        --------------
+        QueueSize : int
+            Maximum number of queued frames (default 1024)
+        QueuePolicy : str
+            What to do with a new frame when the queue is full (default block):
+                block: wait until KAST takes a frame
+                drop_oldest: discard the oldest queued frame
+                drop_newest: discard the new frame
+                coalesce: merge the new frame into the newest queued frame, keeping the latest value of every channel
+        QueueTimeout : float
+            Seconds get_new_information waits for a frame before raising queue.Empty (default: wait indefinitely)
+            A data source closed while get_new_information waits raises EOFError instead, which ends execute cleanly
+        """
+        self.runtime = runtime
+        self.headers = self.runtime.headers
+        self.index = 0
+
+        self.maxsize = int(self.get_config_option('QueueSize', 1024))
+        self.policy = self.get_config_option('QueuePolicy', 'block')
+        timeout = self.get_config_option('QueueTimeout', None)
+        self.timeout = float(timeout) if timeout is not None else None
+        if self.policy not in QUEUE_POLICIES:
+            raise ValueError(f'Unrecognized QueuePolicy {self.policy}; expected one of {list(QUEUE_POLICIES)}.')
+        if self.maxsize < 1:
+            raise ValueError(f'QueueSize must be at least 1, not {self.maxsize}.')
+
+        self.frames = deque()
+        self.closed = False
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+
+        # Counters, reported by stats()
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_queued = 0
+
+    def put(self, frame, timeout: Optional[float] = None) -> bool:
+        # Queue a frame from a producer, applying the queue policy when full; returns False if the frame was dropped
+        if not isinstance(frame, dict):
+            frame = dict(zip(self.headers, frame))
+        with self.lock:
+            if self.closed:
+                raise ValueError('Cannot put frames into a closed QueueDataSource.')
+            self.received += 1
+            if len(self.frames) >= self.maxsize:
+                if self.policy == 'block':
+                    if not self.not_full.wait_for(lambda: len(self.frames) < self.maxsize or self.closed, timeout):
+                        self.dropped += 1 # Timed out waiting for space
+                        return False
+                    if self.closed:
+                        self.dropped += 1
+                        return False
+                elif self.policy == 'drop_oldest':
+                    self.frames.popleft()
+                    self.dropped += 1
+                elif self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                else: # coalesce
+                    self.frames[-1] = {**self.frames[-1], **frame}
+                    self.coalesced += 1
+                    return True
+            self.frames.append(frame)
+            self.max_queued = max(self.max_queued, len(self.frames))
+            self.not_empty.notify()
+        return True
+
+    def close(self) -> None:
+        # Stop accepting frames; has_more returns False once the queued frames have been taken
+        with self.lock:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+    def attach(self, source_queue, sentinel=None) -> threading.Thread:
+        # Move frames from another queue (ex. a multiprocessing.Queue shared with producer processes) into this one on a
+        # background thread, applying the queue policy; putting the sentinel on source_queue closes this data source
+        def pump():
+            while True:
+                frame = source_queue.get()
+                if frame is sentinel:
+                    self.close()
+                    return
+                self.put(frame)
+        pump_thread = threading.Thread(target=pump, name='kast-queue-pump', daemon=True)
+        pump_thread.start()
+        return pump_thread
+
+    def get_new_information(self) -> Dict:
+        with self.lock:
+            if not self.not_empty.wait_for(lambda: self.frames or self.closed, self.timeout):
+                raise queue.Empty('No frame was available from the QueueDataSource.')
+            if not self.frames:
+                raise EOFError('The QueueDataSource was closed while waiting for a frame.')
+            new_information = self.frames.popleft()
+            self.not_full.notify()
+        self.index += 1
+
+        return(new_information)
+
+    async def async_get_new_information(self) -> Dict:
+        # Wait for a frame on a worker thread, so the event loop keeps running meanwhile
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_new_information)
+
+    def has_more(self) -> bool:
+        with self.lock:
+            return bool(self.frames) or not self.closed
+
+    def stats(self) -> Dict[str, int]:
+        # Frames received from producers, delivered to KAST, dropped or coalesced under the queue policy, and queue depths
+        with self.lock:
+            return {'received': self.received,
+                    'delivered': self.index,
+                    'dropped': self.dropped,
+                    'coalesced': self.coalesced,
+                    'queued': len(self.frames),
+                    'max_queued': self.max_queued}
@@ -0,0 +1,227 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import re
+import time
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, Optional
+
+from kast.src.kast_runtime import KastRuntime
+from kast.utils.data_sources.core import DataSource
+
+# Ring header, as uint64 values: last written sequence number, closed flag, capacity in frames, frame size in bytes
+HEADER_FIELDS = 4
+
+def parse_frame_layout(fields: Dict[str, str]) -> np.dtype:
+    """
+    Build the NumPy dtype of a fixed-layout numeric frame, declared as {name: type} in field order,
+    where type is a NumPy numeric type, optionally with a vector length (ex. float64, int32 or float32[3]).
+    """
+    dtype_fields = []
+    for name, field_type in fields.items():
+        match = re.fullmatch(r'\s*(\w+)\s*(?:\[\s*(\d+)\s*\])?\s*', field_type)
+        try:
+            base_dtype = np.dtype(match.group(1)) if match is not None else None
+        except TypeError:
+            base_dtype = None
+        if base_dtype is None or base_dtype.kind not in 'biufc':
+            raise ValueError(f'Unrecognized ShmLayout field type {field_type} for {name}; expected a numeric type such as float64 or float32[3].')
+        dtype_fields.append((name, base_dtype, (int(match.group(2)),) if match.group(2) else ()))
+    if not dtype_fields:
+        raise ValueError('ShmLayout must declare at least one field.')
+    return np.dtype(dtype_fields)
+
+def replace_closed_segment(name: str, size: int) -> shared_memory.SharedMemory:
+    """
+    Create a shared memory segment in place of one left behind under the same name by an earlier run, provided its producer
+    had closed it; a segment that is still open may belong to a running KAST and its producer, so is left alone.
+    """
+    stale = shared_memory.SharedMemory(name=name)
+    closed = stale.size >= HEADER_FIELDS * 8 and bytes(stale.buf[8:16]) != bytes(8) # Closed flag, the second header field
+    stale.close()
+    if not closed:
+        resource_tracker.unregister(stale._name, 'shared_memory') # Not ours, so must not be unlinked when this process exits
+        raise FileExistsError(f'Shared memory {name} already exists and has not been closed by its producer. If it was left behind '
+                              f'by a run that crashed, remove it (ex. SharedMemory(\'{name}\').unlink()) or set another ShmName.')
+    stale.unlink()
+    return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+class FrameRing():
+    def __init__(self, name: str, frame_dtype: np.dtype, capacity: int, create: bool):
+        """
+        Ring of fixed-layout frames in a named shared memory segment, each stored with the sequence number it was written with.
+        Created by the KAST data source, and attached to by a producer's ShmFrameWriter.
+        """
+        self.slot_dtype = np.dtype([('sequence', np.uint64), ('frame', frame_dtype)])
+        self.capacity = capacity
+        size = HEADER_FIELDS * 8 + capacity * self.slot_dtype.itemsize
+        if create:
+            try:
+                self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                self.memory = replace_closed_segment(name, size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.memory._name, 'shared_memory') # Attached segments belong to their creator, so must not be unlinked when this process exits
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=self.memory.buf)
+        if create:
+            self.header[:] = [0, 0, capacity, frame_dtype.itemsize]
+        elif int(self.header[2]) != capacity or int(self.header[3]) != frame_dtype.itemsize:
+            raise ValueError(f'Shared memory {name} holds {int(self.header[2])} frames of {int(self.header[3])} bytes, not {capacity} frames of {frame_dtype.itemsize} bytes.')
+        self.slots = np.ndarray((capacity,), dtype=self.slot_dtype, buffer=self.memory.buf, offset=HEADER_FIELDS * 8)
+        self.sequences = self.slots['sequence']
+        self.frames = self.slots['frame']
+
+    def release(self, unlink: bool) -> None:
+        # Drop this process's views of the segment and unmap it, unless values handed out still view it
+        del self.header, self.slots, self.sequences, self.frames
+        try:
+            self.memory.close()
+        except BufferError:
+            pass # Knowledge still holds views of frames; the mapping is released with them
+        if unlink:
+            # A writer sharing this process's resource tracker (ex. a child process) may have unregistered the segment
+            resource_tracker.register(self.memory._name, 'shared_memory')
+            self.memory.unlink()
+
+class ShmFrameWriter():
+    def __init__(self, name: str, fields: Dict[str, str], capacity: int):
+        """
+        Producer side of a ShmDataSource: writes frames into the ring created by the data source.
+        fields and capacity must match the data source's [ShmLayout] section and ShmCapacity.
+        """
+        self.ring = FrameRing(name, parse_frame_layout(fields), capacity, create=False)
+        self.sequence = int(self.ring.header[0])
+        self.columns = dict((field, self.ring.frames[field]) for field in self.ring.frames.dtype.names)
+
+    def write(self, frame: Dict) -> None:
+        # Write a frame of {field: value}; the slot's sequence number is cleared while it is written, so readers never take a partial frame
+        self.sequence += 1
+        slot = (self.sequence - 1) % self.ring.capacity
+        self.ring.sequences[slot] = 0
+        for field, column in self.columns.items():
+            column[slot] = frame[field]
+        self.ring.sequences[slot] = self.sequence
+        self.ring.header[0] = self.sequence
+
+    def close(self) -> None:
+        # Tell the data source that no more frames are coming
+        if self.ring is None:
+            return
+        self.ring.header[1] = 1
+        self.ring.release(unlink=False)
+        self.ring = None
+
+class ShmDataSource(DataSource):
+    def __init__(self, runtime: KastRuntime):
+        """
+        Live data source reading fixed-layout numeric frames from a shared memory ring written by ShmFrameWriter producers.
+        Vector fields are returned as NumPy views into shared memory, without copying; they remain valid until the producer
+        has written ShmCapacity more frames, so ShmCapacity should cover the longest expected processing delay.
+
+        Config options
+        --------------
+        ShmName : str
+            Name of the shared memory segment, created by the data source (default kast_frames)
+        ShmCapacity : int
+            Number of frames held in the ring (default 1024)
+        ShmTimeout : float
+            Seconds to wait for a frame before raising TimeoutError (default: wait indefinitely)
+        ShmPollInterval : float
+            Seconds between checks for new frames while waiting (default 0.0001)
+        [ShmLayout] section
+            Frame fields in order, as name = numeric type (ex. accel = float64[3])
+        """
+        self.runtime = runtime
+        self.headers = self.runtime.headers
+        self.index = 0
+
+        self.name = self.get_config_option('ShmName', 'kast_frames')
+        self.capacity = int(self.get_config_option('ShmCapacity', 1024))
+        timeout = self.get_config_option('ShmTimeout', None)
+        self.timeout = float(timeout) if timeout is not None else None
+        self.poll_interval = float(self.get_config_option('ShmPollInterval', 0.0001))
+        self.ring = FrameRing(self.name, parse_frame_layout(self.get_config_section('ShmLayout')), self.capacity, create=True)
+        self.columns = dict((field, self.ring.frames[field]) for field in self.ring.frames.dtype.names)
+
+        self.sequence = 0 # Sequence number of the last frame read
+        self.lost = 0 # Frames overwritten by the producer before they were read
+
+    def wait_for_frames(self) -> int:
+        # Wait until the producer has written past the last frame read (or closed the ring), returning its latest sequence number
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            written = int(self.ring.header[0])
+            if written > self.sequence or self.ring.header[1]:
+                return written
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f'No frame was written to shared memory {self.name} within {self.timeout} seconds.')
+            time.sleep(self.poll_interval)
+
+    def next_slot(self) -> Optional[int]:
+        # Slot of the next unread frame, skipping (and counting) frames the producer has already overwritten
+        written = self.wait_for_frames()
+        if written <= self.sequence:
+            return None
+        if written - self.sequence > self.capacity:
+            self.lost += written - self.sequence - self.capacity
+            self.sequence = written - self.capacity
+        return self.sequence % self.capacity
+
+    def get_new_information(self) -> Dict:
+        while True:
+            slot = self.next_slot()
+            if slot is None:
+                raise EOFError(f'Shared memory {self.name} was closed by its producer.')
+            expected = self.sequence + 1
+            if int(self.ring.sequences[slot]) == expected:
+                new_information = dict((field, column[slot]) for field, column in self.columns.items())
+                # Scalars were copied out of the slot; keep them only if the producer did not start rewriting it meanwhile
+                if int(self.ring.sequences[slot]) == expected:
+                    break
+            # Overwritten between checking the header and reading the slot; skip ahead on the next check
+            self.lost += 1
+            self.sequence += 1
+        self.sequence += 1
+        self.index += 1
+
+        return(new_information)
+
+    def get_new_block(self, block_size: int) -> Dict[str, np.ndarray]:
+        # Up to block_size frames already written, as column views into shared memory (stopping at the end of the ring)
+        while True:
+            slot = self.next_slot()
+            if slot is None:
+                return dict((field, column[:0]) for field, column in self.columns.items())
+            num_frames = min(block_size, int(self.ring.header[0]) - self.sequence, self.capacity - slot)
+            # Frames are written in sequence, so the block is intact if both its oldest and newest slots still hold the expected frames
+            if int(self.ring.sequences[slot]) == self.sequence + 1 and int(self.ring.sequences[slot + num_frames - 1]) == self.sequence + num_frames:
+                break
+            # The oldest frame was overwritten after checking the header; skip ahead on the next check
+            self.lost += 1
+            self.sequence += 1
+        self.sequence += num_frames
+        self.index += num_frames
+        return dict((field, column[slot:slot + num_frames]) for field, column in self.columns.items())
+
+    def has_more(self) -> bool:
+        return int(self.ring.header[0]) > self.sequence or not self.ring.header[1]
+
+    def stats(self) -> Dict[str, int]:
+        # Frames read, and frames lost to the producer overwriting them before they were read
+        return {'received': self.index, 'lost': self.lost}
+
+    def close(self) -> None:
+        # Release and remove the shared memory segment
+        if self.ring is None:
+            return
+        self.columns = {}
+        self.ring.release(unlink=True)
+        self.ring = None
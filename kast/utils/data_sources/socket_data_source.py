@@ -0,0 +1,177 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import os
+import asyncio
+import re
+import json
+import socket
+import struct
+import numpy as np
+from collections import deque
+from warnings import warn
+from typing import Dict, List, Tuple
+
+from kast.src.kast_runtime import KastRuntime
+from kast.utils.data_sources.core import DataSource
+from kast.utils.functions import stack_values
+
+def parse_socket_address(address: str) -> Tuple[int, object]:
+    # Split a SocketAddress (udp://host:port or unix:///path/to/socket) into its socket family and bind address
+    match = re.fullmatch(r'udp://(.+):(\d+)', address.strip())
+    if match is not None:
+        return socket.AF_INET, (match.group(1), int(match.group(2)))
+    match = re.fullmatch(r'unix://(.+)', address.strip())
+    if match is not None and hasattr(socket, 'AF_UNIX'):
+        return socket.AF_UNIX, match.group(1)
+    raise ValueError(f'Unrecognized SocketAddress {address}; expected udp://host:port or unix:///path/to/socket.')
+
+def parse_struct_layout(fields: Dict[str, str], byte_order: str = '<') -> Tuple[struct.Struct, List[Tuple[str, int]]]:
+    """
+    Build the struct of a fixed datagram layout, declared as {name: struct format code} in field order.
+    A count before the code (ex. 4f) declares a vector of that many values.
+
+    Returns
+    -------
+    layout : struct.Struct
+        Struct unpacking one datagram into a flat tuple of values
+    field_lengths : List[Tuple[str, int]]
+        Name of every field, with its vector length (0 for single values)
+    """
+    field_lengths = []
+    for name, code in fields.items():
+        match = re.fullmatch(r'\s*(\d*)\s*([xcbB?hHiIlLqQnNefds])\s*', code)
+        if match is None or (match.group(2) == 's' and not match.group(1)):
+            raise ValueError(f'Unrecognized SocketStruct field type {code} for {name}; expected a struct format code such as d, 4f or 16s.')
+        count = int(match.group(1) or 0)
+        field_lengths.append((name, count if match.group(2) != 's' else 0)) # 16s is one 16 byte string, not 16 values
+    return struct.Struct(byte_order + ''.join(code.strip() for code in fields.values())), field_lengths
+
+class SocketDataSource(DataSource):
+    def __init__(self, runtime: KastRuntime):
+        """
+        Live data source reading frames from datagrams received on a local UDP or Unix domain socket.
+
+        Config options
+        --------------
+        SocketAddress : str
+            udp://host:port or unix:///path/to/socket to bind and receive on
+        SocketFormat : str
+            json (default): every datagram holds one or more JSON objects of {name: value}, one per line
+            struct: every datagram holds one frame with the fixed layout declared in the [SocketStruct] section
+        SocketByteOrder : str
+            struct byte order character for the struct format (default <, little endian)
+        SocketBatchSize : int
+            Most datagrams drained from the socket at once (default 64)
+        SocketTimeout : float
+            Seconds to wait for a datagram before raising TimeoutError (default: wait indefinitely)
+        """
+        self.runtime = runtime
+        self.headers = self.runtime.headers
+        self.index = 0
+        self.bad_datagrams = 0
+
+        self.format = self.get_config_option('SocketFormat', 'json')
+        if self.format not in ('json', 'struct'):
+            raise ValueError(f'Unrecognized SocketFormat {self.format}; expected json or struct.')
+        if self.format == 'struct':
+            self.layout, self.field_lengths = parse_struct_layout(self.get_config_section('SocketStruct'), self.get_config_option('SocketByteOrder', '<'))
+        self.batch_size = int(self.get_config_option('SocketBatchSize', 64))
+        timeout = self.get_config_option('SocketTimeout', None)
+        self.timeout = float(timeout) if timeout is not None else None
+
+        family, self.bind_address = parse_socket_address(self.get_config_option('SocketAddress'))
+        self.socket = socket.socket(family, socket.SOCK_DGRAM)
+        if family != socket.AF_INET and os.path.exists(self.bind_address):
+            os.unlink(self.bind_address) # Remove a socket file left behind by an earlier run
+        self.socket.bind(self.bind_address)
+        self.address = self.socket.getsockname() # Includes the port chosen by the system when binding port 0
+        self.buffer = bytearray(65535) # Largest possible datagram, reused for every struct datagram
+        self.frames = deque()
+
+    def decode(self, datagram: bytes) -> List[Dict]:
+        # Decode one received datagram into its frames
+        if self.format == 'struct':
+            values = self.layout.unpack_from(datagram)
+            frame = {}
+            position = 0
+            for name, length in self.field_lengths:
+                if length == 0:
+                    frame[name] = values[position]
+                    position += 1
+                else:
+                    frame[name] = np.array(values[position:position + length])
+                    position += length
+            return [frame]
+        frames = [json.loads(line) for line in datagram.splitlines() if line.strip()]
+        for frame in frames:
+            if not isinstance(frame, dict):
+                raise ValueError(f'expected a JSON object of {{name: value}}, not {type(frame).__name__}')
+        return frames
+
+    def receive_batch(self) -> None:
+        # Wait for one datagram, then drain whatever else is already waiting, up to the batch size, without blocking
+        self.socket.settimeout(self.timeout)
+        self.frames.extend(self.receive_datagram())
+        self.socket.setblocking(False)
+        try:
+            for i in range(self.batch_size - 1):
+                self.frames.extend(self.receive_datagram())
+        except BlockingIOError:
+            pass
+
+    def receive_datagram(self) -> List[Dict]:
+        # Malformed datagrams (including JSON that is not an object) are counted in bad_datagrams and skipped, so one bad sender does not end the run
+        if self.format == 'struct':
+            num_bytes = self.socket.recv_into(self.buffer)
+            if num_bytes != self.layout.size:
+                return self.skip_datagram(f'{num_bytes} bytes, but SocketStruct describes {self.layout.size} bytes')
+            return self.decode(self.buffer)
+        datagram = self.socket.recv(len(self.buffer))
+        try:
+            return self.decode(datagram)
+        except ValueError as error: # json.JSONDecodeError and UnicodeDecodeError are both ValueErrors
+            return self.skip_datagram(str(error))
+
+    def skip_datagram(self, reason: str) -> List[Dict]:
+        self.bad_datagrams += 1
+        warn(f"\n\tCaution: skipping malformed datagram ({reason}); {self.bad_datagrams} skipped so far")
+        return []
+
+    def get_new_information(self) -> Dict:
+        while not self.frames:
+            self.receive_batch()
+        new_information = self.frames.popleft()
+        self.index += 1
+
+        return(new_information)
+
+    async def async_get_new_information(self) -> Dict:
+        # Wait for a datagram on a worker thread, so the event loop keeps running meanwhile
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_new_information)
+
+    def get_new_block(self, block_size: int) -> Dict[str, np.ndarray]:
+        # Up to block_size of the frames already received, waiting only when none are
+        while not self.frames:
+            self.receive_batch()
+        frames = [self.frames.popleft() for i in range(min(block_size, len(self.frames)))]
+        self.index += len(frames)
+        names = {}
+        for frame in frames:
+            names.update(dict.fromkeys(frame))
+        return dict((name, stack_values([frame.get(name) for frame in frames])) for name in names)
+
+    def has_more(self) -> bool:
+        return bool(self.frames) or self.socket.fileno() != -1
+
+    def close(self) -> None:
+        # Stop receiving; frames already received are still returned
+        self.socket.close()
+        if isinstance(self.bind_address, str) and os.path.exists(self.bind_address):
+            os.unlink(self.bind_address)
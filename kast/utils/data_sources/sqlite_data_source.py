@@ -0,0 +1,153 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from kast.src.kast_runtime import KastRuntime
+from kast.utils.data_sources.core import DataSource
+from kast.utils.functions import stack_values
+
+def quote_identifier(name: str) -> str:
+    # Quote a table or column name for use in SQL
+    return '"' + name.replace('"', '""') + '"'
+
+def parse_sql_value(text: str):
+    # Config values bound into queries: numbers where they parse as numbers, otherwise strings (ex. ISO timestamps)
+    for value_type in (int, float):
+        try:
+            return value_type(text)
+        except ValueError:
+            pass
+    return text
+
+class SqliteDataSource(DataSource):
+    def __init__(self, runtime: KastRuntime):
+        """
+        Data source streaming the rows of a table in the SQLite database at DataFile, in rowid order.
+        Rows are fetched SqliteBatchSize at a time, so memory use does not grow with the size of the table.
+
+        Config options
+        --------------
+        SqliteTable : str
+            Table to read
+        [SqliteColumns] section
+            Columns to read, as column = knowledge name (default: every column, named as itself)
+        SqliteWhere : str
+            Optional SQL condition rows must meet (ex. mode = 'cruise')
+        SqliteTimeColumn, SqliteStartTime, SqliteStopTime : str
+            Optional time range: rows with SqliteStartTime <= SqliteTimeColumn < SqliteStopTime (either bound may be omitted)
+        SqliteResumeRowid : int
+            Only read rows after this rowid, to resume from the last_rowid of an earlier run (default 0)
+        SqliteBatchSize : int
+            Rows fetched from the database at a time (default 1024)
+        """
+        self.runtime = runtime
+        self.table = self.get_config_option('SqliteTable')
+        if not self.table:
+            raise ValueError('SqliteTable must name the table read by the SqliteDataSource.')
+        self.batch_size = int(self.get_config_option('SqliteBatchSize', 1024))
+        self.where = self.get_config_option('SqliteWhere', None)
+        self.time_column = self.get_config_option('SqliteTimeColumn', None)
+        start_time = self.get_config_option('SqliteStartTime', None)
+        stop_time = self.get_config_option('SqliteStopTime', None)
+        self.start_time = parse_sql_value(start_time) if start_time is not None else None
+        self.stop_time = parse_sql_value(stop_time) if stop_time is not None else None
+        if self.time_column is None and (self.start_time is not None or self.stop_time is not None):
+            raise ValueError('SqliteStartTime and SqliteStopTime require SqliteTimeColumn.')
+        self.resume_rowid = int(self.get_config_option('SqliteResumeRowid', 0))
+        self.last_rowid = self.resume_rowid # Rowid of the last row read, to resume from in a later run
+
+        # Read only, so a database still being written by another process is never modified
+        self.connection = sqlite3.connect(Path(self.runtime.data_file_path).resolve().as_uri() + '?mode=ro', uri=True, check_same_thread=False)
+        column_names = self.get_config_section('SqliteColumns')
+        if not column_names:
+            table_columns = self.connection.execute(f'SELECT * FROM {quote_identifier(self.table)} LIMIT 0').description
+            column_names = dict((column[0], column[0]) for column in table_columns)
+        self.columns = list(column_names)
+        self.headers = list(column_names.values())
+
+        self.index = 0
+        self.rows: List[Tuple] = []
+        self.row_position = 0 # Next row of self.rows to return
+        self.open_cursor()
+
+    def build_query(self, count: bool = False) -> Tuple[str, List]:
+        # SELECT of the configured rows after resume_rowid, in rowid order, with the values bound to its parameters
+        conditions = ['rowid > ?']
+        parameters = [self.resume_rowid]
+        if self.where:
+            conditions.append(f'({self.where})')
+        if self.start_time is not None:
+            conditions.append(f'{quote_identifier(self.time_column)} >= ?')
+            parameters.append(self.start_time)
+        if self.stop_time is not None:
+            conditions.append(f'{quote_identifier(self.time_column)} < ?')
+            parameters.append(self.stop_time)
+        selected = 'COUNT(*)' if count else ', '.join(['rowid'] + [quote_identifier(column) for column in self.columns])
+        query = f"SELECT {selected} FROM {quote_identifier(self.table)} WHERE {' AND '.join(conditions)}"
+        if not count:
+            query += ' ORDER BY rowid'
+        return query, parameters
+
+    def open_cursor(self, limit: int = -1, offset: int = 0) -> None:
+        query, parameters = self.build_query()
+        self.cursor = self.connection.execute(query + ' LIMIT ? OFFSET ?', parameters + [limit, offset])
+        self.rows = []
+        self.row_position = 0
+
+    def fetch_rows(self) -> bool:
+        # Fetch the next batch of rows once every fetched row has been read; returns whether any rows are left
+        if self.row_position < len(self.rows):
+            return True
+        if self.cursor is None:
+            return False
+        self.rows = self.cursor.fetchmany(self.batch_size)
+        self.row_position = 0
+        if not self.rows:
+            self.cursor = None
+        return len(self.rows) > 0
+
+    def count_rows(self) -> int:
+        query, parameters = self.build_query(count=True)
+        return self.connection.execute(query, parameters).fetchone()[0]
+
+    def select_rows(self, start: int, stop: int, position=None) -> None:
+        # Restrict the data source to rows start up to (not including) stop of the configured rows; index keeps counting from the first
+        self.open_cursor(max(stop - start, 0), start)
+        self.index = start
+
+    def get_new_information(self) -> Dict:
+        if not self.fetch_rows():
+            raise EOFError(f'No rows left in SQLite table {self.table}.')
+        row = self.rows[self.row_position]
+        self.row_position += 1
+        self.last_rowid = row[0]
+        self.index += 1
+
+        return(dict(zip(self.headers, row[1:])))
+
+    def get_new_block(self, block_size: int):
+        block_rows = []
+        while len(block_rows) < block_size and self.fetch_rows():
+            new_rows = self.rows[self.row_position:self.row_position + block_size - len(block_rows)]
+            block_rows.extend(new_rows)
+            self.row_position += len(new_rows)
+        if block_rows:
+            self.last_rowid = block_rows[-1][0]
+        self.index += len(block_rows)
+        return dict((header, stack_values([row[column + 1] for row in block_rows])) for column, header in enumerate(self.headers))
+
+    def has_more(self) -> bool:
+        return self.fetch_rows()
+
+    def close(self) -> None:
+        self.cursor = None
+        self.connection.close()
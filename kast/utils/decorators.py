@@ -0,0 +1,81 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+"""
+decorators.py
+Optional markers for kaster methods. Decorators only set attributes on the decorated function and return it
+unchanged, so KAST can still read the function's input variable names from its signature.
+"""
+from typing import Callable, Union
+
+def vectorized(method: Callable) -> Callable:
+    """
+    Mark a kaster method as vectorized: when kasting a block of data (KastRuntime.execute_batch), it is called once
+    with a NumPy array per input variable, and must return a tuple with one array (one entry per row) per output variable.
+    Vectorized methods are still called with single values when kasting step by step.
+
+    Parameters
+    ----------
+    method : Callable
+        Kaster method to be marked
+
+    Returns
+    -------
+    method : Callable
+        The same method, marked as vectorized
+    """
+    method.kast_vectorized = True
+    return method
+
+def memoize(maxsize: Union[int, Callable] = 128):
+    """
+    Mark a kaster method as a pure function of its inputs, so that the Spellbook caches its returned values,
+    keyed on its input values, in a least-recently-used cache of maxsize entries. Hit and miss counts are available
+    through Spellbook.memo_stats(). May be used either as @memoize or as @memoize(maxsize).
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached input combinations
+
+    Returns
+    -------
+    decorator : Callable
+        Decorator marking the method (or, when used as @memoize, the marked method itself)
+    """
+    if callable(maxsize):
+        return memoize()(maxsize)
+
+    def decorator(method: Callable) -> Callable:
+        method.kast_memoize_size = maxsize
+        return method
+    return decorator
+
+def window(statistic: str, size: int):
+    """
+    Mark a kaster method as windowed: every value it returns is replaced by a statistic of that output over the last
+    size steps, updated incrementally each step. Windowed kasters run on every step, even when change tracking finds
+    their inputs unchanged, since their windows still slide.
+
+    Parameters
+    ----------
+    statistic : str
+        One of 'mean', 'var', 'std', 'min', 'max' or 'rate' (average change per step)
+    size : int
+        Number of steps in the window
+
+    Returns
+    -------
+    decorator : Callable
+        Decorator marking the method
+    """
+    def decorator(method: Callable) -> Callable:
+        method.kast_window = (statistic, size)
+        return method
+    return decorator
@@ -10,6 +10,10 @@
 import importlib.util
 import os
 import ast
+import json
+import hashlib
+import numpy as np
+from typing import Dict, List, Tuple
 
 def import_module(module_name: str, file_to_import: str):
     """
@@ -51,9 +55,7 @@ def extract_return_names(f_name, file):
     """
                                                                              
     for x in return_file_nodes(file):
-        print('looped')     
         if not(isinstance(x, ast.FunctionDef)):
-            print('checked class instance')                                                             
             continue                                                                                        
         if not(x.name == f_name): 
             continue 
@@ -62,6 +64,102 @@ def extract_return_names(f_name, file):
             if output_vars != None:
                 return output_vars                                                                         
 
+def index_kaster_signatures(file: str) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Given a file, extract the input and returned variable names of every function defined at its top level, in a single parse.
+    The index is cached on disk next to the file (in __pycache__), keyed by a hash of the file contents, so unchanged files are not parsed again.
+    Used in KAST to generate Kaster input and output variable names
+    Parameters
+    ----------
+    file : str
+        File from which to index functions
+    Returns
+    -------
+    signature_index : Dict[str, Tuple[List[str], List[str]]]
+        Function name -> (input variable names, returned variable names); returned names are None when the function does not return a tuple of names
+    """
+    with open(file, 'rb') as source_file:
+        source = source_file.read()
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(file)), '__pycache__',
+                              f'{os.path.basename(file)}.kastindex-{hashlib.sha256(source).hexdigest()[:16]}.json')
+    try:
+        with open(cache_path, 'r') as cache_file:
+            return dict((name, tuple(signature)) for name, signature in json.load(cache_file).items())
+    except (OSError, ValueError):
+        pass
+
+    signature_index = {}
+    for node in ast.parse(source).body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        input_variables = [arg.arg for arg in node.args.posonlyargs + node.args.args]
+        output_variables = None
+        for body_node in node.body:
+            output_variables = check_body_node(body_node)
+            if output_variables != None:
+                break
+        signature_index[node.name] = (input_variables, output_variables)
+
+    # Caching is only an optimization, so an unwritable directory is not an error
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path + '.tmp', 'w') as cache_file:
+            json.dump(signature_index, cache_file)
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass
+    return signature_index
+
+def value_has_changed(old_value, new_value) -> bool:
+    """
+    Determine whether a knowledge value differs from its previous value.
+    Used by the Spellbook to decide which Kasters need to be re-run on a new step.
+    Parameters
+    ----------
+    old_value : variable
+        Value held before the update
+    new_value : variable
+        Value being written
+    Returns
+    -------
+    changed : bool
+        True if the values are not equal
+    """
+    if old_value is new_value:
+        return False
+    try:
+        return bool(old_value != new_value)
+    except (ValueError, TypeError):
+        # Array-likes compare elementwise and have no single truth value
+        return not np.array_equal(old_value, new_value)
+
+def stack_values(values: list) -> np.ndarray:
+    """
+    Stack a list of per-row values into a single array with one entry per row.
+    Values that cannot form a regular array (ex. lists of differing lengths) are kept in an object array.
+    Parameters
+    ----------
+    values : list
+        Values to be stacked, one per row
+    Returns
+    -------
+    stacked_values : np.ndarray
+        Array whose first dimension indexes the given values
+    """
+    try:
+        return np.asarray(values)
+    except ValueError:
+        stacked_values = np.empty(len(values), dtype=object)
+        for index, value in enumerate(values):
+            stacked_values[index] = value
+        return stacked_values
+
+def str_to_bool(text: str) -> bool:
+    """
+    Convert a config string (True/False, yes/no, on/off, 1/0) to a bool.
+    """
+    return str(text).strip().lower() in ('true', 'yes', 'on', '1')
+
 # Decorators: these get wrapped to prevent having to test them. Trying to mock calls that pytest uses (ast and getattr fall under this category) causes testing issues.
 def get_attribute_by_name(object, name):
     return getattr(object,name) 
@@ -12,6 +12,13 @@ print_io.py
 Helper script used by sim.py to print out simulation data with pretty colors
 """
 
+import os
+import sys
+from time import monotonic
+from typing import Dict, Iterable, Optional, Tuple
+
+from kast.utils.functions import value_has_changed
+
 #############################     COLORS    #############################
 # Static class to hold color constants
 class bcolors:
@@ -40,6 +47,24 @@ status_colors = {'GREEN' : bcolors.OKGREEN,
                  'RED' : bcolors.FAIL,
                  '---' : bcolors.OKBLUE}
 
+# ANSI codes of every bcolors constant, restored by set_colors(True)
+ANSI_COLORS = dict((name, value) for name, value in vars(bcolors).items() if not name.startswith('_'))
+
+def colors_supported(stream) -> bool:
+    # Colors are only used on terminals, and never when the NO_COLOR environment variable is set
+    return hasattr(stream, 'isatty') and stream.isatty() and 'NO_COLOR' not in os.environ
+
+def set_colors(enabled: bool) -> None:
+    # Switch every color constant between its ANSI code and an empty string
+    for name, value in ANSI_COLORS.items():
+        setattr(bcolors, name, value if enabled else '')
+    for name in scolors:
+        scolors[name] = getattr(bcolors, name)
+    for status, name in (('GREEN', 'OKGREEN'), ('YELLOW', 'WARNING'), ('RED', 'FAIL'), ('---', 'OKBLUE')):
+        status_colors[status] = getattr(bcolors, name)
+
+set_colors(colors_supported(sys.stdout)) # Output redirected to a file or pipe stays free of escape codes
+
 #############################      I/O     #############################
 # Print that the simulation started
 def print_kast_header():
@@ -68,4 +93,112 @@ def print_spellbook_knowledge(runtime,io=False):
             print(bcolors.OKBLUE +"\nLow Level Knowledge Values:" + bcolors.ENDC)
             print([str(knowledge) for knowledge in runtime.spellbook.low_level_knowledge.values()])
             print(bcolors.OKBLUE +"\nHigh Level Knowledge Values:" + bcolors.ENDC)
-            print([str(knowledge) for knowledge in runtime.spellbook.high_level_knowledge.values()])
\ No newline at end of file
+            print([str(knowledge) for knowledge in runtime.spellbook.high_level_knowledge.values()])
+
+def print_knowledge_values(low_level_values, high_level_values, io=False):
+    # Print knowledge given as {name: value} dictionaries, as returned from parallel replay workers
+    if io in ('low', 'both'):
+        print(bcolors.OKBLUE +"\nLow Level Knowledge Values:" + bcolors.ENDC)
+        print([f"({name}: {value})" for name, value in low_level_values.items()])
+    if io in ('high', 'both'):
+        print(bcolors.OKBLUE +"\nHigh Level Knowledge Values:" + bcolors.ENDC)
+        print([f"({name}: {value})" for name, value in high_level_values.items()])
+
+
+class KnowledgePrinter():
+    def __init__(self,
+                 every: int = 1,
+                 max_rate: float = 0.0,
+                 changed_only: bool = False,
+                 flush_interval: float = 0.1,
+                 colors: Optional[bool] = None,
+                 stream=None):
+        """
+        Prints step knowledge as print_spellbook_knowledge does, without letting console output limit the step rate.
+        Output is collected in a buffer and written to the stream at most once per flush_interval seconds.
+
+        Parameters
+        ----------
+        every : int
+            Print only every Nth step (default 1, every step)
+        max_rate : float
+            Print at most this many steps per second, skipping the rest; 0 does not limit the rate (default 0)
+        changed_only : bool
+            Print only knowledge whose value changed since it was last printed (default False)
+        flush_interval : float
+            Seconds between writes of buffered output to the stream (default 0.1)
+        colors : bool
+            Force ANSI colors on or off; by default they are used only when stdout is a terminal
+        stream : file
+            Where output is written (default sys.stdout at the time of each flush)
+        """
+        if every < 1:
+            raise ValueError(f'KnowledgePrinter must print every step or fewer, not every {every} steps.')
+        self.every = every
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.changed_only = changed_only
+        self.flush_interval = flush_interval
+        self.stream = stream
+        if colors is not None:
+            set_colors(colors)
+
+        self.buffer = []
+        self.steps_seen = 0
+        self.last_print_time = None
+        self.last_flush_time = monotonic()
+        self.printed_values: Dict[str, object] = {} # Last printed value of each knowledge item, for changed_only
+
+    def print_spellbook(self, step: int, spellbook, io=False) -> None:
+        # Print a step of a Spellbook's knowledge, subject to the printer's step and rate limits
+        if self.should_print():
+            self.print_items(step,
+                             ((name, knowledge.value) for name, knowledge in spellbook.low_level_knowledge.items()),
+                             ((name, knowledge.value) for name, knowledge in spellbook.high_level_knowledge.items()),
+                             io)
+
+    def print_values(self, step: int, low_level_values: Dict, high_level_values: Dict, io=False) -> None:
+        # As print_spellbook, for knowledge given as {name: value} dictionaries
+        if self.should_print():
+            self.print_items(step, low_level_values.items(), high_level_values.items(), io)
+
+    def should_print(self) -> bool:
+        # Apply the every-Nth-step and rate limits, before any string is built for the step
+        self.steps_seen += 1
+        if self.steps_seen % self.every:
+            return False
+        if self.min_interval:
+            now = monotonic()
+            if self.last_print_time is not None and now - self.last_print_time < self.min_interval:
+                return False
+            self.last_print_time = now
+        return True
+
+    def print_items(self, step: int, low_level_items: Iterable[Tuple[str, object]], high_level_items: Iterable[Tuple[str, object]], io=False) -> None:
+        self.buffer.append(bcolors.HEADER + bcolors.BOLD + "\n--------------------- STEP " + str(step) + " ---------------------\n" + bcolors.ENDC + "\n")
+        if io in ('low', 'both'):
+            self.buffer.append(bcolors.OKBLUE + "\nLow Level Knowledge Values:" + bcolors.ENDC + "\n")
+            self.buffer.append(self.format_items(low_level_items) + "\n")
+        if io in ('high', 'both'):
+            self.buffer.append(bcolors.OKBLUE + "\nHigh Level Knowledge Values:" + bcolors.ENDC + "\n")
+            self.buffer.append(self.format_items(high_level_items) + "\n")
+        if monotonic() - self.last_flush_time >= self.flush_interval:
+            self.flush()
+
+    def format_items(self, items: Iterable[Tuple[str, object]]) -> str:
+        if self.changed_only:
+            changed_items = []
+            for name, value in items:
+                if name not in self.printed_values or value_has_changed(self.printed_values[name], value):
+                    self.printed_values[name] = value
+                    changed_items.append((name, value))
+            items = changed_items
+        return str([f"({name}: {value})" for name, value in items])
+
+    def flush(self) -> None:
+        # Write all buffered output to the stream
+        if self.buffer:
+            stream = self.stream or sys.stdout
+            stream.write(''.join(self.buffer))
+            stream.flush()
+            self.buffer.clear()
+        self.last_flush_time = monotonic()
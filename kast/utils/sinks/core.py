@@ -0,0 +1,123 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import queue
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from kast.utils.functions import str_to_bool
+
+def copy_arrays(values: Dict) -> Dict:
+    # values with NumPy arrays copied, as arrays may be views that change before their batch is written (ex. shared memory frames)
+    return dict((name, np.array(value, copy=True) if isinstance(value, np.ndarray) else value) for name, value in values.items())
+
+class Sink():
+    def __init__(self, runtime):
+        """
+        Writes the low and high level knowledge of every step to a file, selected in the config with SinkType.
+        Steps are collected in memory and written a batch at a time, optionally on a background writer thread.
+        Subclasses implement open_file, write_batch and close_file.
+
+        Config options
+        --------------
+        SinkFile : str
+            Path of the file written
+        SinkBufferSize : int
+            Number of steps collected before they are written as a batch (default 1024)
+        SinkThread : bool
+            Write batches on a background thread, so kasting continues while they are written (default False)
+        """
+        self.runtime = runtime
+        self.path = self.get_config_option('SinkFile')
+        if not self.path:
+            raise ValueError(f'SinkFile must be set to write a {type(self).__name__}.')
+        self.buffer_size = int(self.get_config_option('SinkBufferSize', 1024))
+        self.threaded = str_to_bool(self.get_config_option('SinkThread', 'False'))
+
+        self.rows: List[Tuple[int, Dict, Dict]] = []
+        self.rows_written = 0
+        self.closed = False
+        self.writer_error: Optional[BaseException] = None
+        self.open_file()
+
+        self.pending_batches = None
+        self.writer_thread = None
+        if self.threaded:
+            # Bounded, so a writer that falls behind slows kasting down rather than holding every step in memory
+            self.pending_batches = queue.Queue(maxsize=4)
+            self.writer_thread = threading.Thread(target=self.write_pending_batches, name='kast-sink-writer', daemon=True)
+            self.writer_thread.start()
+
+    def open_file(self) -> None:
+        # Open the output file for writing
+        raise NotImplementedError
+
+    def write_batch(self, rows: List[Tuple[int, Dict, Dict]]) -> None:
+        # Write a batch of (step, {low level name: value}, {high level name: value}) rows, in step order
+        raise NotImplementedError
+
+    def close_file(self) -> None:
+        # Finish and close the output file
+        raise NotImplementedError
+
+    def get_config_option(self, option: str, fallback=None):
+        # Read a sink specific setting from the runtime config's DEFAULT section
+        return self.runtime.config['DEFAULT'].get(option, fallback)
+
+    def write(self, step: int, low_level_values: Dict, high_level_values: Dict) -> None:
+        # Collect one step of knowledge, writing the collected steps once SinkBufferSize are held
+        if self.closed:
+            raise ValueError(f'Cannot write to a closed {type(self).__name__}.')
+        self.rows.append((step, copy_arrays(low_level_values), copy_arrays(high_level_values)))
+        if len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        # Write (or, with a writer thread, hand over) every collected step
+        self.raise_writer_error()
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        if self.pending_batches is None:
+            self.write_batch(rows)
+            self.rows_written += len(rows)
+        else:
+            self.pending_batches.put(rows)
+
+    def write_pending_batches(self) -> None:
+        # Writer thread: write batches until close() hands over None
+        while True:
+            rows = self.pending_batches.get()
+            if rows is None:
+                return
+            if self.writer_error is not None:
+                continue # Drop batches after a failed write; the error is raised on the kasting thread
+            try:
+                self.write_batch(rows)
+                self.rows_written += len(rows)
+            except BaseException as error:
+                self.writer_error = error
+
+    def raise_writer_error(self) -> None:
+        if self.writer_error is not None:
+            error, self.writer_error = self.writer_error, None
+            raise error
+
+    def close(self) -> None:
+        # Write every remaining step and close the file; closing more than once has no effect
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        if self.writer_thread is not None:
+            self.pending_batches.put(None)
+            self.writer_thread.join()
+        self.close_file()
+        self.raise_writer_error()
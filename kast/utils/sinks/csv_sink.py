@@ -0,0 +1,44 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import csv
+import numpy as np
+from typing import Dict, List, Tuple
+
+from kast.utils.sinks.core import Sink
+
+def to_csv_value(value):
+    # Arrays are written as Python-format lists (ex. "[1.0, 2.0]"), as KAST's own csv data source reads them
+    if isinstance(value, np.ndarray):
+        return str(value.tolist())
+    return value
+
+class CsvSink(Sink):
+    """
+    Writes every step as one CSV row: a step column, then one column per low and high level knowledge item.
+    Columns are those of the first step written; knowledge first seen later is not written.
+    """
+    def open_file(self) -> None:
+        self.file = open(self.path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.low_level_names = None
+        self.high_level_names = None
+
+    def write_batch(self, rows: List[Tuple[int, Dict, Dict]]) -> None:
+        if self.low_level_names is None:
+            self.low_level_names = list(rows[0][1])
+            self.high_level_names = list(rows[0][2])
+            self.writer.writerow(['step'] + self.low_level_names + self.high_level_names)
+        self.writer.writerows([step]
+                              + [to_csv_value(low_level_values.get(name)) for name in self.low_level_names]
+                              + [to_csv_value(high_level_values.get(name)) for name in self.high_level_names]
+                              for step, low_level_values, high_level_values in rows)
+
+    def close_file(self) -> None:
+        self.file.close()
@@ -0,0 +1,37 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import json
+import numpy as np
+from typing import Dict, List, Tuple
+
+from kast.utils.sinks.core import Sink
+
+def to_json_value(value):
+    # json.dumps fallback for NumPy values, which knowledge often holds
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+class JsonlSink(Sink):
+    """
+    Writes every step as one JSON object per line: {"step": step, "low": {name: value}, "high": {name: value}}.
+    Values JSON cannot represent are written as their str().
+    """
+    def open_file(self) -> None:
+        self.file = open(self.path, 'w')
+
+    def write_batch(self, rows: List[Tuple[int, Dict, Dict]]) -> None:
+        self.file.write(''.join(json.dumps({'step': step, 'low': low_level_values, 'high': high_level_values}, default=to_json_value) + '\n'
+                                for step, low_level_values, high_level_values in rows))
+
+    def close_file(self) -> None:
+        self.file.close()
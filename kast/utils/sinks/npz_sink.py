@@ -0,0 +1,49 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import zipfile
+import numpy as np
+from typing import Dict, List, Tuple
+
+from kast.utils.functions import stack_values
+from kast.utils.sinks.core import Sink
+
+class NpzSink(Sink):
+    """
+    Writes knowledge column by column into a NumPy .npz archive. Every batch adds one array per column,
+    named <column>/<batch number>, so the file is written as kasting goes; load_npz_sink joins them back together.
+    Columns are step, low/<name> and high/<name>, for the knowledge of the first step written.
+    """
+    def open_file(self) -> None:
+        self.archive = zipfile.ZipFile(self.path, 'w', allowZip64=True)
+        self.num_batches = 0
+        self.names = None # ((section, index in row, name), ...) of the knowledge of the first step
+
+    def write_batch(self, rows: List[Tuple[int, Dict, Dict]]) -> None:
+        if self.names is None:
+            self.names = [('low', 1, name) for name in rows[0][1]] + [('high', 2, name) for name in rows[0][2]]
+        columns = {'step': np.array([row[0] for row in rows])}
+        for section, section_index, name in self.names:
+            columns[f'{section}/{name}'] = stack_values([row[section_index].get(name) for row in rows])
+        for column, values in columns.items():
+            with self.archive.open(f'{column}/{self.num_batches:06d}.npy', 'w', force_zip64=True) as array_file:
+                np.lib.format.write_array(array_file, values, allow_pickle=True)
+        self.num_batches += 1
+
+    def close_file(self) -> None:
+        self.archive.close()
+
+def load_npz_sink(path: str) -> Dict[str, np.ndarray]:
+    # Read a file written by NpzSink as {column: array with one entry per step}
+    batches: Dict[str, List[np.ndarray]] = {}
+    with np.load(path, allow_pickle=True) as archive:
+        for entry in sorted(archive.files):
+            column = entry.rsplit('/', 1)[0]
+            batches.setdefault(column, []).append(archive[entry])
+    return dict((column, np.concatenate(arrays) if len(arrays) > 1 else arrays[0]) for column, arrays in batches.items())
@@ -0,0 +1,49 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+from benchmarks.run_benchmarks import run_scenario, find_regressions, format_results
+
+def test_run_benchmarks_run_scenario_kasts_every_row_and_reports_metrics():
+    # Arrange
+    num_rows = pytest.gen.randint(1,50)
+
+    # Act
+    result = run_scenario({'num_rows': num_rows, 'num_columns': 4, 'num_kasters': 4, 'fan_in': 2, 'chain_depth': 2})
+
+    # Assert
+    assert result['steps'] == num_rows
+    assert result['startup_seconds'] > 0
+    assert result['steps_per_second'] > 0
+    assert result['peak_rss_mb'] > 0
+    assert 'startup s' in format_results({'scenario': result})
+
+def test_run_benchmarks_run_scenario_counts_rows_kasted_in_batch_mode():
+    # Act
+    result = run_scenario({'num_rows': 10, 'num_columns': 2, 'num_kasters': 1, 'mode': 'batch', 'block_size': 4})
+
+    # Assert
+    assert result['steps'] == 10
+
+def test_run_benchmarks_find_regressions_flags_metrics_worse_than_tolerance_in_either_direction():
+    # Arrange
+    baseline = {'a': {'steps_per_second': 1000.0, 'startup_seconds': 1.0, 'peak_rss_mb': 100.0}}
+    results = {'a': {'steps_per_second': 800.0, 'startup_seconds': 1.05, 'peak_rss_mb': 150.0},
+               'not_in_baseline': {'steps_per_second': 1.0, 'startup_seconds': 1.0, 'peak_rss_mb': 1.0}}
+
+    # Act
+    regressions = find_regressions(results, baseline, tolerance=0.1)
+
+    # Assert
+    assert len(regressions) == 2
+    assert regressions[0].startswith('a: steps_per_second 800')
+    assert regressions[1].startswith('a: peak_rss_mb 150')
+    assert find_regressions(results, baseline, tolerance=0.6) == []
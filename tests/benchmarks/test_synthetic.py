@@ -0,0 +1,65 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import csv
+
+from benchmarks.synthetic import write_synthetic_csv, kaster_inputs, write_synthetic_kasters, write_synthetic_config
+from kast.utils.functions import import_module, index_kaster_signatures
+
+def test_write_synthetic_csv_writes_rows_of_list_valued_cells(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,20)
+    num_columns = pytest.gen.randint(1,5)
+    cell_width = pytest.gen.randint(2,4)
+    data_path = tmp_path / 'data.csv'
+
+    # Act
+    write_synthetic_csv(str(data_path), num_rows, num_columns, cell_width)
+
+    # Assert
+    with open(data_path) as data_file:
+        rows = list(csv.reader(data_file))
+    assert rows[0] == [f'c{column}' for column in range(num_columns)]
+    assert len(rows) == num_rows + 1
+    assert all(len(eval(cell)) == cell_width for cell in rows[1])
+
+def test_kaster_inputs_chains_each_level_onto_outputs_of_the_level_before():
+    # Act
+    inputs = kaster_inputs(num_columns=4, num_kasters=6, fan_in=2, chain_depth=3)
+
+    # Assert
+    assert inputs == [['c0', 'c1'], ['c2', 'c3'], ['k0', 'k1'], ['k0', 'k1'], ['k2', 'k3'], ['k2', 'k3']]
+    with pytest.raises(ValueError):
+        kaster_inputs(num_columns=4, num_kasters=2, fan_in=2, chain_depth=3)
+
+def test_write_synthetic_kasters_writes_kasters_with_inputs_and_outputs_kast_can_index(tmp_path):
+    # Arrange
+    kaster_path = str(tmp_path / 'kasters.py')
+
+    # Act
+    write_synthetic_kasters(kaster_path, num_columns=3, num_kasters=4, fan_in=2, chain_depth=2)
+
+    # Assert
+    assert index_kaster_signatures(kaster_path) == {'kaster_0': (['c0', 'c1'], ['k0']),
+                                                    'kaster_1': (['c2', 'c0'], ['k1']),
+                                                    'kaster_2': (['k0', 'k1'], ['k2']),
+                                                    'kaster_3': (['k0', 'k1'], ['k3'])}
+    assert import_module('synthetic_kasters', kaster_path).kaster_0(1.0, [2.0, 3.0]) == (6.0,)
+
+def test_write_synthetic_config_declares_schema_and_extra_options(tmp_path):
+    # Act
+    config_path = write_synthetic_config(str(tmp_path), num_rows=5, num_columns=2, cell_width=3, options={'TypeDriftPolicy': 'off'})
+
+    # Assert
+    with open(config_path) as config_file:
+        config_text = config_file.read()
+    assert 'TypeDriftPolicy = off' in config_text
+    assert 'c1 = float[3]' in config_text
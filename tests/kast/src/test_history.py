@@ -0,0 +1,72 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import numpy as np
+
+from kast.src.history import KnowledgeHistory
+
+def test_knowledge_history__init__raises_value_error_for_capacity_below_one():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        KnowledgeHistory(0)
+
+    # Assert
+    assert 'KnowledgeHistory capacity must be at least 1, not 0.' in e_info.exconly()
+
+def test_knowledge_history_last_returns_most_recent_values_oldest_first_as_a_view():
+    # Arrange
+    arg_capacity = pytest.gen.randint(1,10)
+    num_appends = pytest.gen.randint(0,30)
+    cut = KnowledgeHistory(arg_capacity)
+
+    # Act
+    for i in range(num_appends):
+        cut.append(i + 1, float(i))
+
+    # Assert
+    expected_count = min(num_appends, arg_capacity)
+    assert len(cut) == expected_count
+    assert list(cut.last_steps()) == list(range(num_appends - expected_count + 1, num_appends + 1))
+    if num_appends > 0:
+        assert list(cut.last()) == [float(i) for i in range(num_appends - expected_count, num_appends)]
+        assert list(cut.last(1)) == [float(num_appends - 1)]
+        assert np.shares_memory(cut.last(), cut.values)
+
+def test_knowledge_history_keeps_vectors_in_a_typed_array_and_widens_it_for_new_types():
+    # Arrange
+    cut = KnowledgeHistory(4)
+
+    # Act
+    cut.append(1, np.array([1, 2]))
+    int_dtype = cut.values.dtype
+    cut.append(2, np.array([1.5, 2.5]))
+    float_dtype = cut.values.dtype
+    cut.append(3, 'not a vector')
+
+    # Assert
+    assert int_dtype == np.int64
+    assert float_dtype == np.float64
+    assert cut.values.dtype == object
+    assert list(cut.last(3)[0]) == [1, 2]
+    assert list(cut.last(3)[1]) == [1.5, 2.5]
+    assert cut.last(3)[2] == 'not a vector'
+
+def test_knowledge_history_since_and_at_step_index_values_by_step():
+    # Arrange
+    cut = KnowledgeHistory(3)
+    for step in range(1, 6):
+        cut.append(step, step * 10)
+
+    # Act / Assert
+    assert list(cut.since(4)) == [40, 50]
+    assert cut.at_step(3) == 30
+    with pytest.raises(KeyError):
+        cut.at_step(2) # Already overwritten
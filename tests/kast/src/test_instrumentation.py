@@ -0,0 +1,77 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import json
+
+from kast.src.instrumentation import LatencyHistogram, KastStats, SUB_BUCKETS
+
+def test_latency_histogram_percentile_is_within_a_sub_bucket_of_the_true_latency():
+    # Arrange
+    cut = LatencyHistogram()
+    latencies = sorted(pytest.gen.randint(1,10**9) for i in range(pytest.gen.randint(1,500)))
+
+    # Act
+    for latency in latencies:
+        cut.record(latency)
+
+    # Assert
+    for percent in (50, 99, 100):
+        true_latency = latencies[max(1, -(-len(latencies) * percent // 100)) - 1]
+        assert true_latency <= cut.percentile(percent) <= true_latency * (1 + 1 / SUB_BUCKETS)
+    assert cut.count == len(latencies)
+    assert cut.total_ns == sum(latencies)
+    assert cut.max_ns == latencies[-1]
+
+def test_latency_histogram_records_small_latencies_exactly():
+    # Arrange
+    cut = LatencyHistogram()
+
+    # Act
+    for latency in range(SUB_BUCKETS * 2):
+        cut.record(latency)
+
+    # Assert
+    assert [cut.bucket_upper_bound(index) for index in range(SUB_BUCKETS * 2)] == list(range(SUB_BUCKETS * 2))
+    assert cut.percentile(50) == SUB_BUCKETS - 1
+
+def test_latency_histogram_summary_is_zero_when_nothing_was_recorded():
+    # Act / Assert
+    assert LatencyHistogram().summary() == {'count': 0, 'total_ms': 0.0, 'mean_us': 0.0, 'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+
+def test_kast_stats_summary_groups_stage_and_kaster_histograms_by_name():
+    # Arrange
+    cut = KastStats()
+
+    # Act
+    cut.record_stage('kast', 2000)
+    cut.record_stage('kast', 4000)
+    cut.record_kaster('double', 1000)
+
+    # Assert
+    summary = cut.summary()
+    assert summary['stages']['kast']['count'] == 2
+    assert summary['stages']['kast']['mean_us'] == 3.0
+    assert summary['kasters']['double']['max_us'] == 1.0
+    assert 'double' in cut.report()
+    cut.reset()
+    assert cut.summary() == {'stages': {}, 'kasters': {}}
+
+def test_kast_stats_dump_writes_summary_as_json(tmp_path):
+    # Arrange
+    cut = KastStats()
+    cut.record_kaster('double', pytest.gen.randint(1,10**6))
+    dump_path = tmp_path / 'stats.json'
+
+    # Act
+    cut.dump(str(dump_path))
+
+    # Assert
+    assert json.loads(dump_path.read_text()) == cut.summary()
@@ -142,3 +142,156 @@ def test_knowledge_core__str__method_properly_returns_all_representative_info(mo
     assert ret == f"({cut.name}: {cut.value})"
 
 
+
+def test_knowledge_core_bind_moves_value_into_given_slot_then_reads_and_updates_through_it(mocker):
+    # Arrange
+    arg_values = [None] * pytest.gen.randint(1,10)
+    arg_slot = pytest.gen.randint(0,len(arg_values) - 1)
+
+    cut = Knowledge('low', 'name', 1.0)
+
+    # Act
+    cut.bind(arg_values, arg_slot)
+    cut.update(2.0)
+
+    # Assert
+    assert cut.slot == arg_slot
+    assert arg_values[arg_slot] == 2.0
+    assert cut.value == 2.0
+    assert not hasattr(cut, '__dict__')
+
+def test_knowledge_core_update_with_off_policy_never_compares_types(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), 'string', 'off')
+
+    with warnings.catch_warnings(record=True) as w:
+        # Act
+        cut.update(1.0)
+
+        # Assert
+        assert len(w) == 0
+        assert cut.value == 1.0
+
+def test_knowledge_core_update_with_warn_once_policy_only_warns_on_first_change_of_type(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), 1, 'warn_once')
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        # Act
+        cut.update(1.5)
+        cut.update(2)
+        cut.update(2.5)
+
+        # Assert
+        assert len(w) == 1
+        assert cut.value == 2.5
+
+def test_knowledge_core_update_with_strict_policy_raises_type_error_and_keeps_previous_value(mocker):
+    # Arrange
+    arg_name = MagicMock()
+    cut = Knowledge(None, arg_name, 1, 'strict')
+
+    # Act
+    with pytest.raises(TypeError) as e_info:
+        cut.update(1.5)
+
+    # Assert
+    assert f"Knowledge {arg_name} holds {int}, but was updated with {float}." in e_info.exconly()
+    assert cut.value == 1
+
+def test_knowledge_core_update_with_coerce_policy_converts_values_to_first_non_none_type(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), _policy='coerce')
+
+    # Act
+    cut.update(1.0)
+    cut.update(2)
+
+    # Assert
+    assert cut.value == 2.0
+    assert type(cut.value) == float
+    with pytest.raises(TypeError):
+        cut.update('not a number')
+
+def test_knowledge_core_update_with_coerce_policy_rejects_lossy_conversions(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), _policy='coerce')
+    cut.update(1.0)
+
+    # Act
+    cut.update(2)
+    with pytest.raises(TypeError) as e_info:
+        cut.update(2 ** 53 + 1)
+
+    # Assert
+    assert 'would change its value' in e_info.exconly()
+    assert cut.value == 2.0
+    assert type(cut.value) == float
+
+def test_knowledge_core_update_with_coerce_policy_widens_int_to_float_and_passes_none_through(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), _policy='coerce')
+    cut.update(0)
+
+    # Act
+    cut.update(2.0)
+    int_value = cut.value
+    cut.update(2.5)
+    float_value = cut.value
+    cut.update(None)
+    none_value = cut.value
+    cut.update(3)
+
+    # Assert
+    assert type(int_value) == int
+    assert float_value == 2.5
+    assert none_value == None
+    assert cut.value == 3.0
+    assert type(cut.value) == float
+
+def test_knowledge_core_update_with_coerce_policy_converts_arrays_to_the_dtype_and_shape_of_the_current_value(mocker):
+    # Arrange
+    cut = Knowledge(None, MagicMock(), _policy='coerce')
+    cut.update(np.array([1.0, 2.0]))
+
+    # Act
+    cut.update([2, 3])
+
+    # Assert
+    assert type(cut.value) == np.ndarray
+    assert cut.value.dtype == np.float64
+    assert cut.value.tolist() == [2.0, 3.0]
+    with pytest.raises(TypeError) as e_info:
+        cut.update([1, 2, 3])
+    assert 'shape (3,) does not match (2,)' in e_info.exconly()
+    with pytest.raises(TypeError):
+        cut.update(['a', 'b'])
+    assert cut.value.tolist() == [2.0, 3.0]
+
+def test_knowledge_core_update_with_coerce_policy_widens_integer_arrays_and_numpy_scalars_and_rejects_lossy_casts(mocker):
+    # Arrange
+    cut_array = Knowledge(None, MagicMock(), _policy='coerce')
+    cut_array.update(np.array([1, 2]))
+    cut_scalar = Knowledge(None, MagicMock(), _policy='coerce')
+    cut_scalar.update(np.int32(1))
+    cut_float32 = Knowledge(None, MagicMock(), _policy='coerce')
+    cut_float32.update(np.array([0.5], dtype=np.float32))
+
+    # Act
+    cut_array.update([3.0, 4.0])
+    integral_array = cut_array.value
+    cut_array.update([1.5, 2.0])
+    cut_scalar.update(5)
+    integral_scalar = cut_scalar.value
+    cut_scalar.update(2.7)
+    with pytest.raises(TypeError):
+        cut_float32.update([0.1])
+
+    # Assert
+    assert integral_array.dtype == np.array([1, 2]).dtype
+    assert cut_array.value.tolist() == [1.5, 2.0]
+    assert cut_array.value.dtype == np.float64
+    assert type(integral_scalar) == np.int32
+    assert cut_scalar.value == 2.7
+    assert type(cut_scalar.value) == np.float64
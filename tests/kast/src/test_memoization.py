@@ -0,0 +1,101 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import numpy as np
+
+from kast.src.memoization import KasterMemo, make_memo_key
+
+def test_make_memo_key_distinguishes_values_by_type_and_contents():
+    # Act / Assert
+    assert make_memo_key(1) != make_memo_key(1.0)
+    assert make_memo_key('a') == make_memo_key('a')
+    assert make_memo_key(np.array([1.0, 2.0])) == make_memo_key(np.array([1.0, 2.0]))
+    assert make_memo_key(np.array([1.0, 2.0])) != make_memo_key(np.array([1.0, 3.0]))
+    assert make_memo_key(np.array([1.0, 2.0])) != make_memo_key(np.array([1, 2]))
+    assert make_memo_key([1, [2, 3]]) == make_memo_key([1, [2, 3]])
+    assert make_memo_key([1, 2]) != make_memo_key((1, 2))
+
+def test_make_memo_key_returns_none_for_unhashable_values():
+    # Act / Assert
+    assert make_memo_key({'a': 1}) == None
+    assert make_memo_key([1, {'a': 1}]) == None
+
+def test_make_memo_key_returns_none_for_object_arrays():
+    # Arrange
+    value = np.empty(1, dtype=object)
+    value[0] = [1, 2]
+
+    # Act / Assert
+    assert make_memo_key(value) == None
+    assert make_memo_key([value]) == None
+
+def test_kaster_memo__init__sets_maxsize_and_empty_counters():
+    # Arrange
+    arg_maxsize = pytest.gen.randint(1,10)
+
+    # Act
+    cut = KasterMemo(arg_maxsize)
+
+    # Assert
+    assert cut.maxsize == arg_maxsize
+    assert len(cut.entries) == 0
+    assert cut.hits == 0
+    assert cut.misses == 0
+
+def test_kaster_memo_call_calls_method_on_miss_and_returns_cached_value_on_hit():
+    # Arrange
+    fake_return = MagicMock()
+    fake_method = MagicMock(return_value=fake_return)
+    cut = KasterMemo(10)
+
+    # Act
+    first_ret = cut.call(fake_method, (1, np.array([1, 2])))
+    second_ret = cut.call(fake_method, (1, np.array([1, 2])))
+
+    # Assert
+    assert first_ret == fake_return
+    assert second_ret == fake_return
+    assert fake_method.call_count == 1
+    assert fake_method.call_args_list[0].args[0] == 1
+    assert cut.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 10}
+
+def test_kaster_memo_call_evicts_least_recently_used_entry_beyond_maxsize():
+    # Arrange
+    fake_method = MagicMock(side_effect=lambda a: (a,))
+    cut = KasterMemo(2)
+
+    # Act
+    cut.call(fake_method, (1,))
+    cut.call(fake_method, (2,))
+    cut.call(fake_method, (1,)) # 2 is now least recently used
+    cut.call(fake_method, (3,)) # Evicts 2
+    cut.call(fake_method, (1,))
+    cut.call(fake_method, (2,))
+
+    # Assert
+    assert fake_method.call_count == 4
+    assert cut.hits == 2
+    assert cut.misses == 4
+    assert len(cut.entries) == 2
+
+def test_kaster_memo_call_always_calls_method_for_unhashable_inputs():
+    # Arrange
+    fake_method = MagicMock(return_value=(1,))
+    cut = KasterMemo(10)
+
+    # Act
+    cut.call(fake_method, ({'unhashable': True},))
+    cut.call(fake_method, ({'unhashable': True},))
+
+    # Assert
+    assert fake_method.call_count == 2
+    assert cut.misses == 2
+    assert len(cut.entries) == 0
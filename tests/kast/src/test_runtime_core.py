@@ -13,6 +13,10 @@ from mock import MagicMock
 
 import os
 import configparser
+import numpy as np
+import asyncio
+import csv
+import json
 from inspect import isfunction
 
 import kast
@@ -20,7 +24,13 @@ import kast.src
 from kast.src.kast_runtime import *
 import kast.src.kast_runtime
 from kast.src.spellbook import Spellbook
+from kast.utils.sinks.npz_sink import load_npz_sink
 
+def fake_kaster_method():
+    # Kaster methods are only imported when defined in the kaster methods module itself
+    method = MagicMock()
+    method.__module__ = 'kaster_methods'
+    return method
 
 def test_runtime_core__init__sets_internal_filepath_to_given_arg_filepath(mocker):
     # Arrange
@@ -30,6 +40,7 @@ def test_runtime_core__init__sets_internal_filepath_to_given_arg_filepath(mocker
     cut.data_source = MagicMock()
     cut.kaster_definitions = MagicMock()
     cut.headers = MagicMock()
+    cut.spellbook_options = {}
 
     mocker.patch.object(cut,'parse_config')
     mocker.patch.object(cut,'import_kaster_methods')
@@ -67,6 +78,7 @@ def test_runtime_core__init__does_not_raise_assertion_error_if_given_path_exists
     cut.data_source = MagicMock()
     cut.kaster_definitions = MagicMock()
     cut.headers = MagicMock()
+    cut.spellbook_options = {}
 
     mocker.patch('os.path.exists',return_value=True)
     mocker.patch.object(cut,'parse_config')
@@ -89,6 +101,7 @@ def test_runtime_core__init__calls_expected_initialization_methods(mocker):
     cut.data_source = MagicMock()
     cut.kaster_definitions = MagicMock()
     cut.headers = MagicMock()
+    cut.spellbook_options = {}
 
     mocker.patch.object(cut,'parse_config')
     mocker.patch.object(cut,'import_kaster_methods')
@@ -115,6 +128,7 @@ def test_runtime_core__init__generates_attribute_spellbook_with_internal_headers
     cut.data_source = fake_data_source
     cut.kaster_definitions = fake_kaster_definitions
     cut.headers = fake_headers
+    cut.spellbook_options = {}
 
     mocker.patch.object(cut,'parse_config')
     mocker.patch.object(cut,'import_kaster_methods')
@@ -187,6 +201,57 @@ def test_runtime_core_parse_config_sets_correct_internal_references_from_given_c
     assert cut.data_file_path == fake_config_dict['DEFAULT']['DataFile']
     assert cut.data_type == fake_config_dict['DEFAULT']['DataType']
 
+def test_runtime_core_parse_config_reads_optional_spellbook_settings(mocker):
+    # Arrange
+    fake_config = MagicMock()
+    num_threads = pytest.gen.randint(0,32)
+    fake_config_dict = {'DEFAULT':{
+                        'KasterMethodsPath': MagicMock(),
+                        'DataFile': MagicMock(),
+                        'DataType': MagicMock(),
+                        'TrackChanges': 'False',
+                        'KastThreads': str(num_threads),
+                        'TypeDriftPolicy': 'strict',
+                        'HistorySize': '5',
+                        'SnapshotDepth': '3'
+        }
+    }
+    fake_config.__getitem__.side_effect = fake_config_dict.__getitem__
+    fake_config.has_section.return_value = True
+    fake_config.items.return_value = [('posx', '100'), ('HistorySize', '5')]
+    fake_config.defaults.return_value = fake_config_dict['DEFAULT']
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut._config_filepath = MagicMock()
+
+    mocker.patch('configparser.ConfigParser',return_value=fake_config)
+
+    # Act
+    cut.parse_config()
+
+    # Assert
+    assert cut.spellbook_options == {'track_changes': False, 'max_workers': num_threads, 'type_drift_policy': 'strict', 'history_size': 5, 'history_sizes': {'posx': 100}, 'snapshot_depth': 3}
+    assert fake_config.items.call_args_list[0].args == ('KnowledgeHistory',)
+
+def test_runtime_core_parse_config_reads_settings_case_insensitively_and_keeps_case_of_section_names(tmp_path):
+    # Arrange
+    config_path = tmp_path / 'fake_config.ini'
+    config_path.write_text('[DEFAULT]\nkastermethodspath = kasters.py\nDATATYPE = csv\nDataFile = data.csv\nhistorysize = 2\n'
+                           '\n[KnowledgeHistory]\nPosX = 10\n\n[WindowKasters]\nPosX_Mean = mean(PosX, 3)\n')
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut._config_filepath = str(config_path)
+
+    # Act
+    cut.parse_config()
+
+    # Assert
+    assert (cut.kaster_methods_path, cut.data_type, cut.data_file_path) == ('kasters.py', 'csv', 'data.csv')
+    assert cut.spellbook_options['history_size'] == 2
+    assert cut.spellbook_options['history_sizes'] == {'PosX': 10}
+    assert cut.window_kasters == {'PosX_Mean': 'mean(PosX, 3)'}
+    assert type(next(iter(cut.window_kasters))) == str
+
 def test_runtime_core_import_kaster_methods_initializes_headers_and_kaster_definitions_as_empty_lists(mocker):
 
     # Arrange
@@ -252,17 +317,19 @@ def test_runtime_core_import_kaster_methods_creates_input_and_output_variables_w
     cut = KastRuntime.__new__(KastRuntime)
 
     fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
     fake_kaster_methods_path = MagicMock()
 
     cut.kaster_methods_path = fake_kaster_methods_path
     cut.kaster_definitions = MagicMock()
 
     for i in range(num_fake_functions):
-        fake_tuple = (MagicMock(), MagicMock()) # (function_name, function_callable)
+        fake_tuple = (MagicMock(), fake_kaster_method()) # (function_name, function_callable)
         fake_function_tuple_list.append(fake_tuple)
     
     mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
     mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={})
     mocker.patch('kast.src.kast_runtime.getfullargspec')
     mocker.patch('kast.src.kast_runtime.extract_return_names')
     
@@ -288,6 +355,7 @@ def test_runtime_core_import_kaster_methods_sets_kaster_definitions_to_returns_f
     cut = KastRuntime.__new__(KastRuntime)
 
     fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
     fake_kaster_methods_path = MagicMock()
 
     cut.kaster_methods_path = fake_kaster_methods_path
@@ -296,7 +364,7 @@ def test_runtime_core_import_kaster_methods_sets_kaster_definitions_to_returns_f
     for i in range(num_fake_functions):
         fake_input_var = MagicMock()
         fake_output_var = MagicMock()
-        fake_tuple = (MagicMock(), MagicMock()) # (function_name, function_callable)
+        fake_tuple = (MagicMock(), fake_kaster_method()) # (function_name, function_callable)
 
         fake_input_var_list.append(fake_input_var)
         fake_output_var_list.append(fake_output_var)
@@ -304,6 +372,7 @@ def test_runtime_core_import_kaster_methods_sets_kaster_definitions_to_returns_f
     
     mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
     mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={})
     mocker.patch('kast.src.kast_runtime.getfullargspec', side_effect=fake_input_var_list)
     mocker.patch('kast.src.kast_runtime.extract_return_names', side_effect=fake_output_var_list)
     
@@ -326,6 +395,7 @@ def test_runtime_core_import_kaster_methods_sets_headers_to_return_from_fullargs
     cut = KastRuntime.__new__(KastRuntime)
 
     fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
     fake_kaster_methods_path = MagicMock()
 
     cut.kaster_methods_path = fake_kaster_methods_path
@@ -335,13 +405,14 @@ def test_runtime_core_import_kaster_methods_sets_headers_to_return_from_fullargs
     for i in range(num_fake_functions):
         fake_input_vars = [MagicMock() for i in range(num_fake_input_vars)]
         fake_argspec_return = MagicMock(args=fake_input_vars)
-        fake_tuple = (fake_input_vars, MagicMock()) # (function_name, function_callable)
+        fake_tuple = (MagicMock(), fake_kaster_method()) # (function_name, function_callable)
 
         fake_argspec_returns_list.append(fake_argspec_return)
         fake_function_tuple_list.append(fake_tuple)
     
     mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
     mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={})
     mocker.patch('kast.src.kast_runtime.getfullargspec', side_effect=fake_argspec_returns_list)
     mocker.patch('kast.src.kast_runtime.extract_return_names')
     
@@ -353,6 +424,101 @@ def test_runtime_core_import_kaster_methods_sets_headers_to_return_from_fullargs
     for i in range(len(fake_argspec_returns_list)):
         assert set(fake_argspec_returns_list[i].args).issubset(set(cut.headers))
     
+def test_runtime_core_import_kaster_methods_excludes_chained_kaster_outputs_from_headers(mocker):
+    # Arrange
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.kaster_methods_path = MagicMock()
+
+    fake_function_tuple_list = [('first_stage', fake_kaster_method()), ('second_stage', fake_kaster_method())]
+    fake_argspec_returns = [MagicMock(args=['a']), MagicMock(args=['x', 'b'])]
+    fake_return_names = [['x'], ['y']]
+
+    fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
+    mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
+    mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={})
+    mocker.patch('kast.src.kast_runtime.getfullargspec', side_effect=fake_argspec_returns)
+    mocker.patch('kast.src.kast_runtime.extract_return_names', side_effect=fake_return_names)
+
+    # Act
+    cut.import_kaster_methods()
+
+    # Assert
+    assert cut.headers == ['a', 'b']
+
+def test_runtime_core_import_kaster_methods_adds_window_kasters_declared_in_config(mocker):
+    # Arrange
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.kaster_methods_path = MagicMock()
+    cut.window_kasters = {'mean_x': 'mean(x, 10)', 'voltage_rate': 'rate(voltage, 60)'}
+
+    fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
+    mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
+    mocker.patch('kast.src.kast_runtime.getmembers', return_value=[('first_stage', fake_kaster_method())])
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={'first_stage': (['a'], ['x'])})
+
+    # Act
+    cut.import_kaster_methods()
+
+    # Assert
+    assert [definition[:2] for definition in cut.kaster_definitions] == [(['a'], ['x']), (['x'], ['mean_x']), (['voltage'], ['voltage_rate'])]
+    assert cut.kaster_definitions[1][2].kast_window == ('mean', 10)
+    assert cut.headers == ['a', 'voltage']
+
+def test_runtime_core_import_kaster_methods_skips_functions_not_defined_in_kaster_methods_module(mocker):
+    # Arrange
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.kaster_methods_path = MagicMock()
+
+    fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
+    fake_imported_function = MagicMock()
+    fake_imported_function.__module__ = 'kast.utils.decorators'
+    fake_function_tuple_list = [('kaster', fake_kaster_method()), ('vectorized', fake_imported_function)]
+
+    mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
+    mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value={})
+    mocker.patch('kast.src.kast_runtime.getfullargspec', return_value=MagicMock(args=['a']))
+    mocker.patch('kast.src.kast_runtime.extract_return_names', return_value=['x'])
+
+    # Act
+    cut.import_kaster_methods()
+
+    # Assert
+    assert len(cut.kaster_definitions) == 1
+    assert cut.kaster_definitions[0][2] == fake_function_tuple_list[0][1]
+
+def test_runtime_core_import_kaster_methods_uses_signature_index_for_functions_defined_in_kaster_file(mocker):
+    # Arrange
+    fake_kaster_methods_path = MagicMock()
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.kaster_methods_path = fake_kaster_methods_path
+
+    fake_module = MagicMock()
+    fake_module.__name__ = 'kaster_methods'
+    fake_function_tuple_list = [('first_stage', fake_kaster_method()), ('second_stage', fake_kaster_method())]
+    fake_signature_index = {'first_stage': (['a'], ['x']), 'second_stage': (['x', 'b'], ['y'])}
+
+    mocker.patch('kast.src.kast_runtime.import_module', return_value=fake_module)
+    mocker.patch('kast.src.kast_runtime.getmembers', return_value=fake_function_tuple_list)
+    mocker.patch('kast.src.kast_runtime.index_kaster_signatures', return_value=fake_signature_index)
+    mocker.patch('kast.src.kast_runtime.getfullargspec')
+    mocker.patch('kast.src.kast_runtime.extract_return_names')
+
+    # Act
+    cut.import_kaster_methods()
+
+    # Assert
+    assert kast.src.kast_runtime.index_kaster_signatures.call_count == 1
+    assert kast.src.kast_runtime.index_kaster_signatures.call_args_list[0].args == (fake_kaster_methods_path, )
+    assert kast.src.kast_runtime.getfullargspec.call_count == 0
+    assert kast.src.kast_runtime.extract_return_names.call_count == 0
+    assert cut.kaster_definitions == [(['a'], ['x'], fake_function_tuple_list[0][1]), (['x', 'b'], ['y'], fake_function_tuple_list[1][1])]
+    assert cut.headers == ['a', 'b']
+
 def test_runtime_core_initialize_data_source_imports_datatype_specified_data_source_using_importmodule_then_sets_internal_data_source_to_instance_of_imported_class(mocker):
     # Arrange
     fake_data_type = MagicMock()
@@ -461,6 +627,30 @@ def test_runtime_core_runstep_prints_step_number_on_each_loop_and_calls_print_sp
     assert kast.src.kast_runtime.print_spellbook_knowledge.call_count == 1
     assert f"STEP {step_num}" in out
 
+def test_runtime_core_run_step_prints_through_buffered_printer_when_one_is_configured(mocker, capsys):
+    # Arrange
+    step_num = pytest.gen.randint(1,10)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.spellbook = MagicMock()
+    cut.data_source = MagicMock()
+    cut.data_source.index = step_num
+    cut.printer = MagicMock()
+
+    mocker.patch('kast.src.kast_runtime.print_spellbook_knowledge')
+
+    # Act
+    cut.run_step(io='both')
+    cut.print_ender()
+    out, _ = capsys.readouterr()
+
+    # Assert
+    assert kast.src.kast_runtime.print_spellbook_knowledge.call_count == 0
+    assert cut.printer.print_spellbook.call_args_list[0].args == (step_num, cut.spellbook, 'both')
+    assert cut.printer.flush.call_count == 1
+    assert f"STEP {step_num}" not in out
+    assert "COMPLETE" in out
+
 def test_runtime_core_execute_returned_generator_returns_iterable_of_expected_form(mocker):
     # Arrange
     num_steps = pytest.gen.randint(1,10)
@@ -504,6 +694,19 @@ def test_runtime_core_execute_prints_end_of_run_message_when_data_source_has_mor
     assert cut.data_source.has_more.call_count == 1
     assert 'COMPLETE' in out
 
+def test_runtime_core_execute_closes_spellbook_when_data_source_has_more_is_false(mocker):
+    # Arrange
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.has_more = MagicMock(return_value=False)
+    cut.spellbook = MagicMock()
+
+    # Act
+    list(cut.execute())
+
+    # Assert
+    assert cut.spellbook.close.call_count == 1
+
 def test_runtime_core_execute_calls_run_step_while_data_source_has_more_is_true(mocker):
     # Arrange
     num_steps = pytest.gen.randint(1,10)
@@ -532,4 +735,359 @@ def test_runtime_core_execute_calls_run_step_while_data_source_has_more_is_true(
     assert cut.data_source.has_more.call_count == num_steps
     assert cut.run_step.call_count == num_steps - 1
 
+def test_runtime_core_execute_batch_yields_kasted_blocks_while_data_source_has_more(mocker):
+    # Arrange
+    num_blocks = pytest.gen.randint(1,10)
+    arg_block_size = pytest.gen.randint(1,10)
+    fake_blocks = [MagicMock() for i in range(num_blocks)]
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.spellbook = MagicMock()
+
+    mocker.patch.object(cut.data_source, 'has_more', side_effect=[True] * num_blocks + [False])
+    mocker.patch.object(cut.spellbook, 'kast_block', side_effect=fake_blocks)
+
+    # Act
+    ret = list(cut.execute_batch(block_size=arg_block_size))
+
+    # Assert
+    assert ret == fake_blocks
+    assert cut.data_source.get_new_block.call_count == num_blocks
+    assert cut.data_source.get_new_block.call_args_list[0].args == (arg_block_size, )
+
+def test_runtime_core_execute_batch_with_per_row_yields_spellbook_set_to_each_row_of_block(mocker):
+    # Arrange
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.index = 0
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], lambda a: (a * 10,))])
+
+    def fake_get_new_block(block_size):
+        cut.data_source.index += 3
+        return {'a': np.array([1, 2, 3])}
+
+    mocker.patch.object(cut.data_source, 'has_more', side_effect=[True, False])
+    mocker.patch.object(cut.data_source, 'get_new_block', side_effect=fake_get_new_block)
+
+    # Act
+    ret = [spellbook.high_level_knowledge['x'].value for spellbook in cut.execute_batch(block_size=3, per_row=True)]
+
+    # Assert
+    assert ret == [10, 20, 30]
+
+def write_fake_replay_config(directory, num_rows, extra_options=''):
+    # Write a csv data file, a stateless kaster file and a config naming both, with any extra DEFAULT options
+    data_file_path = directory / 'fake_data.csv'
+    data_file_path.write_text('\n'.join(['a'] + [str(i) for i in range(num_rows)]) + '\n')
+    kaster_methods_path = directory / 'fake_kaster_methods.py'
+    kaster_methods_path.write_text('def double(a):\n    x = int(a) * 2\n    return (x,)\n')
+    config_path = directory / 'fake_config.ini'
+    config_path.write_text(f'[DEFAULT]\nKasterMethodsPath = {kaster_methods_path}\nDataType = csv\nDataFile = {data_file_path}\n{extra_options}')
+    return str(config_path)
+
+def test_runtime_core_replay_rows_kasts_only_the_given_row_range_in_a_new_runtime(tmp_path):
+    # Arrange
+    config_path = write_fake_replay_config(tmp_path, 10)
+
+    # Act
+    ret = replay_rows(config_path, 3, 6)
+
+    # Assert
+    assert ret == [(4, {'a': '3'}, {'x': 6}), (5, {'a': '4'}, {'x': 8}), (6, {'a': '5'}, {'x': 10})]
+
+def test_runtime_core_execute_parallel_yields_every_row_in_order_and_writes_it_to_sink(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,40)
+    config_path = write_fake_replay_config(tmp_path, num_rows)
+    fake_sink = MagicMock()
+
+    cut = KastRuntime(config_path)
+
+    # Act
+    ret = list(cut.execute_parallel(num_workers=2, shard_size=3, sink=fake_sink))
+
+    # Assert
+    assert ret == [(i + 1, {'a': str(i)}, {'x': i * 2}) for i in range(num_rows)]
+    assert [call.args for call in fake_sink.write.call_args_list] == ret
+    assert fake_sink.close.call_count == 1
+
+def test_runtime_core__init__builds_data_source_with_given_data_source_options(tmp_path):
+    # Arrange
+    config_path = write_fake_replay_config(tmp_path, 10)
+    arg_chunk_size = pytest.gen.randint(1,10)
+
+    # Act
+    cut = KastRuntime(config_path, worker=True, data_source_options={'chunk_size': arg_chunk_size})
+
+    # Assert
+    assert cut.data_source.chunk_size == arg_chunk_size
+    assert cut.data_source.reader is not None
+
+def test_runtime_core_execute_parallel_warms_up_window_kasters_to_match_serial_execution(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(10,40)
+    config_path = write_fake_replay_config(tmp_path, num_rows, '[WindowKasters]\nx_mean = mean(x, 5)\nx_mean_max = max(x_mean, 3)\n')
+
+    serial = KastRuntime(config_path)
+    parallel = KastRuntime(config_path)
+
+    # Act
+    serial_values = [(spellbook.high_level_knowledge['x_mean'].value, spellbook.high_level_knowledge['x_mean_max'].value) for spellbook in serial.execute()]
+    parallel_values = [(high_level_values['x_mean'], high_level_values['x_mean_max']) for step, low_level_values, high_level_values in parallel.execute_parallel(num_workers=2, shard_size=pytest.gen.randint(1,7))]
+
+    # Assert
+    assert parallel.spellbook.window_warmup_steps() == 6
+    assert parallel_values == serial_values
+
+@pytest.mark.parametrize('sink_type', ['jsonl', 'csv', 'npz'])
+def test_runtime_core_execute_parallel_writes_every_row_to_configured_sink_without_workers_reopening_it(tmp_path, sink_type):
+    # Arrange
+    num_rows = pytest.gen.randint(1,40)
+    sink_path = tmp_path / f'out.{sink_type}'
+    config_path = write_fake_replay_config(tmp_path, num_rows, f'SinkType = {sink_type}\nSinkFile = {sink_path}\nSinkBufferSize = 1\n')
+
+    cut = KastRuntime(config_path)
+
+    # Act
+    list(cut.execute_parallel(num_workers=2, shard_size=3))
+
+    # Assert
+    if sink_type == 'jsonl':
+        rows = [json.loads(line) for line in sink_path.read_text().splitlines()]
+        assert rows == [{'step': i + 1, 'low': {'a': str(i)}, 'high': {'x': i * 2}} for i in range(num_rows)]
+    elif sink_type == 'csv':
+        with open(sink_path, newline='') as sink_file:
+            rows = list(csv.reader(sink_file))
+        assert rows == [['step', 'a', 'x']] + [[str(i + 1), str(i), str(i * 2)] for i in range(num_rows)]
+    else:
+        columns = load_npz_sink(str(sink_path))
+        assert columns['step'].tolist() == list(range(1, num_rows + 1))
+        assert columns['low/a'].tolist() == [str(i) for i in range(num_rows)]
+        assert columns['high/x'].tolist() == [i * 2 for i in range(num_rows)]
+
+def test_runtime_core__init__with_worker_does_not_open_sink_printer_or_instrumentation(tmp_path):
+    # Arrange
+    sink_path = tmp_path / 'out.jsonl'
+    config_path = write_fake_replay_config(tmp_path, 3, f'SinkType = jsonl\nSinkFile = {sink_path}\nBufferedOutput = True\nInstrumentation = True\n')
+
+    # Act
+    cut = KastRuntime(config_path, worker=True)
+
+    # Assert
+    assert cut.sink == None
+    assert cut.printer == None
+    assert cut.stats == None
+    assert not sink_path.exists()
+
+def test_runtime_core_async_execute_awaits_data_source_and_yields_spellbook_kasted_asynchronously_each_step(mocker):
+    # Arrange
+    async def lookup(a): return (a * 10,)
+
+    fake_frames = [{'a': i} for i in range(pytest.gen.randint(1,10))]
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], lookup)])
+
+    mocker.patch.object(cut.data_source, 'async_has_more', new_callable=mock.AsyncMock, side_effect=[True] * len(fake_frames) + [False])
+    mocker.patch.object(cut.data_source, 'async_get_new_information', new_callable=mock.AsyncMock, side_effect=fake_frames)
+
+    async def collect():
+        return [spellbook.high_level_knowledge['x'].value async for spellbook in cut.async_execute()]
+
+    # Act
+    ret = asyncio.run(collect())
+
+    # Assert
+    assert ret == [frame['a'] * 10 for frame in fake_frames]
+
+def test_runtime_core_enable_instrumentation_times_every_stage_and_kaster_of_run_step(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    num_steps = pytest.gen.randint(1,10)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)])
+
+    mocker.patch.object(cut.data_source, 'get_new_information', side_effect=[{'a': i} for i in range(num_steps)])
+    fake_register = mocker.patch('atexit.register')
+
+    # Act
+    stats = cut.enable_instrumentation('stats.json')
+    for i in range(num_steps):
+        spellbook = cut.run_step()
+
+    # Assert
+    assert spellbook.high_level_knowledge['x'].value == (num_steps - 1) * 2
+    assert cut.stats is stats
+    assert fake_register.call_args_list[0].args == (stats.dump, 'stats.json')
+    assert dict((stage, histogram.count) for stage, histogram in stats.stages.items()) == {'get_new_information': num_steps, 'update_low_level_knowledge': num_steps, 'kast': num_steps, 'run_step': num_steps}
+    assert stats.kasters['double'].count == num_steps
+
+def test_runtime_core_enable_instrumentation_times_every_stage_and_kaster_of_async_run_step(mocker):
+    # Arrange
+    async def lookup(a): return (a * 10,)
+
+    num_steps = pytest.gen.randint(1,10)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], lookup)])
+
+    mocker.patch.object(cut.data_source, 'async_get_new_information', new_callable=mock.AsyncMock, side_effect=[{'a': i} for i in range(num_steps)])
+
+    async def run_steps():
+        for i in range(num_steps):
+            spellbook = await cut.async_run_step()
+        return spellbook
+
+    # Act
+    stats = cut.enable_instrumentation()
+    spellbook = asyncio.run(run_steps())
+
+    # Assert
+    assert spellbook.high_level_knowledge['x'].value == (num_steps - 1) * 10
+    assert dict((stage, histogram.count) for stage, histogram in stats.stages.items()) == {'get_new_information': num_steps, 'update_low_level_knowledge': num_steps, 'kast': num_steps, 'run_step': num_steps}
+    assert stats.kasters['lookup'].count == num_steps
+
+def test_runtime_core_enable_instrumentation_times_run_block_stages(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)], type_drift_policy='off')
+
+    mocker.patch.object(cut.data_source, 'get_new_block', return_value={'a': np.array([1, 2, 3])})
+
+    # Act
+    stats = cut.enable_instrumentation()
+    kasted_block = cut.run_block(3)
+
+    # Assert
+    assert list(kasted_block['x']) == [2, 4, 6]
+    assert sorted(stats.stages) == ['get_new_block', 'kast_block', 'run_block']
+    assert stats.kasters['double'].count == 3
+
+def test_runtime_core_enable_instrumentation_twice_records_each_stage_of_run_step_once(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.index = 0
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)])
+    cut.sink = MagicMock()
+    cut.printer = MagicMock()
+
+    # Act
+    cut.enable_instrumentation()
+    stats = cut.enable_instrumentation()
+    cut.run_step(override={'a': 1}, io=True)
+
+    # Assert
+    assert dict((stage, histogram.count) for stage, histogram in stats.stages.items()) == {'get_new_information': 1, 'update_low_level_knowledge': 1, 'kast': 1, 'write_to_sink': 1, 'print_io': 1, 'run_step': 1}
+    assert cut.printer.print_spellbook.call_args_list[0].args == (1, cut.spellbook, True)
+
+def test_runtime_core_initialize_sink_imports_sink_type_specified_sink_and_sets_internal_sink_to_instance_of_imported_class(mocker):
+    # Arrange
+    fake_module = MagicMock()
+    fake_class_reference = MagicMock()
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.sink_type = 'jsonl'
+
+    mocker.patch('kast.src.kast_runtime.import_module',return_value=fake_module)
+    mocker.patch('kast.src.kast_runtime.get_attribute_by_name',return_value=fake_class_reference)
+
+    # Act
+    cut.initialize_sink()
+
+    # Assert
+    assert kast.src.kast_runtime.import_module.call_args_list[0].kwargs == {'module_name': 'sink', 'file_to_import': 'kast/utils/sinks/jsonl_sink.py'}
+    assert kast.src.kast_runtime.get_attribute_by_name.call_args_list[0].args == (fake_module, 'JsonlSink')
+    assert fake_class_reference.call_args_list[0].args == (cut, )
+    assert cut.sink == fake_class_reference()
+
+def test_runtime_core_execute_writes_every_step_to_configured_sink_and_closes_it(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,20)
+    config_path = write_fake_replay_config(tmp_path, num_rows)
+    sink_path = tmp_path / 'out.jsonl'
+    with open(config_path, 'a') as config_file:
+        config_file.write(f'SinkType = jsonl\nSinkFile = {sink_path}\nSinkBufferSize = 4\n')
+    cut = KastRuntime(config_path)
+
+    # Act
+    for spellbook in cut.execute():
+        pass
+
+    # Assert
+    assert cut.sink.closed == True
+    assert sink_path.read_text().splitlines() == [f'{{"step": {i + 1}, "low": {{"a": "{i}"}}, "high": {{"x": {i * 2}}}}}' for i in range(num_rows)]
+
+def test_runtime_core_run_step_writes_each_step_to_configured_sink(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    num_steps = pytest.gen.randint(1,10)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.index = 0
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)])
+    cut.sink = MagicMock()
+
+    # Act
+    for i in range(num_steps):
+        cut.run_step(override={'a': i})
+
+    # Assert
+    assert [call.args for call in cut.sink.write.call_args_list] == [(i + 1, {'a': i}, {'x': i * 2}) for i in range(num_steps)]
+    assert cut.sink.close.call_count == 0
+
+def test_runtime_core_timed_run_step_writes_each_step_to_configured_sink_and_times_the_write(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.index = 0
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)])
+    cut.sink = MagicMock()
+
+    # Act
+    stats = cut.enable_instrumentation()
+    cut.run_step(override={'a': 1})
+
+    # Assert
+    assert [call.args for call in cut.sink.write.call_args_list] == [(1, {'a': 1}, {'x': 2})]
+    assert stats.stages['write_to_sink'].count == 1
+
+def test_runtime_core_execute_batch_writes_every_row_of_each_block_to_sink(mocker):
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = KastRuntime.__new__(KastRuntime)
+    cut.data_source = MagicMock()
+    cut.data_source.index = 0
+    cut.spellbook = Spellbook(['a'], [(['a'], ['x'], double)], type_drift_policy='off')
+    cut.sink = MagicMock()
+
+    def get_new_block(block_size):
+        cut.data_source.index += 3
+        return {'a': np.array([1, 2, 3])}
+
+    mocker.patch.object(cut.data_source, 'has_more', side_effect=[True, False])
+    mocker.patch.object(cut.data_source, 'get_new_block', side_effect=get_new_block)
+
+    # Act
+    list(cut.execute_batch(block_size=3))
+
+    # Assert
+    assert [call.args for call in cut.sink.write.call_args_list] == [(1, {'a': 1}, {'x': 2}), (2, {'a': 2}, {'x': 4}), (3, {'a': 3}, {'x': 6})]
+    assert cut.sink.close.call_count == 1
 
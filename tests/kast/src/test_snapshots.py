@@ -0,0 +1,89 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import threading
+
+from kast.src.knowledge import Knowledge
+from kast.src.snapshots import KnowledgeSnapshot, SnapshotBuffer
+
+def make_snapshot_buffer(depth=2):
+    return SnapshotBuffer([Knowledge('low', 'a'), Knowledge('low', 'b'), Knowledge('high', 'x')], 2, depth)
+
+def test_snapshot_buffer__init__raises_value_error_for_depth_below_one():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        make_snapshot_buffer(0)
+
+    # Assert
+    assert 'SnapshotBuffer depth must be at least 1, not 0.' in e_info.exconly()
+
+def test_snapshot_buffer_publish_makes_immutable_snapshot_the_latest():
+    # Arrange
+    cut = make_snapshot_buffer()
+    knowledge_values = [pytest.gen.randint(0,9), pytest.gen.randint(0,9), pytest.gen.randint(0,9)]
+    arg_step = pytest.gen.randint(1,100)
+
+    # Act
+    snapshot = cut.publish(arg_step, knowledge_values)
+    knowledge_values[0] = 'changed after publishing'
+
+    # Assert
+    assert cut.latest() is snapshot
+    assert (snapshot.version, snapshot.step) == (1, arg_step)
+    assert snapshot['a'] != 'changed after publishing'
+    assert snapshot.low_level_knowledge() == {'a': snapshot['a'], 'b': snapshot['b']}
+    assert snapshot.high_level_knowledge() == {'x': snapshot['x']}
+    assert 'x' in snapshot and snapshot.get('missing', 'default') == 'default'
+
+def test_snapshot_buffer_latest_returns_none_before_first_publish():
+    # Act / Assert
+    assert make_snapshot_buffer().latest() == None
+
+def test_snapshot_buffer_at_version_returns_only_the_last_depth_snapshots():
+    # Arrange
+    arg_depth = pytest.gen.randint(1,5)
+    num_publishes = arg_depth + pytest.gen.randint(1,5)
+    cut = make_snapshot_buffer(arg_depth)
+
+    # Act
+    for step in range(num_publishes):
+        cut.publish(step, [step, step, step])
+
+    # Assert
+    for version in range(num_publishes - arg_depth + 1, num_publishes + 1):
+        assert cut.at_version(version)['a'] == version - 1
+    with pytest.raises(KeyError) as e_info:
+        cut.at_version(num_publishes - arg_depth)
+    assert f'the latest version is {num_publishes}' in e_info.exconly()
+
+def test_snapshot_buffer_readers_on_other_threads_always_see_complete_steps():
+    # Arrange
+    cut = make_snapshot_buffer()
+    torn_reads = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            snapshot = cut.latest()
+            if snapshot is not None and not (snapshot['a'] == snapshot['b'] == snapshot['x'] == snapshot.step):
+                torn_reads.append(snapshot.version)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+
+    # Act
+    for step in range(10000):
+        cut.publish(step, [step, step, step])
+    done.set()
+    reader_thread.join()
+
+    # Assert
+    assert torn_reads == []
@@ -10,9 +10,12 @@
 import pytest
 from mock import MagicMock
 import numpy as np
+import asyncio
 
-from kast.src.spellbook import Spellbook, Kaster
+import kast.src.spellbook
+from kast.src.spellbook import Spellbook, Kaster, make_slot_getter
 from kast.src.knowledge import *
+from kast.utils.decorators import vectorized, memoize, window
 
 
 def test_kaster__init__sets_self_input_vars_to_given_input_vars():
@@ -241,6 +244,8 @@ def test_spellbook_update_low_level_knowledge_updates_low_level_knowledge_dictio
 
     cut = Spellbook.__new__(Spellbook)
     cut.low_level_knowledge = {}
+    cut.track_changes = True
+    cut.changed_knowledge = set()
     
     for i in range(num_entries):
         fake_key = MagicMock()
@@ -271,6 +276,8 @@ def test_spellbook_update_low_level_knowledge_creates_new_knowledge_object_if_un
 
     cut = Spellbook.__new__(Spellbook)
     cut.low_level_knowledge = {}
+    cut.track_changes = True
+    cut.changed_knowledge = set()
     
     for i in range(num_entries):
         fake_key = MagicMock()
@@ -310,10 +317,13 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
 
     fake_low_level_knowledge = {}
     fake_high_level_knowledge = {}
+    fake_knowledge_values = [] # Fake Spellbook value list, indexed by knowledge slot
+    fake_knowledge_by_slot = []
 
     for i in range(num_kasters):
 
         fake_kaster_inputs = [] # Fake kaster input variable NAMES
+        fake_kaster_input_slots = []
         fake_input_dict = {} # Fake labeled input dicts - kast() should create this so we need to store it to compare to.
 
         for i in range(num_input):
@@ -324,11 +334,15 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
             fake_input_knowledge = MagicMock()
             fake_input_knowledge.value = MagicMock()
             fake_low_level_knowledge.update({str(fake_input_name): fake_input_knowledge})
+            fake_kaster_input_slots.append(len(fake_knowledge_values))
+            fake_knowledge_values.append(fake_input_knowledge.value)
+            fake_knowledge_by_slot.append(fake_input_knowledge)
             fake_input_dict.update({str(fake_input_name): fake_input_knowledge.value})
         
         fake_input_dict_list.append(fake_input_dict)
         
         fake_kaster_outputs = [] # Fake Kaster output NAMES
+        fake_kaster_output_slots = []
         temp_forced_return_list = []
 
         for i in range(num_output):
@@ -341,6 +355,9 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
             mocker.patch.object(fake_high_level_knowledge_object,'update')
 
             fake_high_level_knowledge.update({fake_output_name: fake_high_level_knowledge_object})
+            fake_kaster_output_slots.append(len(fake_knowledge_values))
+            fake_knowledge_values.append(fake_high_level_knowledge_object.value)
+            fake_knowledge_by_slot.append(fake_high_level_knowledge_object)
         
         forced_return_tuple = tuple(temp_forced_return_list)
         forced_return_tuple_list.append(forced_return_tuple)
@@ -348,6 +365,12 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
         fake_kaster = MagicMock()
         fake_kaster.input_vars = fake_kaster_inputs
         fake_kaster.output_vars = fake_kaster_outputs
+        fake_kaster.input_slots = fake_kaster_input_slots
+        fake_kaster.output_slots = fake_kaster_output_slots
+        fake_kaster.output_consumers = [[] for output_slot in fake_kaster_output_slots]
+        fake_kaster.get_inputs = make_slot_getter(fake_kaster_input_slots)
+        fake_kaster.memo = None
+        fake_kaster.window = None
 
         mocker.patch.object(fake_kaster,'method',return_value=forced_return_tuple)
 
@@ -358,6 +381,14 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
     cut.low_level_knowledge = fake_low_level_knowledge
     cut.high_level_knowledge = fake_high_level_knowledge
     cut.kasters = fake_kasters
+    cut.knowledge_values = fake_knowledge_values
+    cut.knowledge_by_slot = fake_knowledge_by_slot
+    cut.track_changes = True
+    cut.changed_knowledge = set()
+    cut.pending_full_kast = True
+    cut.knowledge_producers = {}
+    cut.knowledge_consumers = {}
+    cut.executor = None
 
     # Act
 
@@ -371,7 +402,7 @@ def test_kast_kaster_specified_high_level_knowledge_is_updated_with_output_of_ka
     
     for i, kaster in enumerate(fake_kasters):
         assert kaster.method.call_count == 1 # Each kaster method should be called once
-        assert kaster.method.call_args_list[0].kwargs == fake_input_dict_list[i] # With an unpacked dict of the input variable values
+        assert kaster.method.call_args_list[0].args == tuple(fake_input_dict_list[i].values()) # With the input variable values as positional arguments, in input variable order
         for output_variable_index, output_variable_name in enumerate(kaster.output_vars):
             assert cut.high_level_knowledge[output_variable_name].update.call_count == 1 # Every kaster-output-variable-identified high level knowledge entry update() should be called once 
             assert cut.high_level_knowledge[output_variable_name].update.call_args_list[0].args == (forced_return_tuple_list[i][output_variable_index],) # With the value in the same position in the returned knowledge 
@@ -388,6 +419,10 @@ def test_kast_does_nothing_if_no_kasters_are_present(mocker):
     
     cut.low_level_knowledge = fake_low_level_knowledge
     cut.kasters = kasters_list
+    cut.track_changes = True
+    cut.changed_knowledge = set()
+    cut.pending_full_kast = True
+    cut.executor = None
 
     # Act
 
@@ -397,5 +432,624 @@ def test_kast_does_nothing_if_no_kasters_are_present(mocker):
 
     assert fake_low_level_knowledge.keys.call_count == 0
 
+def test_spellbook__init__sets_track_changes_and_builds_dependency_graph():
+    # Arrange
+    cut = Spellbook.__new__(Spellbook)
+    arg_track_changes = MagicMock()
+    fake_kaster_definitions = [(['a', 'b'], ['x'], MagicMock()),
+                               (['b'], ['y'], MagicMock())]
+
+    # Act
+    cut.__init__(['a', 'b'], fake_kaster_definitions, track_changes=arg_track_changes)
+
+    # Assert
+    assert cut.track_changes == arg_track_changes
+    assert cut.pending_full_kast == True
+    assert cut.changed_knowledge == set()
+    assert cut.knowledge_consumers == {'a': [0], 'b': [0, 1]}
+
+def test_spellbook_update_low_level_knowledge_only_marks_knowledge_with_new_values_as_changed():
+    # Arrange
+    cut = Spellbook.__new__(Spellbook)
+    cut.track_changes = True
+    cut.changed_knowledge = set()
+    cut.low_level_knowledge = {'same': Knowledge('low', 'same', 1.0),
+                               'different': Knowledge('low', 'different', 1.0),
+                               'array': Knowledge('low', 'array', np.array([1.0, 2.0]))}
+
+    # Act
+    cut.update_low_level_knowledge({'same': 1.0, 'different': 2.0, 'array': np.array([1.0, 2.0]), 'unseen': 3.0})
+
+    # Assert
+    assert cut.changed_knowledge == {'different', 'unseen'}
+    assert cut.low_level_knowledge['different'].value == 2.0
+
+def test_spellbook_update_low_level_knowledge_does_not_compare_values_when_not_tracking_changes(mocker):
+    # Arrange
+    cut = Spellbook.__new__(Spellbook)
+    cut.track_changes = False
+    cut.changed_knowledge = set()
+    cut.low_level_knowledge = {'a': Knowledge('low', 'a', 1.0)}
+
+    mocker.patch('kast.src.spellbook.value_has_changed')
+
+    # Act
+    cut.update_low_level_knowledge({'a': 2.0})
+
+    # Assert
+    assert kast.src.spellbook.value_has_changed.call_count == 0
+    assert cut.changed_knowledge == set()
+
+def test_kast_runs_every_kaster_on_first_step_then_only_kasters_consuming_changed_knowledge():
+    # Arrange
+    x_method = MagicMock(side_effect=lambda a: (a * 2,))
+    y_method = MagicMock(side_effect=lambda b: (b + 1,))
+
+    cut = Spellbook(['a', 'b'], [(['a'], ['x'], x_method), (['b'], ['y'], y_method)])
+
+    # Act
+    cut.update_low_level_knowledge({'a': 1, 'b': 1})
+    cut.kast()
+    cut.update_low_level_knowledge({'a': 5, 'b': 1})
+    cut.kast()
+    cut.update_low_level_knowledge({'a': 5, 'b': 1})
+    cut.kast()
+
+    # Assert
+    assert x_method.call_count == 2
+    assert y_method.call_count == 1
+    assert cut.high_level_knowledge['x'].value == 10
+    assert cut.high_level_knowledge['y'].value == 2
+
+def test_kast_runs_every_kaster_on_every_step_when_not_tracking_changes():
+    # Arrange
+    x_method = MagicMock(return_value=(1,))
+
+    cut = Spellbook(['a'], [(['a'], ['x'], x_method)], track_changes=False)
+    num_steps = pytest.gen.randint(1,10)
+
+    # Act
+    for i in range(num_steps):
+        cut.update_low_level_knowledge({'a': 1})
+        cut.kast()
+
+    # Assert
+    assert x_method.call_count == num_steps
+
+def test_spellbook_init_kasters_accepts_kaster_input_variables_produced_by_other_kasters():
+    # Arrange
+    cut = Spellbook.__new__(Spellbook)
+    cut.kasters = []
+    cut.low_level_knowledge = {'a': MagicMock()}
+    arg_tuple_list = [(['x'], ['y'], MagicMock()),
+                      (['a'], ['x'], MagicMock())]
+
+    # Act
+    cut.init_kasters(arg_tuple_list)
+
+    # Assert
+    assert len(cut.kasters) == 2
+
+def test_spellbook_init_dependency_graph_orders_kasters_after_the_kasters_producing_their_inputs():
+    # Arrange
+    fake_independent_method = MagicMock()
+    fake_second_stage_method = MagicMock()
+    fake_first_stage_method = MagicMock()
+
+    # Act
+    cut = Spellbook(['a'], [(['x'], ['y'], fake_second_stage_method),
+                            (['a'], ['z'], fake_independent_method),
+                            (['a'], ['x'], fake_first_stage_method)])
+
+    # Assert
+    assert [kaster.method for kaster in cut.kasters] == [fake_independent_method, fake_first_stage_method, fake_second_stage_method]
+    assert cut.knowledge_producers == {'z': [0], 'x': [1], 'y': [2]}
+    assert cut.knowledge_consumers == {'a': [0, 1], 'x': [2]}
+
+def test_spellbook_init_dependency_graph_raises_value_error_when_kasters_form_a_cycle():
+    # Arrange
+    def first_stage(a, y): return (a,)
+    def second_stage(x): return (x,)
+
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        Spellbook(['a'], [(['a', 'y'], ['x'], first_stage),
+                          (['x'], ['y'], second_stage)])
+
+    # Assert
+    assert "Kaster dependency cycle detected between kasters ['first_stage', 'second_stage']." in e_info.exconly()
+
+def test_kast_passes_chained_high_level_knowledge_to_downstream_kasters_and_reruns_them_only_when_it_changes():
+    # Arrange
+    first_stage_method = MagicMock(side_effect=lambda a: (a // 10,))
+    second_stage_method = MagicMock(side_effect=lambda x: (x + 1,))
+
+    cut = Spellbook(['a'], [(['x'], ['y'], second_stage_method), (['a'], ['x'], first_stage_method)])
+
+    # Act
+    cut.update_low_level_knowledge({'a': 10})
+    cut.kast()
+    cut.update_low_level_knowledge({'a': 11}) # Changes a, but not x
+    cut.kast()
+    cut.update_low_level_knowledge({'a': 20}) # Changes both a and x
+    cut.kast()
+
+    # Assert
+    assert first_stage_method.call_count == 3
+    assert second_stage_method.call_count == 2
+    assert second_stage_method.call_args_list[-1].args == (2,)
+    assert cut.high_level_knowledge['y'].value == 3
+
+def test_kaster__init__sets_vectorized_from_method_marker():
+    # Arrange
+    def arg_method(a): return (a,)
+    def arg_vectorized_method(a): return (a,)
+    vectorized(arg_vectorized_method)
+
+    # Act
+    cut = Kaster(['a'], ['x'], arg_method)
+    cut_vectorized = Kaster(['a'], ['x'], arg_vectorized_method)
+
+    # Assert
+    assert cut.vectorized == False
+    assert cut_vectorized.vectorized == True
+
+def test_kast_block_calls_vectorized_kasters_once_per_block_and_other_kasters_once_per_row():
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    vectorized_method = MagicMock(side_effect=lambda a: (a * 2, a + 1))
+    vectorized(vectorized_method)
+    row_method_calls = []
+    def row_method(x):
+        row_method_calls.append(x)
+        return (x > 4,)
+
+    cut = Spellbook(['a'], [(['x'], ['big'], row_method), (['a'], ['x', 'y'], vectorized_method)])
+    arg_block = {'a': np.arange(num_rows)}
+
+    # Act
+    ret = cut.kast_block(arg_block)
+
+    # Assert
+    assert vectorized_method.call_count == 1
+    assert len(row_method_calls) == num_rows
+    assert list(ret['a']) == list(range(num_rows))
+    assert list(ret['x']) == [2 * i for i in range(num_rows)]
+    assert list(ret['y']) == [i + 1 for i in range(num_rows)]
+    assert list(ret['big']) == [2 * i > 4 for i in range(num_rows)]
+
+def test_kast_block_leaves_knowledge_set_to_last_row_of_block():
+    # Arrange
+    cut = Spellbook(['a'], [(['a'], ['x'], lambda a: (a + 1,))])
+
+    # Act
+    cut.kast_block({'a': np.array([1, 2, 3])})
+
+    # Assert
+    assert cut.low_level_knowledge['a'].value == 3
+    assert cut.high_level_knowledge['x'].value == 4
+    assert cut.pending_full_kast == False
+    assert cut.changed_knowledge == set()
+
+def test_kast_block_raises_key_error_when_kaster_input_is_missing_from_block():
+    # Arrange
+    cut = Spellbook(['a', 'b'], [(['a', 'b'], ['x'], MagicMock())])
+
+    # Act
+    with pytest.raises(KeyError) as e_info:
+        cut.kast_block({'a': np.array([1, 2, 3])})
+
+    # Assert
+    assert 'Kaster input variable b was not found in the kasted block.' in e_info.exconly()
+
+def test_spellbook_set_knowledge_from_block_sets_low_and_high_level_knowledge_to_given_row():
+    # Arrange
+    cut = Spellbook(['a'], [(['a'], ['x'], MagicMock())])
+    arg_columns = {'a': np.array([1, 2]), 'x': np.array([10, 20]), 'extra': np.array(['p', 'q'])}
+
+    # Act
+    cut.set_knowledge_from_block(arg_columns, 1)
+
+    # Assert
+    assert cut.low_level_knowledge['a'].value == 2
+    assert cut.high_level_knowledge['x'].value == 20
+    assert cut.low_level_knowledge['extra'].value == 'q'
+
+def test_kaster__init__creates_memo_only_for_memoized_methods():
+    # Arrange
+    arg_maxsize = pytest.gen.randint(1,10)
+    def arg_method(a): return (a,)
+    def arg_memoized_method(a): return (a,)
+    memoize(arg_maxsize)(arg_memoized_method)
+
+    # Act
+    cut = Kaster(['a'], ['x'], arg_method)
+    cut_memoized = Kaster(['a'], ['x'], arg_memoized_method)
+
+    # Assert
+    assert cut.memo == None
+    assert cut_memoized.memo.maxsize == arg_maxsize
+
+def test_kast_reuses_memoized_kaster_outputs_for_repeated_inputs_and_reports_memo_stats():
+    # Arrange
+    calls = []
+    @memoize(4)
+    def memoized_kaster(a):
+        calls.append(a)
+        return (a * 2,)
 
+    cut = Spellbook(['a'], [(['a'], ['x'], memoized_kaster)])
+
+    # Act
+    for value in [1, 2, 1, 2, 3, 1]:
+        cut.update_low_level_knowledge({'a': value})
+        cut.kast()
+
+    # Assert
+    assert calls == [1, 2, 3]
+    assert cut.high_level_knowledge['x'].value == 2
+    assert cut.memo_stats() == {'memoized_kaster': {'hits': 3, 'misses': 3, 'size': 3, 'maxsize': 4}}
+
+def test_spellbook__init__creates_thread_pool_only_when_more_than_one_worker_is_requested():
+    # Arrange
+    fake_kaster_definitions = [(['a'], ['x'], MagicMock())]
+    num_workers = pytest.gen.randint(2,32)
+
+    # Act
+    sequential_cut = Spellbook(['a'], fake_kaster_definitions, max_workers=1)
+    parallel_cut = Spellbook(['a'], fake_kaster_definitions, max_workers=num_workers)
 
+    # Assert
+    assert sequential_cut.executor == None
+    assert parallel_cut.executor._max_workers == num_workers
+
+def test_spellbook_init_dependency_graph_assigns_each_kaster_one_level_past_its_deepest_producer():
+    # Arrange
+    def first_stage(a): return (a,)
+    def independent(b): return (b,)
+    def second_stage(x, b): return (x,)
+    def third_stage(y, z): return (y,)
+
+    # Act
+    cut = Spellbook(['a', 'b'], [(['a'], ['x'], first_stage),
+                                 (['b'], ['z'], independent),
+                                 (['x', 'b'], ['y'], second_stage),
+                                 (['y', 'z'], ['w'], third_stage)])
+
+    # Assert
+    assert cut.kaster_levels == [0, 0, 1, 2]
+
+def test_kast_with_thread_pool_matches_sequential_kast_and_commits_shared_outputs_in_kaster_order():
+    # Arrange
+    def double(a): return (a * 2, 'double')
+    def increment(b): return (b + 1, 'increment')
+    def total(x, y): return (x + y,)
+
+    kaster_definitions = [(['a'], ['x', 'source'], double),
+                          (['b'], ['y', 'source'], increment),
+                          (['x', 'y'], ['z'], total)]
+    sequential_cut = Spellbook(['a', 'b'], kaster_definitions)
+    parallel_cut = Spellbook(['a', 'b'], kaster_definitions, max_workers=4)
+
+    # Act
+    for frame in [{'a': 1, 'b': 1}, {'a': 3, 'b': 1}, {'a': 3, 'b': 2}]:
+        for cut in [sequential_cut, parallel_cut]:
+            cut.update_low_level_knowledge(frame)
+            cut.kast()
+
+    # Assert
+    for name in ['x', 'y', 'z', 'source']:
+        assert parallel_cut.high_level_knowledge[name].value == sequential_cut.high_level_knowledge[name].value
+    assert parallel_cut.high_level_knowledge['z'].value == 9
+    assert parallel_cut.high_level_knowledge['source'].value == 'increment'
+
+def test_kast_with_thread_pool_runs_kasters_of_one_level_concurrently():
+    # Arrange
+    import threading
+    barrier = threading.Barrier(2, timeout=5)
+    def first(a): return (barrier.wait(),)
+    def second(a): return (barrier.wait(),)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], first), (['a'], ['y'], second)], max_workers=2)
+    cut.update_low_level_knowledge({'a': 1})
+
+    # Act
+    cut.kast() # Would time out on the barrier if the kasters ran one after the other
+
+    # Assert
+    assert sorted([cut.high_level_knowledge['x'].value, cut.high_level_knowledge['y'].value]) == [0, 1]
+
+def test_spellbook__init__stores_knowledge_values_in_one_list_indexed_by_kaster_slots():
+    # Arrange
+    def first_stage(a): return (a * 2,)
+    def second_stage(x, b): return (x + b,)
+
+    # Act
+    cut = Spellbook(['a', 'b'], [(['a'], ['x'], first_stage), (['x', 'b'], ['y'], second_stage)])
+    cut.update_low_level_knowledge({'a': 1, 'b': 5})
+    cut.kast()
+
+    # Assert
+    assert cut.knowledge_values == [1, 5, 2, 7]
+    assert [knowledge.slot for knowledge in cut.knowledge_by_slot] == [0, 1, 2, 3]
+    assert cut.kasters[1].input_slots == [2, 1]
+    assert cut.kasters[1].output_slots == [3]
+    assert cut.high_level_knowledge['y'].value == 7
+    assert not hasattr(cut.kasters[0], '__dict__')
+
+def test_make_slot_getter_returns_values_at_slots_as_a_tuple_for_any_number_of_slots():
+    # Arrange
+    arg_values = [10, 11, 12, 13]
+
+    # Act / Assert
+    assert make_slot_getter([])(arg_values) == ()
+    assert make_slot_getter([2])(arg_values) == (12,)
+    assert make_slot_getter([3, 0, 2])(arg_values) == (13, 10, 12)
+
+def test_kaster_bind_precompiles_input_getter_and_output_consumers():
+    # Arrange
+    cut = Kaster(['a', 'b'], ['x'], MagicMock())
+    arg_output_consumers = [[pytest.gen.randint(0,10)]]
+
+    # Act
+    cut.bind([1, 0], [2], arg_output_consumers)
+
+    # Assert
+    assert cut.get_inputs(['b_value', 'a_value', None]) == ('a_value', 'b_value')
+    assert cut.output_slots == [2]
+    assert cut.output_consumers == arg_output_consumers
+
+def test_spellbook__init__raises_value_error_for_unrecognized_type_drift_policy():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        Spellbook(['a'], [], type_drift_policy='sometimes')
+
+    # Assert
+    assert "Unrecognized type drift policy sometimes" in e_info.exconly()
+
+def test_kast_with_off_type_drift_policy_writes_outputs_without_updating_knowledge_objects(mocker):
+    # Arrange
+    def alternate(a): return (a,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], alternate)], type_drift_policy='off')
+    mocker.patch.object(Knowledge, 'update', autospec=True, side_effect=lambda knowledge, value: setattr(knowledge, 'value', value))
+
+    # Act
+    cut.update_low_level_knowledge({'a': 1})
+    cut.kast()
+    cut.update_low_level_knowledge({'a': 1.5})
+    cut.kast()
+
+    # Assert
+    assert cut.high_level_knowledge['x'].value == 1.5
+    assert [call.args[0].label for call in Knowledge.update.call_args_list] == ['low', 'low']
+    assert cut.high_level_knowledge['x']._policy == 'off'
+
+def test_spellbook_records_history_of_configured_knowledge_after_every_step():
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a', 'b'], [(['a'], ['x'], double)], history_size=2, history_sizes={'b': 0, 'x': 3})
+
+    # Act
+    for i in range(4):
+        cut.update_low_level_knowledge({'a': i, 'b': i})
+        cut.kast()
+
+    # Assert
+    assert cut.step == 4
+    assert cut.low_level_knowledge['b'].history == None
+    assert list(cut.low_level_knowledge['a'].history.last()) == [2, 3]
+    assert list(cut.high_level_knowledge['x'].history.last()) == [2, 4, 6]
+    assert list(cut.high_level_knowledge['x'].history.last_steps()) == [2, 3, 4]
+
+def test_spellbook_kast_block_records_every_row_of_the_block_in_history():
+    # Arrange
+    @vectorized
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double)], history_size=10)
+
+    # Act
+    cut.kast_block({'a': np.array([1, 2, 3])})
+
+    # Assert
+    assert cut.step == 3
+    assert list(cut.high_level_knowledge['x'].history.last()) == [2, 4, 6]
+    assert list(cut.high_level_knowledge['x'].history.last_steps()) == [1, 2, 3]
+
+def test_spellbook_publishes_a_snapshot_after_every_kasted_step_and_block():
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double)], type_drift_policy='off', snapshot_depth=2)
+
+    # Act
+    cut.update_low_level_knowledge({'a': 1})
+    cut.kast()
+    first_snapshot = cut.snapshots.latest()
+    cut.update_low_level_knowledge({'a': 2})
+    cut.kast()
+    cut.kast_block({'a': np.array([3, 4])})
+
+    # Assert
+    assert (first_snapshot.step, first_snapshot['a'], first_snapshot['x']) == (1, 1, 2)
+    assert cut.snapshots.at_version(2)['x'] == 4
+    assert (cut.snapshots.latest().version, cut.snapshots.latest().step, cut.snapshots.latest()['x']) == (3, 4, 8)
+
+def test_spellbook_publishes_no_snapshots_by_default():
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double)])
+
+    # Act
+    cut.update_low_level_knowledge({'a': 1})
+    cut.kast()
+
+    # Assert
+    assert cut.snapshots == None
+
+@pytest.mark.parametrize('returned_knowledge', [(1,), (1, 2, 3)])
+def test_kast_raises_value_error_naming_kaster_that_returns_the_wrong_number_of_values(returned_knowledge):
+    # Arrange
+    def split(a): return returned_knowledge
+
+    cut = Spellbook(['a'], [(['a'], ['x', 'y'], split)])
+    cut.update_low_level_knowledge({'a': 1})
+
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        cut.kast()
+
+    # Assert
+    assert f"Kaster split returned {len(returned_knowledge)} values, but declares 2 output variables ['x', 'y']." in e_info.exconly()
+
+def test_kast_block_raises_value_error_when_a_kaster_returns_the_wrong_number_of_values():
+    # Arrange
+    def split(a): return (a,)
+    @vectorized
+    def vector_split(a): return (a, a, a)
+
+    cut = Spellbook(['a'], [(['a'], ['x', 'y'], split)], type_drift_policy='off')
+    cut_vectorized = Spellbook(['a'], [(['a'], ['x', 'y'], vector_split)], type_drift_policy='off')
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        cut.kast_block({'a': np.array([1, 2])})
+    with pytest.raises(ValueError):
+        cut_vectorized.kast_block({'a': np.array([1, 2])})
+
+def test_spellbook_close_shuts_down_kaster_thread_pool_and_kasts_serially_afterwards():
+    # Arrange
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double), (['a'], ['y'], double)], max_workers=2)
+    executor = cut.executor
+
+    # Act
+    cut.close()
+    cut.update_low_level_knowledge({'a': 1})
+    cut.kast()
+
+    # Assert
+    assert executor._shutdown == True
+    assert cut.executor == None
+    assert cut.high_level_knowledge['y'].value == 2
+
+def test_spellbook_enable_stats_records_latency_of_every_kaster_call():
+    # Arrange
+    def double(a): return (a * 2,)
+    def triple(x): return (x * 3,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double), (['x'], ['y'], triple)])
+    fake_stats = MagicMock()
+
+    # Act
+    cut.enable_stats(fake_stats)
+    cut.update_low_level_knowledge({'a': 1})
+    cut.kast()
+
+    # Assert
+    assert cut.high_level_knowledge['y'].value == 6
+    assert [call.args[0] for call in fake_stats.record_kaster.call_args_list] == ['double', 'triple']
+    assert all(call.args[1] >= 0 for call in fake_stats.record_kaster.call_args_list)
+
+def test_spellbook_enable_stats_records_latency_of_vectorized_kaster_calls_in_kast_block():
+    # Arrange
+    @vectorized
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double)], type_drift_policy='off')
+    fake_stats = MagicMock()
+
+    # Act
+    cut.enable_stats(fake_stats)
+    kasted_block = cut.kast_block({'a': np.array([1, 2, 3])})
+
+    # Assert
+    assert list(kasted_block['x']) == [2, 4, 6]
+    assert [call.args[0] for call in fake_stats.record_kaster.call_args_list] == ['double']
+
+def test_kast_runs_windowed_kasters_on_every_step_even_when_inputs_are_unchanged():
+    # Arrange
+    @window('mean', 3)
+    def voltage_mean(voltage): return (voltage,)
+    def is_draining(mean_voltage): return (mean_voltage < 9,)
+
+    cut = Spellbook(['voltage'], [(['voltage'], ['mean_voltage'], voltage_mean), (['mean_voltage'], ['draining'], is_draining)])
+
+    # Act
+    means = []
+    for voltage in [12, 6, 6, 6]:
+        cut.update_low_level_knowledge({'voltage': voltage})
+        cut.kast()
+        means.append(cut.high_level_knowledge['mean_voltage'].value)
+
+    # Assert
+    assert cut.windowed_kasters == [0]
+    assert means == [12, 9, 8, 6]
+    assert cut.high_level_knowledge['draining'].value == True
+
+def test_spellbook_kast_block_slides_windows_of_vectorized_kasters_row_by_row():
+    # Arrange
+    @window('max', 2)
+    @vectorized
+    def double(a): return (a * 2,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], double)])
+
+    # Act
+    ret = cut.kast_block({'a': np.array([3, 1, 2, 0])})
+
+    # Assert
+    assert list(ret['x']) == [6, 6, 4, 4]
+
+def test_async_kast_awaits_async_kasters_of_one_level_concurrently_and_chains_their_outputs():
+    # Arrange
+    first_started = asyncio.Event()
+    second_started = asyncio.Event()
+    async def first_lookup(a):
+        first_started.set()
+        await asyncio.wait_for(second_started.wait(), 5) # Would time out if the lookups were awaited one after the other
+        return (a + 1,)
+    async def second_lookup(a):
+        second_started.set()
+        await asyncio.wait_for(first_started.wait(), 5)
+        return (a + 2,)
+    def total(x, y): return (x + y,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], first_lookup), (['a'], ['y'], second_lookup), (['x', 'y'], ['z'], total)])
+    cut.update_low_level_knowledge({'a': 1})
+
+    # Act
+    asyncio.run(cut.async_kast())
+
+    # Assert
+    assert cut.high_level_knowledge['z'].value == 5
+    assert cut.step == 1
+
+def test_kast_raises_type_error_when_spellbook_has_async_kasters():
+    # Arrange
+    async def lookup(a): return (a,)
+
+    cut = Spellbook(['a'], [(['a'], ['x'], lookup)])
+
+    # Act
+    with pytest.raises(TypeError) as e_info:
+        cut.kast()
+
+    # Assert
+    assert 'Spellbook has async kasters, which must be kasted with async_kast.' in e_info.exconly()
+
+def test_kaster__init__raises_value_error_for_memoized_async_method():
+    # Arrange
+    @memoize
+    async def lookup(a): return (a,)
+
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        Kaster(['a'], ['x'], lookup)
+
+    # Assert
+    assert 'Kaster lookup is an async method, which cannot be memoized.' in e_info.exconly()
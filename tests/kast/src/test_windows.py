@@ -0,0 +1,131 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+import statistics
+import numpy as np
+
+from kast.src.windows import *
+
+@pytest.mark.parametrize('statistic, reference', [('mean', statistics.mean),
+                                                  ('var', lambda values: statistics.variance(values) if len(values) > 1 else 0.0),
+                                                  ('std', lambda values: statistics.stdev(values) if len(values) > 1 else 0.0),
+                                                  ('min', min),
+                                                  ('max', max),
+                                                  ('rate', lambda values: (values[-1] - values[0]) / (len(values) - 1) if len(values) > 1 else 0.0)])
+def test_window_statistics_match_recomputing_over_the_whole_window_on_every_step(statistic, reference):
+    # Arrange
+    arg_size = pytest.gen.randint(1,10)
+    arg_values = [float(pytest.gen.randint(-100,100)) for i in range(pytest.gen.randint(1,50))]
+    cut = WINDOW_STATISTICS[statistic](arg_size)
+
+    # Act
+    ret = [cut.push(value) for value in arg_values]
+
+    # Assert
+    for step in range(len(arg_values)):
+        window = arg_values[max(0, step - arg_size + 1):step + 1]
+        assert ret[step] == pytest.approx(reference(window), abs=1e-6)
+
+@pytest.mark.parametrize('statistic, reference', [('mean', lambda window: np.mean(window, axis=0)),
+                                                  ('var', lambda window: np.var(window, axis=0, ddof=1) if len(window) > 1 else np.zeros(window.shape[1])),
+                                                  ('std', lambda window: np.std(window, axis=0, ddof=1) if len(window) > 1 else np.zeros(window.shape[1])),
+                                                  ('min', lambda window: np.min(window, axis=0)),
+                                                  ('max', lambda window: np.max(window, axis=0)),
+                                                  ('rate', lambda window: (window[-1] - window[0]) / (len(window) - 1) if len(window) > 1 else np.zeros(window.shape[1]))])
+def test_window_statistics_apply_elementwise_to_vector_values(statistic, reference):
+    # Arrange
+    arg_size = pytest.gen.randint(1,10)
+    arg_values = [np.array([float(pytest.gen.randint(-100,100)) for j in range(3)]) for i in range(pytest.gen.randint(1,50))]
+    cut = WINDOW_STATISTICS[statistic](arg_size)
+
+    # Act
+    ret = [cut.push(value) for value in arg_values]
+
+    # Assert
+    for step in range(len(arg_values)):
+        window = np.array(arg_values[max(0, step - arg_size + 1):step + 1])
+        assert np.shape(ret[step]) == (3,)
+        assert np.allclose(ret[step], reference(window), atol=1e-6)
+
+def test_rolling_mean_is_exact_once_a_huge_value_leaves_the_window():
+    # Arrange
+    cut = RollingMean(3)
+
+    # Act
+    ret = [cut.push(value) for value in [1e17, 1.0, 1.0, 1.0]]
+
+    # Assert
+    assert ret[-1] == 1.0
+
+def test_rolling_std_does_not_drift_over_long_runs():
+    # Arrange
+    scale = 1e6
+    cut = RollingStd(10)
+    noisy_values = [scale + pytest.gen.gauss(0, 1) for i in range(200000)]
+
+    # Act
+    for value in noisy_values:
+        cut.push(value)
+    ret = [cut.push(scale + 0.5) for i in range(10)]
+
+    # Assert
+    assert ret[-1] == pytest.approx(0.0, abs=1e-6)
+    assert cut.push(noisy_values[0]) == pytest.approx(statistics.stdev([scale + 0.5] * 9 + [noisy_values[0]]), abs=1e-6)
+
+def test_rolling_max_keeps_one_monotonic_deque_per_vector_element():
+    # Arrange
+    cut = RollingMax(pytest.gen.randint(2,10))
+    num_values = pytest.gen.randint(10,50)
+
+    # Act
+    ret = [cut.push([float(i), float(-i)]) for i in range(num_values)]
+
+    # Assert
+    assert ret[-1].tolist() == [num_values - 1.0, -(num_values - cut.size) * 1.0]
+    assert len(cut.candidates) == 0
+    assert [len(window.candidates) for window in cut.elements] == [1, cut.size]
+
+def test_kaster_window_applies_a_separate_window_to_every_returned_value():
+    # Arrange
+    cut = KasterWindow('mean', 2)
+
+    # Act
+    ret = [cut.push(returned_knowledge) for returned_knowledge in [(1.0, 10.0), (3.0, 20.0), (5.0, 60.0)]]
+
+    # Assert
+    assert ret == [(1.0, 10.0), (2.0, 15.0), (4.0, 40.0)]
+
+def test_kaster_window_raises_value_error_for_unrecognized_statistic_or_size():
+    # Act / Assert
+    with pytest.raises(ValueError) as e_info:
+        KasterWindow('median', 5)
+    assert 'Unrecognized window statistic median' in e_info.exconly()
+    with pytest.raises(ValueError) as e_info:
+        KasterWindow('mean', 0)
+    assert 'Window size must be a positive integer, not 0.' in e_info.exconly()
+
+def test_parse_window_kaster_returns_input_name_and_windowed_pass_through_method():
+    # Act
+    input_variable, method = parse_window_kaster('rate( battery_voltage , 60 )')
+
+    # Assert
+    assert input_variable == 'battery_voltage'
+    assert method.kast_window == ('rate', 60)
+    assert method.__name__ == 'rate_window'
+    assert method(1.5) == (1.5,)
+
+def test_parse_window_kaster_raises_value_error_for_malformed_entries():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        parse_window_kaster('mean battery_voltage')
+
+    # Assert
+    assert 'Unrecognized WindowKasters entry mean battery_voltage; expected statistic(input_name, size).' in e_info.exconly()
@@ -11,13 +11,23 @@ import pytest
 from mock import MagicMock
 
 import numpy as np
+import configparser
 
-from kast.utils.data_sources.csv_data_source import CsvDataSource
+from kast.src.kast_runtime import ConfigName
+from kast.utils.data_sources.csv_data_source import CsvDataSource, WORKER_CHUNK_SIZE, parse_column_type, parse_column
+
+def make_fake_config(default_options={}, sections={}):
+    # Build a config as parsed by KastRuntime.parse_config
+    config = configparser.ConfigParser()
+    config.optionxform = ConfigName
+    config.read_dict(dict(sections, DEFAULT=default_options))
+    return config
 
 def test_csv_data_source__init__sets_runtime_to_given_runtime(mocker):
     # Arrange
     cut = CsvDataSource.__new__(CsvDataSource)
     fake_runtime = MagicMock()
+    fake_runtime.config = make_fake_config()
 
     mocker.patch('csv.reader', side_effect=Exception('short-circuit red mage'))
 
@@ -33,6 +43,7 @@ def test_csv_data_source__init__sets_data_to_numpy_array_result_of_csv_reader_th
     # Arrange
     cut = CsvDataSource.__new__(CsvDataSource)
     fake_runtime = MagicMock()
+    fake_runtime.config = make_fake_config()
     fake_open_return = MagicMock()
     fake_reader_return = [MagicMock()]
 
@@ -93,6 +104,26 @@ def test_csv_data_source_get_new_information_increments_index(mocker):
     # Assert
     assert cut.index == fake_index + 1
 
+def test_csv_data_source_get_new_block_slices_rows_into_columns_by_header_and_advances_index(mocker):
+    # Arrange
+    num_rows = pytest.gen.randint(2,10)
+    arg_block_size = pytest.gen.randint(1,num_rows)
+    fake_index = pytest.gen.randint(0,num_rows-1)
+
+    cut = CsvDataSource.__new__(CsvDataSource)
+    cut.headers = np.array(['a', 'b'])
+    cut.data = np.array([[str(i), str(-i)] for i in range(num_rows)])
+    cut.index = fake_index
+
+    # Act
+    ret = cut.get_new_block(arg_block_size)
+
+    # Assert
+    expected_rows = list(range(fake_index, min(fake_index + arg_block_size, num_rows)))
+    assert list(ret['a']) == [str(i) for i in expected_rows]
+    assert list(ret['b']) == [str(-i) for i in expected_rows]
+    assert cut.index == fake_index + len(expected_rows)
+
 def test_csv_data_source_has_more_returns_true_when_index_is_less_than_length_of_internal_data(mocker):
     # Arrange
     fake_data = MagicMock()
@@ -145,4 +176,313 @@ def test_csv_data_source_has_more_returns_false_when_index_is_equal_to_length_of
     ret = cut.has_more()
 
     # Assert
-    ret == False
\ No newline at end of file
+    ret == False
+
+def write_fake_csv(directory, num_rows):
+    # Write a two-column csv whose rows hold their own row index
+    file_path = directory / 'fake_data.csv'
+    lines = ['a,b'] + [f'{i},"[{i}, {-i}]"' for i in range(num_rows)]
+    file_path.write_text('\n'.join(lines) + '\n')
+    return str(file_path)
+
+def test_csv_data_source__init__with_chunk_size_reads_only_headers_and_keeps_file_open(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 10)
+    fake_runtime.config = make_fake_config({'ChunkSize': '3'})
+
+    # Act
+    cut = CsvDataSource(fake_runtime)
+
+    # Assert
+    assert cut.chunk_size == 3
+    assert list(cut.headers) == ['a', 'b']
+    assert len(cut.data) == 0
+    assert cut.reader is not None
+    assert cut.index == 0
+
+def test_csv_data_source_streams_every_row_in_order_holding_at_most_chunk_size_rows(mocker, tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(0,20)
+    arg_chunk_size = pytest.gen.randint(1,5)
+
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, num_rows)
+    fake_runtime.config = make_fake_config({'ChunkSize': str(arg_chunk_size)})
+
+    cut = CsvDataSource(fake_runtime)
+    frames = []
+
+    # Act
+    while cut.has_more():
+        assert len(cut.data) <= arg_chunk_size
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert [frame['a'] for frame in frames] == [str(i) for i in range(num_rows)]
+    assert [frame['b'] for frame in frames] == [f'[{i}, {-i}]' for i in range(num_rows)]
+    assert cut.index == num_rows
+    assert cut.reader is None
+    assert cut.file.closed
+
+def test_csv_data_source_get_new_block_spans_streamed_chunks(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 10)
+    fake_runtime.config = make_fake_config({'ChunkSize': '3'})
+
+    cut = CsvDataSource(fake_runtime)
+
+    # Act
+    blocks = []
+    while cut.has_more():
+        blocks.append(cut.get_new_block(4))
+
+    # Assert
+    assert [list(block['a']) for block in blocks] == [['0', '1', '2', '3'], ['4', '5', '6', '7'], ['8', '9']]
+    assert cut.index == 10
+
+def test_csv_data_source_count_rows_counts_rows_whether_loaded_or_streamed(mocker, tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(0,20)
+    data_file_path = write_fake_csv(tmp_path, num_rows)
+
+    loaded_runtime = MagicMock()
+    loaded_runtime.data_file_path = data_file_path
+    loaded_runtime.config = make_fake_config()
+    streamed_runtime = MagicMock()
+    streamed_runtime.data_file_path = data_file_path
+    streamed_runtime.config = make_fake_config({'ChunkSize': '3'})
+
+    # Act
+    loaded_count = CsvDataSource(loaded_runtime).count_rows()
+    streamed_count = CsvDataSource(streamed_runtime).count_rows()
+
+    # Assert
+    assert loaded_count == num_rows
+    assert streamed_count == num_rows
+
+@pytest.mark.parametrize('chunk_size', ['0', '3'])
+def test_csv_data_source_select_rows_limits_frames_to_row_range_and_keeps_file_row_index(mocker, tmp_path, chunk_size):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 20)
+    fake_runtime.config = make_fake_config({'ChunkSize': chunk_size})
+
+    cut = CsvDataSource(fake_runtime)
+    frames = []
+
+    # Act
+    cut.select_rows(5, 12)
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert [frame['a'] for frame in frames] == [str(i) for i in range(5, 12)]
+    assert cut.index == 12
+
+def test_csv_data_source_locate_rows_finds_byte_offset_of_each_row_including_quoted_newlines(mocker, tmp_path):
+    # Arrange
+    file_path = tmp_path / 'fake_data.csv'
+    file_path.write_bytes(b'a,b\r\n0,"x"\r\n1,"multi\nline"\r\n2,\xc3\xa9\r\n3,y\r\n')
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = str(file_path)
+    fake_runtime.config = make_fake_config()
+
+    cut = CsvDataSource(fake_runtime)
+
+    # Act
+    ret = cut.locate_rows([2, 0, 3, 1])
+
+    # Assert
+    assert ret == [28, 5, 34, 12]
+
+def test_csv_data_source_select_rows_with_located_position_seeks_straight_to_start_row(mocker, tmp_path):
+    # Arrange
+    data_file_path = write_fake_csv(tmp_path, 20)
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = data_file_path
+    fake_runtime.config = make_fake_config({'ChunkSize': '3'})
+
+    cut = CsvDataSource(fake_runtime)
+    position = cut.locate_rows([5])[0]
+    frames = []
+
+    # Act
+    cut.select_rows(5, 12, position)
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert [frame['a'] for frame in frames] == [str(i) for i in range(5, 12)]
+    assert [frame['b'] for frame in frames] == [f'[{i}, {-i}]' for i in range(5, 12)]
+    assert cut.index == 12
+
+def test_csv_data_source__init__with_worker_options_streams_file_instead_of_loading_it(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 10)
+    fake_runtime.config = make_fake_config()
+    worker_options = CsvDataSource(fake_runtime).worker_options()
+
+    # Act
+    cut = CsvDataSource(fake_runtime, **worker_options)
+
+    # Assert
+    assert worker_options == {'chunk_size': WORKER_CHUNK_SIZE}
+    assert cut.chunk_size == WORKER_CHUNK_SIZE
+    assert len(cut.data) == 0
+    assert cut.reader is not None
+
+def test_csv_data_source_worker_options_keep_configured_chunk_size(mocker, tmp_path):
+    # Arrange
+    arg_chunk_size = pytest.gen.randint(1,10)
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 10)
+    fake_runtime.config = make_fake_config({'ChunkSize': str(arg_chunk_size)})
+
+    # Act
+    cut = CsvDataSource(fake_runtime)
+
+    # Assert
+    assert cut.worker_options() == {'chunk_size': arg_chunk_size}
+
+def test_parse_column_type_splits_base_type_and_vector_length():
+    # Act / Assert
+    assert parse_column_type('float') == ('float', 0)
+    assert parse_column_type(' int ') == ('int', 0)
+    assert parse_column_type('str') == ('str', 0)
+    assert parse_column_type('float[7]') == ('float', 7)
+    assert parse_column_type('int [ 3 ]') == ('int', 3)
+
+def test_parse_column_type_raises_value_error_for_unrecognized_types():
+    # Act / Assert
+    for arg_column_type in ['double', 'str[3]', 'float[]', 'float[3']:
+        with pytest.raises(ValueError) as e_info:
+            parse_column_type(arg_column_type)
+        assert f'Unrecognized CsvSchema column type {arg_column_type}' in e_info.exconly()
+
+def test_parse_column_parses_scalar_and_vector_cells_into_typed_arrays():
+    # Arrange
+    arg_scalar_values = np.array(['1.5', ' -2', '3e2'])
+    arg_vector_values = np.array(['[0.0, -2.0, 1.00]', '[1, 2, 3]'])
+
+    # Act
+    ret_float = parse_column(arg_scalar_values, 'float')
+    ret_int = parse_column(np.array(['1', '-2']), 'int')
+    ret_str = parse_column(arg_scalar_values, 'str')
+    ret_vector = parse_column(arg_vector_values, 'float[3]')
+
+    # Assert
+    assert ret_float.dtype == np.float64 and list(ret_float) == [1.5, -2.0, 300.0]
+    assert ret_int.dtype == np.int64 and list(ret_int) == [1, -2]
+    assert list(ret_str) == list(arg_scalar_values)
+    assert ret_vector.dtype == np.float64 and ret_vector.shape == (2, 3)
+    assert ret_vector.tolist() == [[0.0, -2.0, 1.0], [1.0, 2.0, 3.0]]
+    assert parse_column(np.array([], dtype=str), 'int[4]').shape == (0, 4)
+
+def test_parse_column_raises_value_error_when_vector_cells_have_the_wrong_length():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        parse_column(np.array(['[1, 2, 3]', '[1, 2]']), 'float[3]')
+
+    # Assert
+    assert 'CsvSchema column type float[3] expects 3 values in every cell, but row 1 has 2.' in e_info.exconly()
+
+def test_parse_column_raises_value_error_naming_ragged_cell_even_when_total_count_matches():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        parse_column(np.array(['[1, 2]', '[3, 4, 5, 6]']), 'float[3]', 10)
+
+    # Assert
+    assert 'but row 10 has 2.' in e_info.exconly()
+
+def test_csv_data_source_with_schema_delivers_typed_values_in_each_frame(mocker, tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, num_rows)
+    fake_runtime.config = make_fake_config(sections={'CsvSchema': {'a': 'int', 'b': 'float[2]'}})
+
+    cut = CsvDataSource(fake_runtime)
+    frames = []
+
+    # Act
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert cut.schema == {'a': 'int', 'b': 'float[2]'}
+    assert [frame['a'] for frame in frames] == list(range(num_rows))
+    assert [frame['b'].tolist() for frame in frames] == [[float(i), float(-i)] for i in range(num_rows)]
+    assert type(frames[0]['b']) == np.ndarray
+
+def test_csv_data_source_with_schema_and_chunk_size_delivers_typed_blocks_across_chunks(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 5)
+    fake_runtime.config = make_fake_config({'ChunkSize': '2'}, {'CsvSchema': {'b': 'int[2]'}})
+
+    cut = CsvDataSource(fake_runtime)
+
+    # Act
+    ret = cut.get_new_block(3)
+
+    # Assert
+    assert list(ret['a']) == ['0', '1', '2']
+    assert ret['b'].tolist() == [[0, 0], [1, -1], [2, -2]]
+
+def test_csv_data_source_with_cache_writes_sidecar_then_memory_maps_it_on_later_loads(mocker, tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, num_rows)
+    fake_runtime.config = make_fake_config({'CacheParsedData': 'True'}, {'CsvSchema': {'a': 'int', 'b': 'float[2]'}})
+
+    # Act
+    first_load = CsvDataSource(fake_runtime)
+    mocker.patch('csv.reader', side_effect=Exception('csv should not be re-parsed'))
+    second_load = CsvDataSource(fake_runtime)
+
+    # Assert
+    assert (tmp_path / 'fake_data.csv.kastcache.npy').exists()
+    assert (tmp_path / 'fake_data.csv.kastcache.json').exists()
+    assert type(first_load.data) == np.ndarray
+    assert isinstance(second_load.data, np.memmap)
+    assert list(second_load.headers) == ['a', 'b']
+    assert second_load.get_new_block(num_rows)['b'].tolist() == [[float(i), float(-i)] for i in range(num_rows)]
+
+def test_csv_data_source_with_cache_reparses_when_file_or_schema_changes(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 3)
+    fake_runtime.config = make_fake_config({'CacheParsedData': 'True'}, {'CsvSchema': {'a': 'int'}})
+    CsvDataSource(fake_runtime)
+
+    # Act
+    fake_runtime.config = make_fake_config({'CacheParsedData': 'True'}, {'CsvSchema': {'a': 'float'}})
+    changed_schema_load = CsvDataSource(fake_runtime)
+    write_fake_csv(tmp_path, 5)
+    changed_file_load = CsvDataSource(fake_runtime)
+
+    # Assert
+    assert not isinstance(changed_schema_load.data, np.memmap)
+    assert changed_schema_load.data['a'].dtype == np.float64
+    assert not isinstance(changed_file_load.data, np.memmap)
+    assert len(changed_file_load.data) == 5
+
+def test_csv_data_source_with_cache_warns_and_continues_when_sidecar_cannot_be_written(mocker, tmp_path):
+    # Arrange
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = write_fake_csv(tmp_path, 3)
+    fake_runtime.config = make_fake_config({'CacheParsedData': 'True'})
+
+    mocker.patch('kast.utils.data_sources.csv_data_source.np.save', side_effect=OSError('read-only'))
+
+    # Act
+    with pytest.warns(UserWarning) as record:
+        cut = CsvDataSource(fake_runtime)
+
+    # Assert
+    assert any('could not write data cache' in str(warning.message) for warning in record)
+    assert len(cut.data) == 3
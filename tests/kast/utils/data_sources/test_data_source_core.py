@@ -11,6 +11,10 @@ import pytest
 import mock
 from mock import MagicMock
 
+import numpy as np
+import configparser
+import asyncio
+
 from kast.utils.data_sources.core import DataSource
 
 def test_data_source_core__init__raises_not_implemented_error(mocker):
@@ -45,4 +49,77 @@ def test_data_source_core_has_more_raises_not_implemented_error(mocker):
 
     # Assert
     # Pytest raises does this!
-        
\ No newline at end of file
+
+def test_data_source_core_get_config_option_reads_runtime_config_default_section_with_fallback(mocker):
+    # Arrange
+    fake_value = MagicMock()
+    fake_fallback = MagicMock()
+
+    cut = DataSource.__new__(DataSource)
+    cut.runtime = MagicMock()
+    cut.runtime.config = {'DEFAULT': {'SomeOption': fake_value}}
+
+    # Act / Assert
+    assert cut.get_config_option('SomeOption') == fake_value
+    assert cut.get_config_option('MissingOption', fake_fallback) == fake_fallback
+
+def test_data_source_core_get_config_section_returns_section_options_without_default_options(mocker):
+    # Arrange
+    fake_config = configparser.ConfigParser()
+    fake_config.read_dict({'DEFAULT': {'DataType': 'csv'}, 'SomeSection': {'a': '1', 'b': '2'}})
+
+    cut = DataSource.__new__(DataSource)
+    cut.runtime = MagicMock()
+    cut.runtime.config = fake_config
+
+    # Act / Assert
+    assert cut.get_config_section('SomeSection') == {'a': '1', 'b': '2'}
+    assert cut.get_config_section('MissingSection') == {}
+
+def test_data_source_core_get_new_block_stacks_up_to_block_size_frames_into_columns(mocker):
+    # Arrange
+    num_frames = pytest.gen.randint(1,10)
+    arg_block_size = pytest.gen.randint(1,num_frames)
+    fake_frames = [{'a': i, 'b': [i, i]} for i in range(num_frames)]
+
+    cut = DataSource.__new__(DataSource)
+    mocker.patch.object(cut, 'has_more', return_value=True)
+    mocker.patch.object(cut, 'get_new_information', side_effect=fake_frames)
+
+    # Act
+    ret = cut.get_new_block(arg_block_size)
+
+    # Assert
+    assert cut.get_new_information.call_count == arg_block_size
+    assert list(ret['a']) == list(range(arg_block_size))
+    assert ret['b'].shape == (arg_block_size, 2)
+
+def test_data_source_core_get_new_block_stops_when_data_source_has_no_more(mocker):
+    # Arrange
+    cut = DataSource.__new__(DataSource)
+    mocker.patch.object(cut, 'has_more', side_effect=[True, False])
+    mocker.patch.object(cut, 'get_new_information', return_value={'a': 1.0})
+
+    # Act
+    ret = cut.get_new_block(10)
+
+    # Assert
+    assert cut.get_new_information.call_count == 1
+    assert list(ret['a']) == [1.0]
+
+def test_data_source_core_async_methods_default_to_their_synchronous_counterparts(mocker):
+    # Arrange
+    fake_information = MagicMock()
+    fake_has_more = MagicMock()
+
+    cut = DataSource.__new__(DataSource)
+    mocker.patch.object(cut, 'get_new_information', return_value=fake_information)
+    mocker.patch.object(cut, 'has_more', return_value=fake_has_more)
+
+    # Act
+    ret_information = asyncio.run(cut.async_get_new_information())
+    ret_has_more = asyncio.run(cut.async_has_more())
+
+    # Assert
+    assert ret_information == fake_information
+    assert ret_has_more == fake_has_more
@@ -0,0 +1,163 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import queue
+import threading
+import configparser
+
+from kast.src.kast_runtime import KastRuntime
+from kast.src.spellbook import Spellbook
+from kast.utils.data_sources.queue_data_source import QueueDataSource
+
+def make_queue_data_source(default_options={}, headers=['a', 'b']):
+    # Build a QueueDataSource from a runtime with the given config options
+    fake_runtime = MagicMock()
+    fake_runtime.headers = headers
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict({'DEFAULT': default_options})
+    return QueueDataSource(fake_runtime)
+
+def test_queue_data_source__init__reads_queue_options_from_config(mocker):
+    # Arrange
+    arg_size = pytest.gen.randint(1,100)
+
+    # Act
+    cut = make_queue_data_source({'QueueSize': str(arg_size), 'QueuePolicy': 'drop_oldest', 'QueueTimeout': '0.5'})
+
+    # Assert
+    assert cut.maxsize == arg_size
+    assert cut.policy == 'drop_oldest'
+    assert cut.timeout == 0.5
+    assert cut.index == 0
+
+def test_queue_data_source__init__raises_value_error_for_unrecognized_policy(mocker):
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        make_queue_data_source({'QueuePolicy': 'drop_everything'})
+
+    # Assert
+    assert 'Unrecognized QueuePolicy drop_everything' in e_info.exconly()
+
+def test_queue_data_source_delivers_frames_in_order_zipping_sequences_with_headers(mocker):
+    # Arrange
+    cut = make_queue_data_source()
+
+    # Act
+    cut.put({'a': 1, 'b': 2})
+    cut.put([3, 4])
+    frames = [cut.get_new_information(), cut.get_new_information()]
+
+    # Assert
+    assert frames == [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]
+    assert cut.index == 2
+
+@pytest.mark.parametrize('policy, expected_frames, expected_dropped, expected_coalesced', [
+    ('drop_oldest', [{'a': 2, 'b': 2}, {'a': 3}], 1, 0),
+    ('drop_newest', [{'a': 1}, {'a': 2, 'b': 2}], 1, 0),
+    ('coalesce', [{'a': 1}, {'a': 3, 'b': 2}], 0, 1)])
+def test_queue_data_source_put_applies_policy_when_full_and_counts_dropped_frames(mocker, policy, expected_frames, expected_dropped, expected_coalesced):
+    # Arrange
+    cut = make_queue_data_source({'QueueSize': '2', 'QueuePolicy': policy})
+
+    # Act
+    cut.put({'a': 1})
+    cut.put({'a': 2, 'b': 2})
+    cut.put({'a': 3})
+    cut.close()
+    frames = []
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert frames == expected_frames
+    assert cut.stats() == {'received': 3, 'delivered': 2, 'dropped': expected_dropped, 'coalesced': expected_coalesced, 'queued': 0, 'max_queued': 2}
+
+def test_queue_data_source_put_with_block_policy_waits_for_space_or_times_out(mocker):
+    # Arrange
+    cut = make_queue_data_source({'QueueSize': '1'})
+    cut.put({'a': 1})
+
+    # Act
+    timed_out = cut.put({'a': 2}, timeout=0.01)
+    producer = threading.Thread(target=cut.put, args=({'a': 3},))
+    producer.start()
+    first_frame = cut.get_new_information()
+    producer.join(5)
+    second_frame = cut.get_new_information()
+
+    # Assert
+    assert timed_out == False
+    assert [first_frame, second_frame] == [{'a': 1}, {'a': 3}]
+    assert cut.stats()['dropped'] == 1
+
+def test_queue_data_source_get_new_information_raises_empty_after_timeout(mocker):
+    # Arrange
+    cut = make_queue_data_source({'QueueTimeout': '0.01'})
+
+    # Act
+    with pytest.raises(queue.Empty):
+        cut.get_new_information()
+
+    # Assert
+    assert cut.has_more() == True
+
+def test_queue_data_source_attach_moves_frames_from_another_queue_until_sentinel(mocker):
+    # Arrange
+    source_queue = queue.Queue()
+    cut = make_queue_data_source()
+
+    # Act
+    pump_thread = cut.attach(source_queue)
+    for i in range(3):
+        source_queue.put({'a': i})
+    source_queue.put(None)
+    pump_thread.join(5)
+    frames = []
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert frames == [{'a': 0}, {'a': 1}, {'a': 2}]
+    assert cut.closed == True
+
+def test_queue_data_source_get_new_information_raises_eof_error_when_closed_while_waiting(mocker):
+    # Arrange
+    cut = make_queue_data_source()
+    closer = threading.Timer(0.05, cut.close)
+
+    # Act
+    closer.start()
+    with pytest.raises(EOFError):
+        cut.get_new_information()
+
+    # Assert
+    assert cut.has_more() == False
+
+def test_queue_data_source_closed_from_another_thread_ends_execute_cleanly(mocker):
+    # Arrange
+    cut = make_queue_data_source()
+    runtime = KastRuntime.__new__(KastRuntime)
+    runtime.data_source = cut
+    runtime.spellbook = Spellbook(['a'], [(['a'], ['x'], lambda a: (a * 2,))])
+
+    def produce():
+        cut.put({'a': 1})
+        threading.Timer(0.05, cut.close).start()
+
+    # Act
+    produce()
+    ret = [spellbook.high_level_knowledge['x'].value for spellbook in runtime.execute()]
+
+    # Assert
+    assert ret == [2]
+    assert cut.index == 1
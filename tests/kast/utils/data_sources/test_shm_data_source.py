@@ -0,0 +1,246 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import uuid
+import json
+import configparser
+import numpy as np
+
+from kast.src.kast_runtime import KastRuntime
+from kast.src.spellbook import Spellbook
+from kast.utils.data_sources.shm_data_source import ShmDataSource, ShmFrameWriter, parse_frame_layout
+from kast.utils.sinks.jsonl_sink import JsonlSink
+
+LAYOUT = {'step': 'int64', 'accel': 'float64[3]'}
+
+def make_shm_data_source(default_options={}):
+    # Build a ShmDataSource, with a segment name unique to the test, from a runtime with the given config
+    fake_runtime = MagicMock()
+    fake_runtime.headers = []
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict({'DEFAULT': dict({'ShmName': f'kast_test_{uuid.uuid4().hex[:12]}'}, **default_options),
+                                   'ShmLayout': LAYOUT})
+    return ShmDataSource(fake_runtime)
+
+def test_parse_frame_layout_builds_numeric_dtype_in_declared_order():
+    # Act
+    frame_dtype = parse_frame_layout({'step': 'int64', 'accel': 'float32[3]'})
+
+    # Assert
+    assert frame_dtype.names == ('step', 'accel')
+    assert frame_dtype['step'] == np.dtype(np.int64)
+    assert frame_dtype['accel'].shape == (3,)
+    with pytest.raises(ValueError) as e_info:
+        parse_frame_layout({'name': 'str'})
+    assert 'Unrecognized ShmLayout field type str for name' in e_info.exconly()
+
+def test_shm_data_source_reads_frames_written_by_producer_in_order_as_views():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '8', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 8)
+    num_frames = pytest.gen.randint(1,8)
+
+    # Act
+    for i in range(num_frames):
+        writer.write({'step': i, 'accel': [i, 2 * i, 3 * i]})
+    frames = [cut.get_new_information() for i in range(num_frames)]
+
+    # Assert
+    assert [int(frame['step']) for frame in frames] == list(range(num_frames))
+    assert frames[-1]['accel'].tolist() == [num_frames - 1, 2 * (num_frames - 1), 3 * (num_frames - 1)]
+    assert frames[-1]['accel'].base is not None
+    assert cut.stats() == {'received': num_frames, 'lost': 0}
+    assert cut.has_more() == True
+    writer.close()
+    assert cut.has_more() == False
+    del frames
+    cut.close()
+
+def test_shm_data_source_skips_and_counts_frames_overwritten_before_they_were_read():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '4', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 4)
+
+    # Act
+    for i in range(10):
+        writer.write({'step': i, 'accel': [0, 0, 0]})
+    steps = [int(cut.get_new_information()['step']) for i in range(4)]
+    writer.close()
+
+    # Assert
+    assert steps == [6, 7, 8, 9]
+    assert cut.stats() == {'received': 4, 'lost': 6}
+    with pytest.raises(EOFError):
+        cut.get_new_information()
+    cut.close()
+
+def test_shm_data_source_get_new_block_returns_column_views_up_to_end_of_ring():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '4', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 4)
+    for i in range(3):
+        writer.write({'step': i, 'accel': [i, i, i]})
+    cut.get_new_information()
+    for i in range(3, 5):
+        writer.write({'step': i, 'accel': [i, i, i]})
+
+    # Act
+    first_block = cut.get_new_block(10)
+    first_steps = first_block['step'].tolist()
+    second_block = cut.get_new_block(10)
+
+    # Assert
+    assert first_steps == [1, 2, 3]
+    assert second_block['step'].tolist() == [4]
+    assert second_block['accel'].shape == (1, 3)
+    assert cut.index == 5
+    writer.close()
+    del first_block, second_block
+    cut.close()
+
+class OverwritingColumn():
+    # Column whose first read lets the producer lap the ring, as if it wrote while the frame was being copied
+    def __init__(self, column, writer, num_frames):
+        self.column = column
+        self.writer = writer
+        self.num_frames = num_frames
+
+    def __getitem__(self, slot):
+        for i in range(self.num_frames):
+            self.writer.write({'step': 100 + i, 'accel': [0, 0, 0]})
+        self.num_frames = 0
+        return self.column[slot]
+
+def test_shm_data_source_get_new_information_discards_frame_overwritten_while_it_was_read():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '4', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 4)
+    for i in range(2):
+        writer.write({'step': i, 'accel': [i, i, i]})
+    cut.columns['step'] = OverwritingColumn(cut.columns['step'], writer, 4)
+
+    # Act
+    frame = cut.get_new_information()
+
+    # Assert
+    assert int(frame['step']) == 100
+    assert cut.stats() == {'received': 1, 'lost': 2}
+    writer.close()
+    del frame
+    cut.close()
+
+def test_shm_data_source_get_new_block_skips_block_whose_slots_no_longer_hold_expected_frames():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '8', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 8)
+    for i in range(3):
+        writer.write({'step': i, 'accel': [i, i, i]})
+    cut.ring.sequences[0] = 0 # Producer rewriting the oldest slot
+
+    # Act
+    block = cut.get_new_block(10)
+
+    # Assert
+    assert block['step'].tolist() == [1, 2]
+    assert cut.stats() == {'received': 2, 'lost': 1}
+    writer.close()
+    del block
+    cut.close()
+
+def test_shm_data_source_replaces_segment_left_behind_closed_by_earlier_run():
+    # Arrange
+    crashed = make_shm_data_source({'ShmCapacity': '4'})
+    writer = ShmFrameWriter(crashed.name, LAYOUT, 4)
+    writer.write({'step': 7, 'accel': [0, 0, 0]})
+    writer.close()
+    crashed.ring.release(unlink=False) # Exits without removing the segment
+
+    # Act
+    cut = make_shm_data_source({'ShmName': crashed.name, 'ShmCapacity': '4', 'ShmTimeout': '0.01'})
+
+    # Assert
+    assert cut.has_more() == True
+    with pytest.raises(TimeoutError):
+        cut.get_new_information()
+    cut.close()
+
+def test_shm_data_source_raises_file_exists_error_when_segment_is_still_open():
+    # Arrange
+    running = make_shm_data_source({'ShmCapacity': '4'})
+
+    # Act / Assert
+    with pytest.raises(FileExistsError) as e_info:
+        make_shm_data_source({'ShmName': running.name, 'ShmCapacity': '4'})
+    assert f'Shared memory {running.name} already exists and has not been closed by its producer' in e_info.exconly()
+    running.close()
+
+def test_shm_data_source_close_can_be_called_more_than_once():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '4'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 4)
+
+    # Act
+    writer.close()
+    writer.close()
+    cut.close()
+    cut.close()
+
+    # Assert
+    assert cut.ring is None
+    assert writer.ring is None
+
+def test_shm_data_source_frames_reach_sink_unchanged_when_sink_buffer_outlasts_ring(tmp_path):
+    # Arrange
+    num_steps = pytest.gen.randint(5,12)
+    cut = make_shm_data_source({'ShmCapacity': '4', 'ShmTimeout': '5'})
+    writer = ShmFrameWriter(cut.name, LAYOUT, 4)
+    sink_runtime = MagicMock()
+    sink_runtime.config = configparser.ConfigParser()
+    sink_runtime.config.read_dict({'DEFAULT': {'SinkFile': str(tmp_path / 'out.jsonl'), 'SinkBufferSize': '16'}})
+    runtime = KastRuntime.__new__(KastRuntime)
+    runtime.data_source = cut
+    runtime.spellbook = Spellbook(['step', 'accel'], [(['accel'], ['total'], lambda accel: (float(accel.sum()),))])
+    runtime.sink = JsonlSink(sink_runtime)
+
+    # Act
+    for i in range(num_steps):
+        writer.write({'step': i, 'accel': [i, i, i]})
+        runtime.run_step()
+    runtime.sink.close()
+    writer.close()
+
+    # Assert
+    rows = [json.loads(line) for line in (tmp_path / 'out.jsonl').read_text().splitlines()]
+    assert [row['low'] for row in rows] == [{'step': i, 'accel': [i, i, i]} for i in range(num_steps)]
+    assert [row['high'] for row in rows] == [{'total': 3.0 * i} for i in range(num_steps)]
+    del runtime
+    cut.close()
+
+def test_shm_frame_writer_raises_value_error_when_layout_does_not_match_ring():
+    # Arrange
+    cut = make_shm_data_source({'ShmCapacity': '4'})
+
+    # Act / Assert
+    with pytest.raises(ValueError) as e_info:
+        ShmFrameWriter(cut.name, LAYOUT, 8)
+    assert 'not 8 frames' in e_info.exconly()
+    cut.close()
+
+def test_shm_data_source_raises_timeout_error_when_no_frame_is_written():
+    # Arrange
+    cut = make_shm_data_source({'ShmTimeout': '0.01'})
+
+    # Act
+    with pytest.raises(TimeoutError):
+        cut.get_new_information()
+    cut.close()
@@ -0,0 +1,173 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import os
+import json
+import asyncio
+import socket
+import struct
+import configparser
+import numpy as np
+
+from kast.src.kast_runtime import KastRuntime
+from kast.utils.data_sources.socket_data_source import SocketDataSource, parse_socket_address, parse_struct_layout
+
+def make_socket_data_source(default_options={}, sections={}):
+    # Build a SocketDataSource from a runtime with the given config
+    fake_runtime = MagicMock()
+    fake_runtime.headers = []
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict(dict(sections, DEFAULT=default_options))
+    return SocketDataSource(fake_runtime)
+
+def send_datagrams(family, address, datagrams):
+    with socket.socket(family, socket.SOCK_DGRAM) as sender:
+        for datagram in datagrams:
+            sender.sendto(datagram, address)
+
+def test_parse_socket_address_splits_udp_and_unix_addresses():
+    # Act / Assert
+    assert parse_socket_address('udp://127.0.0.1:9000') == (socket.AF_INET, ('127.0.0.1', 9000))
+    assert parse_socket_address('unix:///tmp/kast.sock') == (socket.AF_UNIX, '/tmp/kast.sock')
+    with pytest.raises(ValueError) as e_info:
+        parse_socket_address('tcp://127.0.0.1:9000')
+    assert 'Unrecognized SocketAddress tcp://127.0.0.1:9000' in e_info.exconly()
+
+def test_parse_struct_layout_builds_struct_and_field_lengths_in_declared_order():
+    # Act
+    layout, field_lengths = parse_struct_layout({'step': 'I', 'rpms': '4f', 'id': '8s'}, '>')
+
+    # Assert
+    assert layout.format == '>I4f8s'
+    assert field_lengths == [('step', 0), ('rpms', 4), ('id', 0)]
+    with pytest.raises(ValueError):
+        parse_struct_layout({'bad': 'float'})
+
+def test_socket_data_source_drains_json_lines_datagrams_from_udp_socket_in_order():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketTimeout': '5'})
+    num_frames = pytest.gen.randint(1,20)
+    datagrams = [json.dumps({'a': i}).encode() for i in range(num_frames)] + [b'{"a": -1}\n{"a": -2}\n']
+
+    # Act
+    send_datagrams(socket.AF_INET, cut.address, datagrams)
+    frames = [cut.get_new_information() for i in range(num_frames + 2)]
+    cut.close()
+
+    # Assert
+    assert [frame['a'] for frame in frames] == list(range(num_frames)) + [-1, -2]
+    assert cut.index == num_frames + 2
+    assert cut.has_more() == False
+
+def test_socket_data_source_decodes_struct_datagrams_from_unix_socket_into_blocks(tmp_path):
+    # Arrange
+    socket_path = str(tmp_path / 'kast.sock')
+    cut = make_socket_data_source({'SocketAddress': f'unix://{socket_path}', 'SocketFormat': 'struct', 'SocketTimeout': '5'},
+                                  {'SocketStruct': {'step': 'I', 'rpms': '2d'}})
+    datagrams = [struct.pack('<I2d', i, i * 1.5, -i * 1.5) for i in range(3)]
+
+    # Act
+    send_datagrams(socket.AF_UNIX, socket_path, datagrams)
+    block = cut.get_new_block(10)
+    cut.close()
+
+    # Assert
+    assert list(block['step']) == [0, 1, 2]
+    assert block['rpms'].tolist() == [[0.0, 0.0], [1.5, -1.5], [3.0, -3.0]]
+    assert cut.index == 3
+
+def test_socket_data_source_raises_timeout_error_when_no_datagram_arrives():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketTimeout': '0.01'})
+
+    # Act
+    with pytest.raises(TimeoutError):
+        cut.get_new_information()
+    cut.close()
+
+def test_socket_data_source_counts_and_skips_malformed_datagrams():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketTimeout': '5'})
+    datagrams = [b'{"a": 0', b'{"a": 1}', b'\xff\xfe', b'{"a": 2}']
+
+    # Act
+    send_datagrams(socket.AF_INET, cut.address, datagrams[:1])
+    with pytest.warns(UserWarning, match='skipping malformed datagram'):
+        send_datagrams(socket.AF_INET, cut.address, datagrams[1:])
+        frames = [cut.get_new_information() for i in range(2)]
+    cut.close()
+
+    # Assert
+    assert [frame['a'] for frame in frames] == [1, 2]
+    assert cut.bad_datagrams == 2
+
+def test_socket_data_source_skips_struct_datagrams_of_the_wrong_size():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketFormat': 'struct', 'SocketTimeout': '5'},
+                                  {'SocketStruct': {'step': 'I'}})
+
+    # Act
+    with pytest.warns(UserWarning, match='2 bytes, but SocketStruct describes 4 bytes'):
+        send_datagrams(socket.AF_INET, cut.address, [b'\x00\x00', struct.pack('<I', 7)])
+        frame = cut.get_new_information()
+    cut.close()
+
+    # Assert
+    assert frame['step'] == 7
+    assert cut.bad_datagrams == 1
+
+def test_socket_data_source_skips_json_datagrams_that_are_not_objects():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketTimeout': '5'})
+
+    # Act
+    with pytest.warns(UserWarning, match='expected a JSON object'):
+        send_datagrams(socket.AF_INET, cut.address, [b'5', b'[1, 2]', b'{"a": 1}'])
+        frame = cut.get_new_information()
+    cut.close()
+
+    # Assert
+    assert frame == {'a': 1}
+    assert cut.bad_datagrams == 2
+
+def test_socket_data_source_async_get_new_information_waits_without_blocking_the_event_loop():
+    # Arrange
+    cut = make_socket_data_source({'SocketAddress': 'udp://127.0.0.1:0', 'SocketTimeout': '5'})
+
+    async def receive_while_sending():
+        receiving = asyncio.ensure_future(cut.async_get_new_information())
+        await asyncio.sleep(0.05) # Only runs while receiving waits if the event loop is not blocked
+        send_datagrams(socket.AF_INET, cut.address, [b'{"a": 1}'])
+        return await receiving
+
+    # Act
+    frame = asyncio.run(receive_while_sending())
+    cut.close()
+
+    # Assert
+    assert frame == {'a': 1}
+
+def test_socket_data_source_is_closed_and_unlinked_when_execution_finishes(tmp_path):
+    # Arrange
+    socket_path = str(tmp_path / 'kast.sock')
+    cut = make_socket_data_source({'SocketAddress': f'unix://{socket_path}', 'SocketTimeout': '5'})
+    runtime = KastRuntime.__new__(KastRuntime)
+    runtime.data_source = cut
+
+    # Act
+    runtime.finish_execution()
+
+    # Assert
+    assert cut.socket.fileno() == -1
+    assert cut.has_more() == False
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,134 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import sqlite3
+import configparser
+import numpy as np
+
+from kast.utils.data_sources.sqlite_data_source import SqliteDataSource, parse_sql_value
+
+def write_fake_database(path, num_rows):
+    # Telemetry table with a time column, a mode and a reading per row
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE telemetry (time REAL, mode TEXT, "temp c" REAL)')
+        connection.executemany('INSERT INTO telemetry VALUES (?, ?, ?)', [(i * 0.5, 'cruise' if i % 2 else 'idle', i * 10.0) for i in range(num_rows)])
+    connection.close()
+
+def make_sqlite_data_source(database_path, default_options={}, sections={}):
+    # Build a SqliteDataSource from a runtime with the given config
+    fake_runtime = MagicMock()
+    fake_runtime.data_file_path = str(database_path)
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict(dict(sections, DEFAULT=dict({'SqliteTable': 'telemetry'}, **default_options)))
+    return SqliteDataSource(fake_runtime)
+
+def test_parse_sql_value_parses_numbers_and_keeps_other_text():
+    # Act / Assert
+    assert parse_sql_value('3') == 3
+    assert parse_sql_value('2.5') == 2.5
+    assert parse_sql_value('2024-01-01T00:00:00') == '2024-01-01T00:00:00'
+
+def test_sqlite_data_source_streams_every_column_of_every_row_in_rowid_order_in_fetchmany_batches(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,20)
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, num_rows)
+    cut = make_sqlite_data_source(database_path, {'SqliteBatchSize': str(pytest.gen.randint(1,5))})
+
+    # Act
+    frames = []
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert frames == [{'time': i * 0.5, 'mode': 'cruise' if i % 2 else 'idle', 'temp c': i * 10.0} for i in range(num_rows)]
+    assert cut.index == num_rows
+    assert cut.last_rowid == num_rows
+    assert cut.count_rows() == num_rows
+    cut.close()
+
+def test_sqlite_data_source_maps_columns_to_knowledge_names_and_filters_rows_by_where_and_time_range(tmp_path):
+    # Arrange
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, 20)
+    cut = make_sqlite_data_source(database_path,
+                                  {'SqliteWhere': "mode = 'cruise'", 'SqliteTimeColumn': 'time', 'SqliteStartTime': '2', 'SqliteStopTime': '6.5'},
+                                  {'SqliteColumns': {'temp c': 'temperature'}})
+
+    # Act
+    frames = [cut.get_new_information() for i in range(cut.count_rows())]
+
+    # Assert
+    assert frames == [{'temperature': i * 10.0} for i in (5, 7, 9, 11)]
+    assert cut.has_more() == False
+    cut.close()
+
+def test_sqlite_data_source_resumes_after_the_given_rowid(tmp_path):
+    # Arrange
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, 10)
+    first_run = make_sqlite_data_source(database_path)
+    for i in range(pytest.gen.randint(1,9)):
+        first_run.get_new_information()
+    first_run.close()
+
+    # Act
+    cut = make_sqlite_data_source(database_path, {'SqliteResumeRowid': str(first_run.last_rowid)})
+    frame = cut.get_new_information()
+
+    # Assert
+    assert frame['time'] == first_run.last_rowid * 0.5
+    cut.close()
+
+def test_sqlite_data_source_get_new_block_returns_columns_spanning_fetched_batches(tmp_path):
+    # Arrange
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, 10)
+    cut = make_sqlite_data_source(database_path, {'SqliteBatchSize': '3'})
+
+    # Act
+    block = cut.get_new_block(7)
+    last_block = cut.get_new_block(7)
+
+    # Assert
+    assert block['temp c'].tolist() == [i * 10.0 for i in range(7)]
+    assert list(last_block['mode']) == ['cruise', 'idle', 'cruise']
+    assert (cut.index, cut.last_rowid) == (10, 10)
+    cut.close()
+
+def test_sqlite_data_source_select_rows_restricts_rows_and_sets_index(tmp_path):
+    # Arrange
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, 10)
+    cut = make_sqlite_data_source(database_path)
+
+    # Act
+    cut.select_rows(3, 6)
+    frames = []
+    while cut.has_more():
+        frames.append(cut.get_new_information())
+
+    # Assert
+    assert [frame['temp c'] for frame in frames] == [30.0, 40.0, 50.0]
+    assert cut.index == 6
+    cut.close()
+
+def test_sqlite_data_source_raises_value_error_for_time_bounds_without_time_column(tmp_path):
+    # Arrange
+    database_path = tmp_path / 'telemetry.db'
+    write_fake_database(database_path, 1)
+
+    # Act / Assert
+    with pytest.raises(ValueError) as e_info:
+        make_sqlite_data_source(database_path, {'SqliteStartTime': '1'})
+    assert 'SqliteStartTime and SqliteStopTime require SqliteTimeColumn.' in e_info.exconly()
@@ -0,0 +1,78 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import csv
+import json
+import configparser
+import numpy as np
+
+from kast.utils.sinks.jsonl_sink import JsonlSink
+from kast.utils.sinks.csv_sink import CsvSink
+from kast.utils.sinks.npz_sink import NpzSink, load_npz_sink
+
+def make_sink(sink_class, default_options={}):
+    # Build a sink from a runtime with the given config
+    fake_runtime = MagicMock()
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict({'DEFAULT': default_options})
+    return sink_class(fake_runtime)
+
+def write_rows(cut, num_rows):
+    for step in range(1, num_rows + 1):
+        cut.write(step, {'pose': np.array([step, step + 0.5]), 'name': f'row{step}'}, {'posx': np.float64(step)})
+    cut.close()
+
+def test_jsonl_sink_writes_one_json_object_per_step(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    sink_path = tmp_path / 'out.jsonl'
+    cut = make_sink(JsonlSink, {'SinkFile': str(sink_path), 'SinkBufferSize': '3'})
+
+    # Act
+    write_rows(cut, num_rows)
+
+    # Assert
+    lines = [json.loads(line) for line in sink_path.read_text().splitlines()]
+    assert lines == [{'step': step, 'low': {'pose': [step, step + 0.5], 'name': f'row{step}'}, 'high': {'posx': step}} for step in range(1, num_rows + 1)]
+
+def test_csv_sink_writes_header_then_one_row_per_step(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    sink_path = tmp_path / 'out.csv'
+    cut = make_sink(CsvSink, {'SinkFile': str(sink_path), 'SinkBufferSize': '3', 'SinkThread': 'True'})
+
+    # Act
+    write_rows(cut, num_rows)
+
+    # Assert
+    with open(sink_path, newline='') as sink_file:
+        rows = list(csv.reader(sink_file))
+    assert rows[0] == ['step', 'pose', 'name', 'posx']
+    assert rows[1:] == [[str(step), str([float(step), step + 0.5]), f'row{step}', str(float(step))] for step in range(1, num_rows + 1)]
+
+def test_npz_sink_writes_columns_that_load_npz_sink_joins_across_batches(tmp_path):
+    # Arrange
+    num_rows = pytest.gen.randint(1,10)
+    sink_path = tmp_path / 'out.npz'
+    cut = make_sink(NpzSink, {'SinkFile': str(sink_path), 'SinkBufferSize': '3'})
+
+    # Act
+    write_rows(cut, num_rows)
+    columns = load_npz_sink(str(sink_path))
+
+    # Assert
+    assert sorted(columns) == ['high/posx', 'low/name', 'low/pose', 'step']
+    assert columns['step'].tolist() == list(range(1, num_rows + 1))
+    assert columns['low/pose'].shape == (num_rows, 2)
+    assert columns['low/name'].tolist() == [f'row{step}' for step in range(1, num_rows + 1)]
+    assert columns['high/posx'].dtype == np.float64
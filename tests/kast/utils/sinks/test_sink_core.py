@@ -0,0 +1,121 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+import configparser
+import threading
+import numpy as np
+
+from kast.utils.sinks.core import Sink
+
+def make_sink(sink_class, default_options={}):
+    # Build a sink from a runtime with the given config
+    fake_runtime = MagicMock()
+    fake_runtime.config = configparser.ConfigParser()
+    fake_runtime.config.optionxform = str
+    fake_runtime.config.read_dict({'DEFAULT': default_options})
+    return sink_class(fake_runtime)
+
+class FakeSink(Sink):
+    # Records the batches it is given, in memory
+    def open_file(self):
+        self.batches = []
+        self.batch_threads = []
+        self.file_closed = False
+
+    def write_batch(self, rows):
+        self.batch_threads.append(threading.current_thread().name)
+        self.batches.append(rows)
+
+    def close_file(self):
+        self.file_closed = True
+
+class FailingSink(FakeSink):
+    def write_batch(self, rows):
+        raise OSError('disk full')
+
+def test_sink_core__init__raises_value_error_when_sink_file_is_not_set():
+    # Act
+    with pytest.raises(ValueError) as e_info:
+        make_sink(FakeSink)
+
+    # Assert
+    assert 'SinkFile must be set to write a FakeSink.' in e_info.exconly()
+
+def test_sink_core_write_collects_rows_and_writes_them_in_batches_of_sink_buffer_size():
+    # Arrange
+    arg_buffer_size = pytest.gen.randint(1,5)
+    num_rows = pytest.gen.randint(0,20)
+    cut = make_sink(FakeSink, {'SinkFile': 'out', 'SinkBufferSize': str(arg_buffer_size)})
+
+    # Act
+    for step in range(num_rows):
+        cut.write(step, {'a': step}, {'x': step * 2})
+    full_batches = list(cut.batches)
+    cut.close()
+
+    # Assert
+    assert [len(batch) for batch in full_batches] == [arg_buffer_size] * (num_rows // arg_buffer_size)
+    assert [row for batch in cut.batches for row in batch] == [(step, {'a': step}, {'x': step * 2}) for step in range(num_rows)]
+    assert cut.rows_written == num_rows
+    assert cut.file_closed == True
+
+def test_sink_core_write_copies_arrays_so_later_changes_do_not_reach_buffered_rows():
+    # Arrange
+    num_rows = pytest.gen.randint(2,10)
+    cut = make_sink(FakeSink, {'SinkFile': 'out', 'SinkBufferSize': str(num_rows)})
+    value = np.zeros(3)
+
+    # Act
+    for step in range(num_rows):
+        value[:] = step # Updated in place, as a shared memory frame or knowledge array may be
+        cut.write(step, {'a': value}, {'x': value[0]})
+
+    # Assert
+    assert [low['a'].tolist() for step, low, high in cut.batches[0]] == [[step] * 3 for step in range(num_rows)]
+    assert [high['x'] for step, low, high in cut.batches[0]] == list(range(num_rows))
+
+def test_sink_core_writes_batches_on_writer_thread_when_sink_thread_is_set():
+    # Arrange
+    cut = make_sink(FakeSink, {'SinkFile': 'out', 'SinkBufferSize': '2', 'SinkThread': 'True'})
+
+    # Act
+    for step in range(5):
+        cut.write(step, {'a': step}, {})
+    cut.close()
+
+    # Assert
+    assert [row[0] for batch in cut.batches for row in batch] == list(range(5))
+    assert set(cut.batch_threads) == {'kast-sink-writer'}
+    assert cut.rows_written == 5
+
+def test_sink_core_raises_writer_thread_errors_on_close():
+    # Arrange
+    cut = make_sink(FailingSink, {'SinkFile': 'out', 'SinkBufferSize': '1', 'SinkThread': 'True'})
+    cut.write(1, {}, {})
+
+    # Act
+    with pytest.raises(OSError) as e_info:
+        cut.close()
+
+    # Assert
+    assert 'disk full' in e_info.exconly()
+    assert cut.file_closed == True
+
+def test_sink_core_write_raises_value_error_after_close():
+    # Arrange
+    cut = make_sink(FakeSink, {'SinkFile': 'out'})
+    cut.close()
+    cut.close()
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        cut.write(1, {}, {})
@@ -0,0 +1,65 @@
+# GSC-19360-1, "Knowledge Acquisition and Synthesis Tool"
+#
+# Copyright © 2024 United States Government as represented by the 
+# Administrator of the National Aeronautics and Space Administration.   
+# All Rights Reserved.
+#
+# Licensed under the NASA Open Source Agreement version 1.3
+# See "NOSA GSC-19360-1 KAST.pdf"
+
+import pytest
+from mock import MagicMock
+
+from kast.utils.decorators import vectorized, memoize, window
+
+def test_vectorized_marks_given_method_and_returns_it_unchanged():
+    # Arrange
+    def arg_method(a, b):
+        return (a + b,)
+
+    # Act
+    ret = vectorized(arg_method)
+
+    # Assert
+    assert ret is arg_method
+    assert ret.kast_vectorized == True
+    assert ret(1, 2) == (3,)
+
+def test_memoize_with_maxsize_marks_given_method_and_returns_it_unchanged():
+    # Arrange
+    arg_maxsize = pytest.gen.randint(1,1000)
+    def arg_method(a):
+        return (a,)
+
+    # Act
+    ret = memoize(arg_maxsize)(arg_method)
+
+    # Assert
+    assert ret is arg_method
+    assert ret.kast_memoize_size == arg_maxsize
+
+def test_memoize_without_arguments_marks_given_method_with_default_maxsize():
+    # Arrange
+    def arg_method(a):
+        return (a,)
+
+    # Act
+    ret = memoize(arg_method)
+
+    # Assert
+    assert ret is arg_method
+    assert ret.kast_memoize_size == 128
+
+def test_window_marks_given_method_with_statistic_and_size_and_returns_it_unchanged():
+    # Arrange
+    arg_size = pytest.gen.randint(1,1000)
+    def arg_method(a):
+        return (a,)
+
+    # Act
+    ret = window('max', arg_size)(arg_method)
+
+    # Assert
+    assert ret is arg_method
+    assert ret.kast_window == ('max', arg_size)
+    assert ret(1) == (1,)
@@ -13,7 +13,8 @@ import importlib.util
 import os
 
 import kast.utils
-from kast.utils.functions import import_module, get_attribute_by_name, extract_return_names
+from kast.utils.functions import import_module, get_attribute_by_name, extract_return_names, index_kaster_signatures, value_has_changed, str_to_bool
+import numpy as np
 import kast
 import kast.utils.functions
 
@@ -216,4 +217,96 @@ def test_extract_return_names_returns_value_from_check_body_node_returns_if_chec
     cut = extract_return_names(fake_function_name, fake_filepath)
 
     # Assert
-    assert cut == fake_overall_return
\ No newline at end of file
+    assert cut == fake_overall_return
+
+def test_value_has_changed_returns_false_for_equal_values_and_true_for_different_values():
+    # Arrange
+    arg_value = MagicMock()
+
+    # Act / Assert
+    assert value_has_changed(arg_value, arg_value) == False
+    assert value_has_changed('[1, 2]', '[1, 2]') == False
+    assert value_has_changed(1.0, 2.0) == True
+    assert value_has_changed(None, 0) == True
+
+def test_value_has_changed_compares_arrays_by_contents():
+    # Arrange
+    arg_old_value = np.array([1.0, 2.0, 3.0])
+
+    # Act / Assert
+    assert value_has_changed(arg_old_value, np.array([1.0, 2.0, 3.0])) == False
+    assert value_has_changed(arg_old_value, np.array([1.0, 2.0, 4.0])) == True
+    assert value_has_changed(arg_old_value, np.array([1.0, 2.0])) == True
+
+def test_str_to_bool_accepts_common_config_spellings():
+    # Act / Assert
+    for text in ['True', 'true', ' yes', 'on', '1']:
+        assert str_to_bool(text) == True
+    for text in ['False', 'no', 'off', '0', '']:
+        assert str_to_bool(text) == False
+
+FAKE_KASTER_FILE = """
+import numpy as np
+
+def first_stage(a, b):
+    def helper(c):
+        return (c,)
+    x = a + b
+    return (x, a)
+
+async def async_stage(x):
+    y = x
+    return (y,)
+
+def no_tuple_return(a):
+    return a
+
+class NotAFunction():
+    def method(self):
+        return (self,)
+"""
+
+def test_index_kaster_signatures_indexes_input_and_return_names_of_top_level_functions(mocker, tmp_path):
+    # Arrange
+    arg_file = tmp_path / 'fake_kasters.py'
+    arg_file.write_text(FAKE_KASTER_FILE)
+
+    # Act
+    ret = index_kaster_signatures(str(arg_file))
+
+    # Assert
+    assert ret == {'first_stage': (['a', 'b'], ['x', 'a']),
+                   'async_stage': (['x'], ['y']),
+                   'no_tuple_return': (['a'], None)}
+
+def test_index_kaster_signatures_reuses_cached_index_until_file_contents_change(mocker, tmp_path):
+    # Arrange
+    arg_file = tmp_path / 'fake_kasters.py'
+    arg_file.write_text(FAKE_KASTER_FILE)
+    first_ret = index_kaster_signatures(str(arg_file))
+
+    mocker.patch('kast.utils.functions.ast.parse', side_effect=Exception('short-circuit time mage'))
+
+    # Act
+    cached_ret = index_kaster_signatures(str(arg_file))
+    arg_file.write_text(FAKE_KASTER_FILE + "\ndef new_stage(z):\n    return (z,)\n")
+    with pytest.raises(Exception) as einfo:
+        index_kaster_signatures(str(arg_file))
+
+    # Assert
+    assert cached_ret == first_ret
+    assert len(list((tmp_path / '__pycache__').glob('fake_kasters.py.kastindex-*.json'))) == 1
+    assert einfo.exconly() == 'Exception: short-circuit time mage'
+
+def test_extract_return_names_does_not_print(mocker, capsys, tmp_path):
+    # Arrange
+    arg_file = tmp_path / 'fake_kasters.py'
+    arg_file.write_text(FAKE_KASTER_FILE)
+
+    # Act
+    ret = extract_return_names('first_stage', str(arg_file))
+    out, _ = capsys.readouterr()
+
+    # Assert
+    assert ret == ['x', 'a']
+    assert out == ''
@@ -10,6 +10,8 @@
 import pytest
 from mock import MagicMock
 
+import sys
+
 from kast.utils.print_io import *
 
 def test_print_spellbook_knowledge_prints_nothing_if_io_is_not_given(mocker, capsys):
@@ -78,4 +80,92 @@ def test_print_spellbook_knowledge_prints_both_high_and_low_level_knowledge_only
 
     # Assert
     assert str(fake_high_level_knowledge_value) in out
-    assert str(fake_low_level_knowledge_value) in out
\ No newline at end of file
+    assert str(fake_low_level_knowledge_value) in out
+
+def make_fake_spellbook(low_level_values, high_level_values):
+    fake_spellbook = MagicMock()
+    fake_spellbook.low_level_knowledge = dict((name, MagicMock(value=value)) for name, value in low_level_values.items())
+    fake_spellbook.high_level_knowledge = dict((name, MagicMock(value=value)) for name, value in high_level_values.items())
+    return fake_spellbook
+
+def test_set_colors_switches_color_constants_off_and_back_on():
+    # Act
+    set_colors(False)
+    disabled = (bcolors.HEADER, scolors['FAIL'], status_colors['GREEN'])
+    set_colors(True)
+
+    # Assert
+    assert disabled == ('', '', '')
+    assert (bcolors.HEADER, scolors['FAIL'], status_colors['GREEN']) == ('\033[96m', '\033[91m', '\033[92m')
+    set_colors(colors_supported(sys.stdout))
+
+def test_colors_supported_is_false_for_streams_that_are_not_terminals():
+    # Arrange
+    fake_stream = MagicMock()
+    fake_stream.isatty.return_value = False
+
+    # Act / Assert
+    assert colors_supported(fake_stream) == False
+
+def test_knowledge_printer_buffers_output_until_flush():
+    # Arrange
+    fake_stream = MagicMock()
+    cut = KnowledgePrinter(flush_interval=3600, colors=False, stream=fake_stream)
+    step = pytest.gen.randint(1,100)
+
+    # Act
+    cut.print_spellbook(step, make_fake_spellbook({'a': 1}, {'x': 2}), io='both')
+    written_before_flush = fake_stream.write.call_count
+    cut.flush()
+
+    # Assert
+    assert written_before_flush == 0
+    out = fake_stream.write.call_args_list[0].args[0]
+    assert f'STEP {step}' in out
+    assert "['(a: 1)']" in out
+    assert "['(x: 2)']" in out
+
+def test_knowledge_printer_prints_only_every_nth_step():
+    # Arrange
+    fake_stream = MagicMock()
+    arg_every = pytest.gen.randint(2,5)
+    cut = KnowledgePrinter(every=arg_every, flush_interval=3600, colors=False, stream=fake_stream)
+
+    # Act
+    for step in range(1, 3 * arg_every + 1):
+        cut.print_values(step, {'a': step}, {}, io='low')
+    cut.flush()
+
+    # Assert
+    out = fake_stream.write.call_args_list[0].args[0]
+    assert out.count('STEP') == 3
+    assert f'STEP {arg_every} ' in out and f'STEP {arg_every + 1} ' not in out
+
+def test_knowledge_printer_skips_steps_printed_faster_than_max_rate(mocker):
+    # Arrange
+    fake_stream = MagicMock()
+    mocker.patch('kast.utils.print_io.monotonic', side_effect=[0.0, 0.0, 0.0, 0.5, 1.0, 1.0] + [1.0] * 10)
+    cut = KnowledgePrinter(max_rate=1.0, flush_interval=3600, colors=False, stream=fake_stream)
+
+    # Act
+    for step in range(1, 4):
+        cut.print_values(step, {'a': step}, {}, io='low')
+    cut.flush()
+
+    # Assert
+    out = fake_stream.write.call_args_list[0].args[0]
+    assert 'STEP 1 ' in out and 'STEP 2 ' not in out and 'STEP 3 ' in out
+
+def test_knowledge_printer_prints_only_changed_knowledge_when_changed_only():
+    # Arrange
+    fake_stream = MagicMock()
+    cut = KnowledgePrinter(changed_only=True, flush_interval=0, colors=False, stream=fake_stream)
+
+    # Act
+    cut.print_values(1, {'a': 1, 'b': 1}, {}, io='low')
+    cut.print_values(2, {'a': 1, 'b': 2}, {}, io='low')
+
+    # Assert
+    assert "['(a: 1)', '(b: 1)']" in fake_stream.write.call_args_list[0].args[0]
+    assert "['(b: 2)']" in fake_stream.write.call_args_list[1].args[0]
+
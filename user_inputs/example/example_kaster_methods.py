@@ -9,14 +9,14 @@
 
 def pose_and_rpy_to_posxy(pose, rpy):
 
-	def strlist_to_list(strlist: str):
-		return strlist.strip('][').split(',')
+	def strlist_to_list(strlist):
+		# Values arrive already parsed when the data source declares a column schema (see CsvSchema in example_config.ini)
+		if not isinstance(strlist, str):
+			return strlist
+		return [float(entry) for entry in strlist.strip('][').split(',')]
 
-	pose = strlist_to_list(pose)
-	rpy = strlist_to_list(rpy)
-
-	pose_float = [float(p) for p in pose]
-	rpy_float= [float(r) for r in rpy]
+	pose_float = strlist_to_list(pose)
+	rpy_float = strlist_to_list(rpy)
 
 	posx = pose_float[0]
 	posy = pose_float[1]